@@ -28,7 +28,8 @@ class Comment(m.Model):
     tags = m.ManyToManyField(
         u.User, related_name="user_comment_tags", blank=True
     )
+    likes_count = m.IntegerField(default=0)
 
     @property
     def total_likes(self):
-        return self.likes.count()
+        return self.likes_count
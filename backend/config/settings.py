@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import json
 from os import getenv
 from pathlib import Path
+from tempfile import gettempdir
 
 from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
@@ -97,12 +99,42 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / getenv("DB_NAME"),
+# SQLite is used by default, set 'DB_ENGINE=postgresql' in production
+# since SQLite serializes every write.
+DB_ENGINE = getenv("DB_ENGINE", "sqlite3")
+
+if DB_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": getenv("DB_NAME"),
+            "USER": getenv("DB_USER"),
+            "PASSWORD": getenv("DB_PASSWORD"),
+            "HOST": getenv("DB_HOST", "localhost"),
+            "PORT": getenv("DB_PORT", "5432"),
+            # Connections are kept open between requests, and checked
+            # before being reused so a dropped connection won't fail
+            # a request.
+            "CONN_MAX_AGE": int(getenv("DB_CONN_MAX_AGE", 60)),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "connect_timeout": int(getenv("DB_CONNECT_TIMEOUT", 5)),
+            },
+        }
+    }
+
+    # In pooled mode connections go through a transaction pooler such
+    # as pgbouncer, which can't keep server-side cursors open between
+    # transactions.
+    if getenv("DB_POOLED") == "True":
+        DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / getenv("DB_NAME"),
+        }
     }
-}
 
 
 # Password validation
@@ -142,16 +174,150 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATICFILES_DIRS = [BASE_DIR / "static/"]
 
+# Uploaded post and story contents are sniffed while they're received,
+# so bogus uploads are aborted after their first chunk.
+FILE_UPLOAD_HANDLERS = [
+    "utils.upload_handlers.SniffingUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+# Partially uploaded files of resumable chunked uploads, it's better to
+# be on the same filesystem as static files, so finished uploads are
+# moved instead of copied.
+CHUNKED_UPLOAD_DIR = Path(
+    getenv("CHUNKED_UPLOAD_DIR", Path(gettempdir()) / "chunked_uploads")
+)
+
+# Seconds an upload session is kept after its last chunk, abandoned ones
+# are deleted with their files in batches like expired stories.
+UPLOAD_SESSION_TTL = int(getenv("UPLOAD_SESSION_TTL", 24 * 3600))
+UPLOAD_SESSION_SWEEP_BATCH_SIZE = int(
+    getenv("UPLOAD_SESSION_SWEEP_BATCH_SIZE", 500)
+)
+UPLOAD_SESSION_SWEEP_MAX_BATCHES = int(
+    getenv("UPLOAD_SESSION_SWEEP_MAX_BATCHES", 20)
+)
+
+# Password hashing, see 'utils.hashers' for available algorithms and
+# their parameters, e.g. PASSWORD_HASHER_PARAMS='{"n": 32768}' for scrypt.
+PASSWORD_HASHER = getenv("PASSWORD_HASHER", "scrypt")
+PASSWORD_HASHER_PARAMS = json.loads(getenv("PASSWORD_HASHER_PARAMS", "{}"))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 REDIS_BACKEND_HOST = getenv("REDIS_BACKEND_HOST")
 REDIS_BACKEND_PORT = getenv("REDIS_BACKEND_PORT")
 
+# Shared cache lives on the same redis backend, local memory cache is
+# used when redis is not configured (e.g. while running tests).
+if REDIS_BACKEND_HOST:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": f"redis://{REDIS_BACKEND_HOST}:{REDIS_BACKEND_PORT}",
+        }
+    }
+
+# Seconds a user's followings set is kept in redis after it's loaded.
+FOLLOW_GRAPH_TTL = int(getenv("FOLLOW_GRAPH_TTL", 24 * 3600))
+
+# Seconds an authenticated user's snapshot is kept in cache.
+AUTH_USER_CACHE_TTL = int(getenv("AUTH_USER_CACHE_TTL", 60))
+
+# Maximum number of verified JWTs kept in each process's memory.
+JWT_CACHE_SIZE = int(getenv("JWT_CACHE_SIZE", 4096))
+
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 CELERY_BROKER_URL = getenv("CELERY_REDIS_URL")
 
+# Per-user Bloom filter of seen posts, which timelines are filtered
+# with. Each window is expected to hold up to 'CAPACITY' views, and
+# views are forgotten after 'WINDOW * WINDOWS' seconds.
+SEEN_POSTS_FILTER_CAPACITY = int(getenv("SEEN_POSTS_FILTER_CAPACITY", 10000))
+SEEN_POSTS_FILTER_ERROR_RATE = float(
+    getenv("SEEN_POSTS_FILTER_ERROR_RATE", 0.01)
+)
+SEEN_POSTS_FILTER_WINDOW = int(getenv("SEEN_POSTS_FILTER_WINDOW", 24 * 3600))
+SEEN_POSTS_FILTER_WINDOWS = int(getenv("SEEN_POSTS_FILTER_WINDOWS", 7))
+
+# Buffered post views are written to database every few seconds,
+# stalled follow requests approvals are resumed every minute, expired
+# stories are deleted every few minutes and abandoned uploads and old
+# timeline inbox entries every hour.
+CELERY_BEAT_SCHEDULE = {
+    "flush-post-views": {
+        "task": "post.tasks.flush_post_views",
+        "schedule": float(getenv("POST_VIEWS_FLUSH_INTERVAL", 5)),
+    },
+    "delete-expired-stories": {
+        "task": "story.tasks.delete_expired_stories",
+        "schedule": float(getenv("STORY_SWEEP_INTERVAL", 300)),
+    },
+    "delete-expired-uploads": {
+        "task": "post.tasks.delete_expired_uploads",
+        "schedule": float(getenv("UPLOAD_SESSION_SWEEP_INTERVAL", 3600)),
+    },
+    "trim-timeline-inboxes": {
+        "task": "post.tasks.trim_timeline_inboxes",
+        "schedule": float(getenv("TIMELINE_TRIM_INTERVAL", 3600)),
+    },
+    "resume-follow-requests-approvals": {
+        "task": "user.tasks.resume_follow_requests_approvals",
+        "schedule": float(
+            getenv("FOLLOW_REQUESTS_APPROVAL_RESUME_INTERVAL", 60)
+        ),
+    },
+}
+
+# Follow requests of users who turn public are approved in background
+# in chunks of this size, and jobs which haven't made progress for
+# 'TIMEOUT' seconds are resumed, they're looked for every
+# 'FOLLOW_REQUESTS_APPROVAL_RESUME_INTERVAL' seconds.
+FOLLOW_REQUESTS_CHUNK_SIZE = int(getenv("FOLLOW_REQUESTS_CHUNK_SIZE", 1000))
+FOLLOW_REQUESTS_APPROVAL_TIMEOUT = int(
+    getenv("FOLLOW_REQUESTS_APPROVAL_TIMEOUT", 600)
+)
+
+# Seconds the sets deciding whose stories a user can see are cached.
+STORY_AUDIENCE_CACHE_TTL = int(getenv("STORY_AUDIENCE_CACHE_TTL", 300))
+
+# Expired stories are deleted in batches of this size, each in its own
+# transaction, and a sweep stops after 'MAX_BATCHES' so it stays short.
+STORY_SWEEP_BATCH_SIZE = int(getenv("STORY_SWEEP_BATCH_SIZE", 500))
+STORY_SWEEP_MAX_BATCHES = int(getenv("STORY_SWEEP_MAX_BATCHES", 20))
+
+# Authors with more followers than this are not fanned out on write,
+# their posts get merged into timelines at read time.
+TIMELINE_FANOUT_THRESHOLD = int(getenv("TIMELINE_FANOUT_THRESHOLD", 10000))
+TIMELINE_PAGE_SIZE = int(getenv("TIMELINE_PAGE_SIZE", 5))
+TIMELINE_MAX_PAGE_SIZE = int(getenv("TIMELINE_MAX_PAGE_SIZE", 50))
+
+# Timeline inbox entries older than what timelines read are deleted in
+# batches of this size, and a sweep stops after 'MAX_BATCHES'.
+TIMELINE_TRIM_BATCH_SIZE = int(getenv("TIMELINE_TRIM_BATCH_SIZE", 1000))
+TIMELINE_TRIM_MAX_BATCHES = int(getenv("TIMELINE_TRIM_MAX_BATCHES", 20))
+
+# Maximum number of recent posts kept in each hashtag's posting list.
+HASHTAG_INDEX_SIZE = int(getenv("HASHTAG_INDEX_SIZE", 1000))
+
+# Hashtag ids cached in each process's memory, and for how many seconds.
+HASHTAG_CACHE_SIZE = int(getenv("HASHTAG_CACHE_SIZE", 10000))
+HASHTAG_CACHE_TTL = int(getenv("HASHTAG_CACHE_TTL", 3600))
+
+# Widths of image renditions, which are generated in the celery worker
+# itself. A process pool of 'RENDITION_WORKERS' is opt-in and needs the
+# workers to run with '--pool threads' or 'solo', prefork's daemonic
+# processes can't start children.
+RENDITION_WIDTHS = [
+    int(width)
+    for width in getenv("RENDITION_WIDTHS", "150,320,640,1080").split(",")
+]
+RENDITION_QUALITY = int(getenv("RENDITION_QUALITY", 80))
+RENDITION_WORKERS = int(getenv("RENDITION_WORKERS", 0))
+
 # APPEND_SLASH = False
@@ -1,15 +1,33 @@
 import datetime
 import re
+import time
+from collections import Counter, defaultdict
 from dataclasses import dataclass, field
-from typing import Callable
-
+from hashlib import sha256
+from heapq import merge
+from itertools import groupby, islice
+from threading import Lock
+from typing import BinaryIO, Callable, Iterable, Optional
+from uuid import UUID
+
+import redis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
 from rest_framework.serializers import FileField
 
 from comment import models as cm
 from user import models as u
 from utils.decorators import validation_required
 from utils.exceptions import JsonSerializableValueError
-from utils.validators import Validator
+from utils.bloom_filter import RotatingBloomFilter
+from utils.model_utils import increment_counters, insert_ignore
+from utils.redis_utils import get_redis
+from utils.validators import Validator, validate_content_head
 
 from . import models as m
 
@@ -52,23 +70,26 @@ class PostValidator(Validator):
 class PostLike(PostValidator):
 
     def is_valid(self):
-        return super().is_valid([self._check_user_havent_liked])
+        return super().is_valid([])
 
-    def _check_user_havent_liked(self):
-        user_liked = m.PostLikes.objects.filter(
-            user=self.user, post=self._post_obj
-        ).first()
-        if user_liked:
-            raise JsonSerializableValueError(
+    def like_post(self) -> bool:
+        """
+        Liking the post, duplicate likes are rejected by the database,
+        in which case 'errors' is set and False is returned.
+        """
+
+        self._check_validation_passed()
+        if not insert_ignore(m.PostLikes, user=self.user, post=self._post_obj):
+            self._error = JsonSerializableValueError(
                 {
                     "error": "you have already liked this post.",
                     "code": "duplicateLike",
                 }
             )
+            return False
 
-    def like_post(self):
-        self._check_validation_passed()
-        m.PostLikes.objects.create(user=self.user, post=self._post_obj)
+        increment_counters(self._post_obj, likes_count=1)
+        return True
 
 
 @dataclass
@@ -94,6 +115,7 @@ class DeletePostLike(PostValidator):
     def remove_like(self):
         self._check_validation_passed()
         self._post_like_obj.delete()
+        increment_counters(self._post_obj, likes_count=-1)
 
 
 @dataclass
@@ -101,8 +123,14 @@ class PostFileValidator:
     user: u.User
     capacity: int = field(default=10)
     date: datetime.date = field(default_factory=datetime.date.today)
+    total_uploads: int = field(init=False, default=0)
     _error_messages: str = field(init=False, repr=False)
 
+    CAPACITY_ERROR = {
+        "error": "you have reached the maximum number of files for today.",
+        "code": "capacity",
+    }
+
     def is_valid(self) -> bool:
         try:
             self._validate_date_total_uploads()
@@ -117,17 +145,11 @@ class PostFileValidator:
         return self._error_messages
 
     def _validate_date_total_uploads(self):
-        today_files = m.PostFile.objects.filter(
-            created_at=self.date, post__isnull=True
-        )
-        if len(today_files) >= self.capacity:
-            raise JsonSerializableValueError(
-                {
-                    "error": "you have reached the maximum "
-                    "number of files for today.",
-                    "code": "capacity",
-                }
-            )
+        # A single counter row is read, it's only an early check and the
+        # capacity is enforced again when the file is stored.
+        self.total_uploads = m.UploadQuota.uploads_of(self.user, self.date)
+        if self.total_uploads >= self.capacity:
+            raise JsonSerializableValueError(self.CAPACITY_ERROR)
 
 
 @dataclass
@@ -137,19 +159,245 @@ class PostFile:
 
     @staticmethod
     def delete_today_files(date: datetime.date) -> None:
+        # Stored contents are released by PostFile's post_delete receiver.
         m.PostFile.objects.filter(created_at=date, post__isnull=True).delete()
 
-    def upload_file(self) -> int:
-        if not self.validator.is_valid():
-            raise ValueError(
-                "You cannot call this method without validating data."
+    def upload_file(self) -> Optional[int]:
+        """
+        Storing the file if the user's daily capacity isn't reached,
+        which is checked and taken atomically so concurrent uploads
+        can't exceed it, 'validator' only checks it early.
+
+        Returns None if capacity is reached, see 'validator.errors'.
+        """
+
+        validator = self.validator
+        with transaction.atomic():
+            if not m.UploadQuota.reserve(
+                validator.user, validator.date, validator.capacity
+            ):
+                validator._error_messages = validator.CAPACITY_ERROR
+                return None
+
+            post_file = m.PostFile.objects.create(
+                user=validator.user,
+                content_type=self.content.extension,
+                content=self.content,
+            )
+        validator.total_uploads += 1
+
+        if isinstance(self.content, ChunkedUploadFile):
+            self.content.session.delete()
+        return post_file.pk
+
+
+class ChunkedUploadFile(UploadedFile):
+    """
+    Assembled file of a finished upload session, which is validated and
+    saved the same way as a regular uploaded file. Storages move it into
+    place through 'temporary_file_path' instead of copying it.
+
+    The file is opened on first read, and can be closed as soon as it's
+    validated, it's reopened if it's read again.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, session: m.UploadSession):
+        self.session = session
+        super().__init__(
+            None, session.name, session.content_type, session.size
+        )
+
+    @property
+    def file(self) -> BinaryIO:
+        if self._file is None or self._file.closed:
+            self._file = open(self.session.path, "rb")
+        return self._file
+
+    @file.setter
+    def file(self, file: Optional[BinaryIO]):
+        self._file = file
+
+    @property
+    def closed(self) -> bool:
+        return self._file is None or self._file.closed
+
+    @classmethod
+    def from_session(cls, session: m.UploadSession) -> "ChunkedUploadFile":
+        """
+        Verifying the session is complete and its file matches the
+        checksum given on creation, a corrupted upload is discarded.
+        """
+
+        if session.received != session.size:
+            raise JsonSerializableValueError(
+                {"error": "upload is not complete.", "code": "incomplete"}
+            )
+
+        digest = sha256()
+        with open(session.path, "rb") as file:
+            while block := file.read(cls.CHUNK_SIZE):
+                digest.update(block)
+
+        if digest.hexdigest() != session.checksum:
+            session.delete()
+            raise JsonSerializableValueError(
+                {
+                    "error": "checksum doesn't match, upload the file again.",
+                    "code": "checksumMismatch",
+                }
+            )
+        return cls(session)
+
+    def temporary_file_path(self) -> str:
+        return str(self.session.path)
+
+    def open(self, mode=None):
+        self.seek(0)
+        return self
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+@dataclass
+class UploadChunk(Validator):
+    """
+    Writing a byte range of an upload session, chunks must be sent in
+    order, each one starting where the previous one ended. The first
+    chunk must hold the file's header, which is sniffed.
+
+    Attributes:
+        content_range: Value of 'Content-Range' header, e.g.
+            'bytes 0-1048575/5242880'.
+        content_length: Value of 'Content-Length' header, which must
+            match the range's length.
+        stream: Request body, which is streamed to the session's file
+            without being loaded into memory.
+    """
+
+    user: u.User
+    upload_id: UUID
+    content_range: str
+    content_length: str
+    stream: BinaryIO
+    session: m.UploadSession = field(init=False, repr=False)
+    _start: int = field(init=False, repr=False)
+    _length: int = field(init=False, repr=False)
+
+    def is_valid(self):
+        try:
+            self._validate_session()
+            self._validate_range()
+        except JsonSerializableValueError as e:
+            self._error = e
+            return False
+
+        self._validation_passed = True
+        return True
+
+    def _validate_session(self):
+        session = m.UploadSession.objects.filter(
+            pk=self.upload_id, user=self.user
+        ).first()
+        if not session:
+            raise JsonSerializableValueError(
+                {"error": "upload not found.", "code": "notFound"}
+            )
+        self.session = session
+
+    def _validate_range(self):
+        match = re.fullmatch(r"bytes (\d+)-(\d+)/(\d+)", self.content_range)
+        if not match:
+            raise JsonSerializableValueError(
+                {"error": "invalid content range.", "code": "invalidRange"}
+            )
+
+        if not self.content_length.isdigit():
+            raise JsonSerializableValueError(
+                {"error": "invalid content length.", "code": "invalidRange"}
+            )
+
+        start, end, total = map(int, match.groups())
+        length = int(self.content_length)
+        if (
+            total != self.session.size
+            or not start <= end < total
+            or end - start + 1 != length
+        ):
+            raise JsonSerializableValueError(
+                {"error": "invalid content range.", "code": "invalidRange"}
+            )
+        if start != self.session.received:
+            raise self._invalid_offset_error(self.session.received)
+        self._start = start
+        self._length = length
+
+    @staticmethod
+    def _invalid_offset_error(offset: int) -> JsonSerializableValueError:
+        return JsonSerializableValueError(
+            {
+                "error": "chunk doesn't start at the upload's offset.",
+                "code": "invalidOffset",
+                "offset": offset,
+            }
+        )
+
+    @validation_required
+    def write(self) -> Optional[int]:
+        """
+        Appending the chunk to the session's file and returning the new
+        offset, the session row is locked so concurrent chunks of the
+        same upload can't interleave. If another chunk has been written
+        since validation, or the first chunk isn't the declared type of
+        file, 'errors' is set and None is returned.
+
+        If the client disconnects midway, the bytes received so far are
+        kept and the upload resumes from there.
+        """
+
+        with transaction.atomic():
+            session = m.UploadSession.objects.select_for_update().get(
+                pk=self.session.pk
+            )
+            if session.received != self._start:
+                self._error = self._invalid_offset_error(session.received)
+                return None
+
+            remaining = self._length
+            block = self.stream.read(
+                min(remaining, ChunkedUploadFile.CHUNK_SIZE)
+            )
+            if self._start == 0:
+                # Bogus files are rejected by their first chunk.
+                try:
+                    validate_content_head(block, session.content_type)
+                except ValidationError as e:
+                    self._error = JsonSerializableValueError(e.detail)
+                    session.delete()
+                    return None
+
+            session.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(session.path, "ab") as file:
+                # Dropping the leftovers of an interrupted write.
+                file.truncate(self._start)
+                while block:
+                    file.write(block)
+                    remaining -= len(block)
+                    block = self.stream.read(
+                        min(remaining, ChunkedUploadFile.CHUNK_SIZE)
+                    )
+
+            session.received = self._start + self._length - remaining
+            session.expires_at = timezone.now() + datetime.timedelta(
+                seconds=settings.UPLOAD_SESSION_TTL
             )
+            session.save(update_fields=["received", "expires_at"])
 
-        return m.PostFile.objects.create(
-            user=self.validator.user,
-            content_type=self.content.extension,
-            content=self.content,
-        ).pk
+        self.session = session
+        return session.received
 
 
 @dataclass
@@ -170,6 +418,7 @@ class AddComment(PostValidator):
             user=self.user, post=self._post_obj, content=self.content
         )
         comment.tags.set(self.tags)
+        increment_counters(self._post_obj, comments_count=1)
 
 
 @dataclass
@@ -191,3 +440,517 @@ class DeleteComment(PostValidator):
     @validation_required
     def delete_comment(self):
         self._comment.delete()
+        increment_counters(self._comment.post, comments_count=-1)
+
+
+class TimelineInbox:
+    """
+    Fan-out-on-write timeline inbox.
+
+    Newly created posts are pushed into every follower's inbox, so
+    timelines can be read from a precomputed table instead of being
+    rebuilt from follows on every request.
+
+    Authors with more followers than 'TIMELINE_FANOUT_THRESHOLD' are
+    not fanned out, their posts are marked with 'is_fanned_out=False'
+    and merged into timelines at read time instead.
+
+    Timelines only read entries of the last 'WINDOW', older ones are
+    deleted by 'trim'.
+    """
+
+    WINDOW = datetime.timedelta(days=2)
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def should_fan_out(author: u.User) -> bool:
+        return author.followers_count <= settings.TIMELINE_FANOUT_THRESHOLD
+
+    @classmethod
+    def fan_out(cls, post: m.Post) -> int:
+        """
+        Pushing the post into all of its author's followers inboxes,
+        in batches of 'BATCH_SIZE' followers.
+        """
+
+        if not post.is_fanned_out:
+            return 0
+
+        follower_ids = (
+            u.Follow.objects.filter(following=post.user_id)
+            .values_list("follower_id", flat=True)
+            .iterator(chunk_size=cls.BATCH_SIZE)
+        )
+        total = 0
+        batch = []
+        for follower_id in follower_ids:
+            batch.append(
+                m.TimelineEntry(
+                    user_id=follower_id,
+                    post=post,
+                    post_created_at=post.created_at,
+                )
+            )
+            if len(batch) >= cls.BATCH_SIZE:
+                total += cls._push(batch)
+                batch = []
+
+        if batch:
+            total += cls._push(batch)
+        return total
+
+    @classmethod
+    def backfill(cls, author: u.User, follower_ids: list[int]) -> None:
+        """
+        Filling new followers inboxes with author's recent posts,
+        so following someone shows their posts right away.
+        """
+
+        since = timezone.now() - cls.WINDOW
+        posts = m.Post.objects.filter(
+            user=author, is_fanned_out=True, created_at__gte=since
+        ).values_list("id", "created_at")
+        cls._push(
+            [
+                m.TimelineEntry(
+                    user_id=follower_id,
+                    post_id=post_id,
+                    post_created_at=created_at,
+                )
+                for post_id, created_at in posts
+                for follower_id in follower_ids
+            ]
+        )
+
+    @staticmethod
+    def remove(author: u.User, follower: u.User) -> None:
+        m.TimelineEntry.objects.filter(
+            user=follower, post__user=author
+        ).delete()
+
+    @classmethod
+    def trim(cls) -> int:
+        """
+        Deleting entries older than 'WINDOW' in bounded batches, each
+        in its own transaction.
+
+        Returns the number of deleted entries, a sweep stops after
+        'TIMELINE_TRIM_MAX_BATCHES' and the rest is left to the next one.
+        """
+
+        since = timezone.now() - cls.WINDOW
+        batch_size = settings.TIMELINE_TRIM_BATCH_SIZE
+        deleted = 0
+        for _ in range(settings.TIMELINE_TRIM_MAX_BATCHES):
+            expired = list(
+                m.TimelineEntry.objects.filter(post_created_at__lt=since)
+                .order_by("post_created_at")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not expired:
+                break
+
+            count, _ = m.TimelineEntry.objects.filter(pk__in=expired).delete()
+            deleted += count
+        return deleted
+
+    @classmethod
+    def _push(cls, entries: list[m.TimelineEntry]) -> int:
+        m.TimelineEntry.objects.bulk_create(
+            entries, batch_size=cls.BATCH_SIZE, ignore_conflicts=True
+        )
+        return len(entries)
+
+
+class HashtagIndex:
+    """
+    Inverted index of hashtags to their posts.
+
+    Every hashtag has a posting list of its most recent public posts,
+    so posts containing any of some hashtags are found by k-way merging
+    a few short index scans, instead of joining posts with hashtags.
+    """
+
+    @classmethod
+    def add(cls, post: m.Post, hashtag_ids: list[int]) -> None:
+        if not hashtag_ids or post.user.is_private:
+            return
+
+        m.HashtagIndexEntry.objects.bulk_create(
+            [
+                m.HashtagIndexEntry(
+                    hashtag_id=hashtag_id,
+                    post=post,
+                    post_created_at=post.created_at,
+                )
+                for hashtag_id in hashtag_ids
+            ],
+            ignore_conflicts=True,
+        )
+        cls._trim(hashtag_ids)
+
+    @classmethod
+    def backfill_author(cls, author: u.User) -> None:
+        """
+        Indexing author's recent posts, e.g. when they become public.
+        """
+
+        entries = list(
+            m.Post.hashtags.through.objects.filter(post__user=author)
+            .order_by("-post__created_at")
+            .values_list("hashtag_id", "post_id", "post__created_at")[
+                : settings.HASHTAG_INDEX_SIZE
+            ]
+        )
+        m.HashtagIndexEntry.objects.bulk_create(
+            [
+                m.HashtagIndexEntry(
+                    hashtag_id=hashtag_id,
+                    post_id=post_id,
+                    post_created_at=created_at,
+                )
+                for hashtag_id, post_id, created_at in entries
+            ],
+            ignore_conflicts=True,
+        )
+        cls._trim({hashtag_id for hashtag_id, _, _ in entries})
+
+    @staticmethod
+    def remove_author(author: u.User) -> None:
+        m.HashtagIndexEntry.objects.filter(post__user=author).delete()
+
+    @staticmethod
+    def fetch(
+        hashtag_ids: list[int],
+        after: Q,
+        limit: int,
+        exclude: Iterable[int] = (),
+    ) -> list[tuple[datetime.datetime, int]]:
+        """
+        Returns up to 'limit' (created_at, id) of the most recent posts
+        containing any of the hashtags, after the keyset position
+        'after' on ('post_created_at', 'post_id').
+        """
+
+        exclude = set(exclude)
+        posting_lists = [
+            m.HashtagIndexEntry.objects.filter(after, hashtag=hashtag_id)
+            .order_by("-post_created_at", "-post_id")
+            .values_list("post_created_at", "post_id")[
+                : limit + len(exclude)
+            ]
+            for hashtag_id in hashtag_ids
+        ]
+        # Posts with several of the hashtags are adjacent after merging.
+        posts = (
+            post
+            for post, _ in groupby(merge(*posting_lists, reverse=True))
+            if post[1] not in exclude
+        )
+        return list(islice(posts, limit))
+
+    @staticmethod
+    def _trim(hashtag_ids: Iterable[int]) -> None:
+        size = settings.HASHTAG_INDEX_SIZE
+        for hashtag_id in hashtag_ids:
+            entries = m.HashtagIndexEntry.objects.filter(hashtag=hashtag_id)
+            oldest_kept = (
+                entries.order_by("-post_created_at", "-post_id")
+                .values_list("post_created_at", "post_id")[size - 1 : size]
+                .first()
+            )
+            if not oldest_kept:
+                continue
+
+            created_at, post_id = oldest_kept
+            entries.filter(
+                Q(post_created_at__lt=created_at)
+                | Q(post_created_at=created_at, post_id__lt=post_id)
+            ).delete()
+
+
+class PostViewsRecorder:
+    """
+    Buffered post views recording.
+
+    Views are pushed into a redis list, and written to
+    'PostViewsHistory' in batches by 'flush_post_views' task, so
+    viewing a post or a timeline page doesn't write to the database.
+
+    Views are also added to a per-user Bloom filter, so checking
+    whether user has seen some posts never touches the ever-growing
+    view history. The filter has a small false positive rate, and
+    forgets views older than its rotation period.
+
+    User's most recent views are loaded from 'PostViewsHistory' into
+    the filter once in every window, so views recorded before the
+    filter existed, or which it has forgotten, are still skipped. They
+    are kept apart from the windows, which stay within their capacity.
+
+    Views are written right away and looked up in database when redis
+    is not configured.
+    """
+
+    BUFFER_KEY = "post:views"
+    SEEN_FILTER_KEY = "post:seen:{user_id}"
+    SEEN_FILTER_LOADED_KEY = "post:seen:{user_id}:loaded"
+    BATCH_SIZE = 1000
+
+    @classmethod
+    def record(cls, user_id: int, post_ids: list[int]) -> None:
+        if not post_ids:
+            return
+
+        client = get_redis()
+        if client is None:
+            cls._write([(user_id, post_id) for post_id in post_ids])
+            return
+
+        client.rpush(
+            cls.BUFFER_KEY, *[f"{user_id}:{post_id}" for post_id in post_ids]
+        )
+        cls.seen_filter(client, user_id).add(post_ids)
+
+    @classmethod
+    async def arecord(cls, user_id: int, post_ids: list[int]) -> None:
+        await sync_to_async(cls.record)(user_id, post_ids)
+
+    @classmethod
+    def seen_post_ids(cls, user_id: int, post_ids: list[int]) -> set[int]:
+        """
+        Returns which of 'post_ids' user has already seen.
+        """
+
+        client = get_redis()
+        if client is None:
+            return set(
+                m.PostViewsHistory.objects.filter(
+                    user=user_id, post__in=post_ids
+                ).values_list("post_id", flat=True)
+            )
+
+        seen_filter = cls.seen_filter(client, user_id)
+        cls._load_seen_filter(client, seen_filter, user_id)
+        flags = seen_filter.contains(post_ids)
+        return {post_id for post_id, seen in zip(post_ids, flags) if seen}
+
+    @classmethod
+    def _load_seen_filter(
+        cls,
+        client: redis.Redis,
+        seen_filter: RotatingBloomFilter,
+        user_id: int,
+    ) -> None:
+        loaded_key = cls.SEEN_FILTER_LOADED_KEY.format(user_id=user_id)
+        if not client.set(
+            loaded_key, 1, ex=settings.SEEN_POSTS_FILTER_WINDOW, nx=True
+        ):
+            return
+
+        seen_filter.load(
+            m.PostViewsHistory.objects.filter(user=user_id)
+            .order_by("-date")
+            .values_list("post_id", flat=True)[
+                : settings.SEEN_POSTS_FILTER_CAPACITY
+            ]
+        )
+
+    @classmethod
+    def seen_filter(
+        cls, client: redis.Redis, user_id: int
+    ) -> RotatingBloomFilter:
+        return RotatingBloomFilter(
+            client,
+            cls.SEEN_FILTER_KEY.format(user_id=user_id),
+            settings.SEEN_POSTS_FILTER_CAPACITY,
+            settings.SEEN_POSTS_FILTER_ERROR_RATE,
+            settings.SEEN_POSTS_FILTER_WINDOW,
+            settings.SEEN_POSTS_FILTER_WINDOWS,
+        )
+
+    @classmethod
+    def flush(cls) -> int:
+        """
+        Writing buffered views in batches of 'BATCH_SIZE', until the
+        buffer is empty.
+
+        Each batch is removed from the buffer before being written, so
+        a crashing worker loses at most one batch of views.
+        """
+
+        client = get_redis()
+        if client is None:
+            return 0
+
+        total = 0
+        while True:
+            with client.pipeline() as pipe:
+                pipe.lrange(cls.BUFFER_KEY, 0, cls.BATCH_SIZE - 1)
+                pipe.ltrim(cls.BUFFER_KEY, cls.BATCH_SIZE, -1)
+                items, _ = pipe.execute()
+
+            total += cls._write(
+                [tuple(map(int, item.split(b":"))) for item in items]
+            )
+            if len(items) < cls.BATCH_SIZE:
+                return total
+
+    @staticmethod
+    def _write(views: list[tuple[int, int]]) -> int:
+        """
+        Inserting (user_id, post_id) views, skipping the ones which are
+        already recorded, or whose user or post no longer exist.
+        """
+
+        post_ids = m.Post.objects.filter(
+            pk__in={post_id for _, post_id in views}
+        ).values_list("pk", flat=True)
+        user_ids = u.User.objects.filter(
+            pk__in={user_id for user_id, _ in views}
+        ).values_list("pk", flat=True)
+        post_ids, user_ids = set(post_ids), set(user_ids)
+
+        objs = [
+            m.PostViewsHistory(user_id=user_id, post_id=post_id)
+            for user_id, post_id in dict.fromkeys(views)
+            if user_id in user_ids and post_id in post_ids
+        ]
+        m.PostViewsHistory.objects.bulk_create(objs, ignore_conflicts=True)
+        return len(objs)
+
+
+@dataclass(frozen=True)
+class TrendingWindow:
+    """
+    Attributes:
+        span: Length of the window in seconds.
+        bucket: Length of each counter bucket in seconds.
+        half_life: Seconds after which a hashtag usage weighs half.
+    """
+
+    span: int
+    bucket: int
+    half_life: int
+
+    @property
+    def buckets(self) -> int:
+        return self.span // self.bucket
+
+
+class TrendingHashtags:
+    """
+    Trending hashtags over sliding windows.
+
+    Every hashtag usage increments its counter in the current time
+    bucket of each window, and a window's top hashtags are computed by
+    summing its buckets with exponentially decayed weights, so recent
+    usages weigh more. Nothing is read from database.
+
+    Buckets are redis sorted sets, which are summed with a weighted
+    ZUNIONSTORE and cached for 'TOP_TTL' seconds. When redis is not
+    configured counters are kept in the process memory instead.
+    """
+
+    WINDOWS = {
+        "1h": TrendingWindow(3600, 60, 15 * 60),
+        "24h": TrendingWindow(24 * 3600, 3600, 6 * 3600),
+        "7d": TrendingWindow(7 * 24 * 3600, 6 * 3600, 2 * 24 * 3600),
+    }
+    BUCKET_KEY = "trending:{window}:{bucket}"
+    TOP_KEY = "trending:{window}:top"
+    TOP_TTL = 60
+
+    _buckets: dict[str, dict[int, Counter]] = defaultdict(dict)
+    _lock = Lock()
+
+    @classmethod
+    def record(cls, titles: Iterable[str], now: Optional[float] = None):
+        titles = list(titles)
+        if not titles:
+            return
+
+        now = now or time.time()
+        client = get_redis()
+        if client is None:
+            cls._record_in_memory(titles, now)
+            return
+
+        with client.pipeline(transaction=False) as pipe:
+            for name, window in cls.WINDOWS.items():
+                key = cls.BUCKET_KEY.format(
+                    window=name, bucket=int(now // window.bucket)
+                )
+                for title in titles:
+                    pipe.zincrby(key, 1, title)
+                pipe.expire(key, window.span + window.bucket)
+            pipe.execute()
+
+    @classmethod
+    def top(
+        cls, name: str, limit: int, now: Optional[float] = None
+    ) -> list[tuple[str, float]]:
+        """
+        Returns (title, score) of the 'limit' top hashtags of the
+        window, with the highest scores first.
+        """
+
+        if limit < 1:
+            return []
+
+        weights = cls._bucket_weights(cls.WINDOWS[name], now or time.time())
+        client = get_redis()
+        if client is None:
+            return cls._top_in_memory(name, weights, limit)
+
+        top_key = cls.TOP_KEY.format(window=name)
+        if not client.exists(top_key):
+            with client.pipeline() as pipe:
+                pipe.zunionstore(
+                    top_key,
+                    {
+                        cls.BUCKET_KEY.format(window=name, bucket=bucket): w
+                        for bucket, w in weights.items()
+                    },
+                )
+                pipe.expire(top_key, cls.TOP_TTL)
+                pipe.execute()
+
+        return [
+            (title.decode(), score)
+            for title, score in client.zrevrange(
+                top_key, 0, limit - 1, withscores=True
+            )
+        ]
+
+    @staticmethod
+    def _bucket_weights(
+        window: TrendingWindow, now: float
+    ) -> dict[int, float]:
+        current = int(now // window.bucket)
+        return {
+            current - age: 0.5 ** (age * window.bucket / window.half_life)
+            for age in range(window.buckets)
+        }
+
+    @classmethod
+    def _record_in_memory(cls, titles: list[str], now: float):
+        with cls._lock:
+            for name, window in cls.WINDOWS.items():
+                buckets = cls._buckets[name]
+                current = int(now // window.bucket)
+                buckets.setdefault(current, Counter()).update(titles)
+                for bucket in list(buckets):
+                    if bucket <= current - window.buckets:
+                        del buckets[bucket]
+
+    @classmethod
+    def _top_in_memory(
+        cls, name: str, weights: dict[int, float], limit: int
+    ) -> list[tuple[str, float]]:
+        scores = Counter()
+        with cls._lock:
+            buckets = cls._buckets[name]
+            for bucket, weight in weights.items():
+                for title, count in buckets.get(bucket, {}).items():
+                    scores[title] += count * weight
+        return scores.most_common(limit)
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0008_timelineentry_post_is_fanned_out'),
+        ('user', '0010_alter_user_profile'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='timelineentry',
+            name='timeline_user_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', '-post_created_at', '-post'], name='timeline_user_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0010_post_counters'),
+        ('user', '0013_follow_follower_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['user', 'created_at'], name='post_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postlikes',
+            index=models.Index(fields=['user', 'date'], name='postlikes_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postviewshistory',
+            index=models.Index(fields=['user', 'post'], name='postviews_user_post_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:43
+
+from django.db import migrations, models
+
+
+def delete_duplicates(model_name, fields):
+    """
+    Keeping only the oldest row of each duplicate group, so the unique
+    constraint can be created.
+    """
+
+    def operation(apps, schema_editor):
+        model = apps.get_model(*model_name.split("."))
+        keep = (
+            model.objects.values(*fields)
+            .annotate(keep_id=models.Min("id"))
+            .values("keep_id")
+        )
+        model.objects.exclude(id__in=keep).delete()
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0011_feed_indexes'),
+        ('user', '0014_follow_unique_follow'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            delete_duplicates("post.PostLikes", ("user", "post")),
+            migrations.RunPython.noop,
+        ),
+        migrations.RunPython(
+            delete_duplicates("post.PostViewsHistory", ("user", "post")),
+            migrations.RunPython.noop,
+        ),
+        migrations.RemoveIndex(
+            model_name='postviewshistory',
+            name='postviews_user_post_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='postlikes',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_post_like'),
+        ),
+        migrations.AddConstraint(
+            model_name='postviewshistory',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_post_view'),
+        ),
+    ]
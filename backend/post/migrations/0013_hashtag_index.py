@@ -0,0 +1,64 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def index_recent_posts(apps, schema_editor):
+    """
+    Filling every hashtag's posting list with its most recent public
+    posts.
+    """
+
+    Hashtag = apps.get_model("post", "Hashtag")
+    HashtagIndexEntry = apps.get_model("post", "HashtagIndexEntry")
+    PostHashtags = apps.get_model("post", "Post").hashtags.through
+
+    for hashtag_id in Hashtag.objects.values_list("id", flat=True).iterator():
+        posts = (
+            PostHashtags.objects.filter(
+                hashtag_id=hashtag_id, post__user__is_private=False
+            )
+            .order_by("-post__created_at", "-post_id")
+            .values_list("post_id", "post__created_at")
+        )[: settings.HASHTAG_INDEX_SIZE]
+        HashtagIndexEntry.objects.bulk_create(
+            [
+                HashtagIndexEntry(
+                    hashtag_id=hashtag_id,
+                    post_id=post_id,
+                    post_created_at=created_at,
+                )
+                for post_id, created_at in posts
+            ]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0012_unique_likes_and_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HashtagIndexEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_created_at', models.DateTimeField()),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='index_entries', to='post.hashtag')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hashtag_index_entries', to='post.post')),
+            ],
+            options={
+                'verbose_name': 'HashtagIndexEntry',
+                'verbose_name_plural': 'HashtagIndexEntries',
+                'indexes': [models.Index(fields=['hashtag', '-post_created_at', '-post'], name='hashtag_index_keyset_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='hashtagindexentry',
+            constraint=models.UniqueConstraint(fields=('hashtag', 'post'), name='unique_hashtag_index_entry'),
+        ),
+        migrations.RunPython(index_recent_posts, migrations.RunPython.noop),
+    ]
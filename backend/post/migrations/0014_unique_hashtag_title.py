@@ -0,0 +1,61 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:49
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def merge_duplicate_hashtags(apps, schema_editor):
+    """
+    Normalizing hashtag titles, and merging hashtags which end up with
+    the same title into the oldest one, so titles can be unique.
+    """
+
+    Hashtag = apps.get_model("post", "Hashtag")
+    HashtagIndexEntry = apps.get_model("post", "HashtagIndexEntry")
+    PostHashtags = apps.get_model("post", "Post").hashtags.through
+
+    kept = {}
+    for hashtag in Hashtag.objects.order_by("id").iterator():
+        title = unicodedata.normalize("NFKC", hashtag.title)
+        title = title.lstrip("#").casefold()
+        if title not in kept:
+            kept[title] = hashtag.id
+            if title != hashtag.title:
+                Hashtag.objects.filter(id=hashtag.id).update(title=title)
+            continue
+
+        kept_id = kept[title]
+        for model in (PostHashtags, HashtagIndexEntry):
+            post_ids = model.objects.filter(hashtag_id=kept_id).values(
+                "post_id"
+            )
+            model.objects.filter(hashtag_id=hashtag.id).exclude(
+                post_id__in=post_ids
+            ).update(hashtag_id=kept_id)
+        hashtag.delete()
+
+
+class Migration(migrations.Migration):
+    """
+    Merging runs in its own transaction before the title is altered,
+    since PostgreSQL can't alter a table which has pending trigger
+    events from the deleted rows.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('post', '0013_hashtag_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_hashtags, migrations.RunPython.noop, atomic=True
+        ),
+        migrations.AlterField(
+            model_name='hashtag',
+            name='title',
+            field=models.CharField(max_length=250, unique=True),
+        ),
+    ]
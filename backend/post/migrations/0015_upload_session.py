@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:54
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0014_unique_hashtag_title'),
+        ('user', '0014_follow_unique_follow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=54)),
+                ('content_type', models.CharField(max_length=20)),
+                ('size', models.PositiveIntegerField()),
+                ('checksum', models.CharField(max_length=64)),
+                ('received', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='user.user')),
+            ],
+            options={
+                'verbose_name': 'UploadSession',
+                'verbose_name_plural': 'UploadSessions',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:58
+
+import utils.model_utils
+import utils.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0015_upload_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('references', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'MediaBlob',
+                'verbose_name_plural': 'MediaBlobs',
+            },
+        ),
+        migrations.AlterField(
+            model_name='postfile',
+            name='content',
+            field=models.FileField(max_length=255, storage=utils.storage.ContentAddressedStorage(), upload_to=utils.model_utils.generate_media_path),
+        ),
+    ]
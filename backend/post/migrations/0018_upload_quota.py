@@ -0,0 +1,57 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def count_uploads(apps, schema_editor):
+    """Counting files which are already uploaded but not attached yet."""
+
+    PostFile = apps.get_model("post", "PostFile")
+    UploadQuota = apps.get_model("post", "UploadQuota")
+    uploads = (
+        PostFile.objects.filter(post__isnull=True)
+        .values("user_id", "created_at")
+        .annotate(uploads=models.Count("id"))
+        .order_by()
+    )
+    UploadQuota.objects.bulk_create(
+        [
+            UploadQuota(
+                user_id=row["user_id"],
+                date=row["created_at"],
+                uploads=row["uploads"],
+            )
+            for row in uploads
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0017_renditions'),
+        ('user', '0015_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadQuota',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('uploads', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='user.user')),
+            ],
+            options={
+                'verbose_name': 'UploadQuota',
+                'verbose_name_plural': 'UploadQuotas',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='uploadquota',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='unique_upload_quota'),
+        ),
+        migrations.RunPython(count_uploads, migrations.RunPython.noop),
+    ]
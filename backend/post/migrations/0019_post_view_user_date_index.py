@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0018_upload_quota'),
+        ('user', '0019_unique_follow_request'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='postviewshistory',
+            index=models.Index(fields=['user', '-date'], name='post_view_user_date_idx'),
+        ),
+    ]
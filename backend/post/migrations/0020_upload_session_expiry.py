@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:28
+
+import post.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0019_post_view_user_date_index'),
+        ('user', '0019_unique_follow_request'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='expires_at',
+            field=models.DateTimeField(default=post.models._get_upload_session_expiry),
+        ),
+        migrations.AddIndex(
+            model_name='uploadsession',
+            index=models.Index(fields=['expires_at'], name='upload_session_expires_at_idx'),
+        ),
+    ]
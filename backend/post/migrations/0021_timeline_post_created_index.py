@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0020_upload_session_expiry'),
+        ('user', '0019_unique_follow_request'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['post_created_at'], name='timeline_post_created_idx'),
+        ),
+    ]
@@ -1,20 +1,99 @@
-from datetime import date
+import time
+import unicodedata
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable, Optional
 
-from utils.model_utils import generate_path
+from django.conf import settings
+from utils import renditions
+from utils.cache_utils import ExpiringLRUCache
+from utils.model_utils import (
+    generate_media_path,
+    increment_counters,
+    insert_ignore,
+)
+from utils.storage import content_storage
 from django.db import models as m
+from django.db import transaction
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 from user import models as u
 
 # Create your models here.
 
+# Ids of hot hashtags keyed by their normalized title, so posting with
+# them doesn't touch the database.
+hashtag_id_cache = ExpiringLRUCache(settings.HASHTAG_CACHE_SIZE)
+
+
+class HashtagQuerySet(m.QuerySet):
+    def bulk_get_or_create(self, titles: Iterable[str]) -> dict[str, int]:
+        """
+        Returns ids of the given hashtags keyed by their normalized
+        title, creating the missing ones.
+
+        Hashtags which are not cached are inserted with
+        'ON CONFLICT DO NOTHING' and then read back, so concurrent
+        posts with the same new hashtag never create duplicates.
+        """
+
+        ids = {}
+        missing = set()
+        for title in map(Hashtag.normalize, titles):
+            if (hashtag_id := hashtag_id_cache.get(title)) is not None:
+                ids[title] = hashtag_id
+            else:
+                missing.add(title)
+
+        if not missing:
+            return ids
+
+        self.bulk_create(
+            [Hashtag(title=title) for title in missing],
+            ignore_conflicts=True,
+        )
+        created = dict(
+            self.filter(title__in=missing).values_list("title", "id")
+        )
+        ids.update(created)
+
+        # Ids are cached once they are committed, so a rolled back
+        # hashtag is never served from cache.
+        def cache_ids():
+            expires_at = time.time() + settings.HASHTAG_CACHE_TTL
+            for title, hashtag_id in created.items():
+                hashtag_id_cache.set(title, hashtag_id, expires_at)
+
+        transaction.on_commit(cache_ids, using=self.db)
+        return ids
+
 
 class Hashtag(m.Model):
-    title = m.CharField(max_length=250)
+    title = m.CharField(max_length=250, unique=True)
     created_at = m.DateTimeField(auto_now_add=True)
     updated_at = m.DateTimeField(auto_now=True)
 
+    objects = HashtagQuerySet.as_manager()
+
     def __str__(self) -> str:
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.title = self.normalize(self.title)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def normalize(title: str) -> str:
+        """
+        Hashtags are case insensitive, and visually identical unicode
+        forms are treated as the same hashtag.
+        """
+
+        return unicodedata.normalize("NFKC", title).lstrip("#").casefold()
+
     class Meta:
         verbose_name = "Hashtag"
         verbose_name_plural = "Hashtags"
@@ -28,12 +107,22 @@ class PostLikes(m.Model):
     class Meta:
         verbose_name = "PostLike"
         verbose_name_plural = "PostLikes"
+        constraints = [
+            m.UniqueConstraint(
+                fields=["user", "post"], name="unique_post_like"
+            )
+        ]
+        indexes = [
+            m.Index(fields=["user", "date"], name="postlikes_user_date_idx")
+        ]
 
     @staticmethod
     def fetch_recent_liked_posts(user: u.User, max: int = 20) -> list["Post"]:
-        recent_liked_posts_obj = PostLikes.objects.filter(
-            user=user
-        ).select_related("post")[:20]
+        recent_liked_posts_obj = (
+            PostLikes.objects.filter(user=user)
+            .order_by("-date")
+            .select_related("post")[:20]
+        )
         return [liked_post.post for liked_post in recent_liked_posts_obj]
 
 
@@ -46,7 +135,10 @@ class PostFile(m.Model):
     user = m.ForeignKey(u.User, on_delete=m.CASCADE)
     post = m.ForeignKey("Post", on_delete=m.CASCADE, null=True)
     content_type = m.CharField(choices=ContentType.choices, max_length=3)
-    content = m.FileField(upload_to=generate_path)
+    content = m.FileField(
+        upload_to=generate_media_path, storage=content_storage, max_length=255
+    )
+    renditions = m.JSONField(default=dict, blank=True)
     created_at = m.DateField(auto_now_add=True)
 
     class Meta:
@@ -55,11 +147,7 @@ class PostFile(m.Model):
 
     @staticmethod
     def specific_date_uploads(user: u.User, specific_date: date) -> int:
-        return PostFile.objects.filter(
-            user=user,
-            created_at=specific_date,
-            post__isnull=True,
-        ).count()
+        return UploadQuota.uploads_of(user, specific_date)
 
     @staticmethod
     def _create_test_file(user: u.User):
@@ -83,6 +171,161 @@ class PostFile(m.Model):
         super().save(*args, **kwargs)
 
 
+@receiver(post_save, sender=PostFile)
+def render_post_file_content(sender, instance: PostFile, **kwargs):
+    from . import tasks
+
+    if instance.content_type == PostFile.ContentType.IMAGE:
+        tasks.schedule_renditions(instance, "content", "renditions")
+
+
+@receiver(post_delete, sender=PostFile)
+def release_post_file_content(sender, instance: PostFile, **kwargs):
+    # Also runs for bulk and cascading deletes, unlike 'delete()'.
+    renditions.delete(instance.content.storage, instance.renditions)
+    instance.content.delete(save=False)
+    if instance.post_id is None:
+        UploadQuota.release(instance.user_id, instance.created_at)
+
+
+class UploadQuota(m.Model):
+    """
+    Number of a user's files uploaded on a date which aren't attached
+    to a post yet, so upload capacity is checked without counting rows.
+    """
+
+    user = m.ForeignKey(u.User, on_delete=m.CASCADE)
+    date = m.DateField()
+    uploads = m.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "UploadQuota"
+        verbose_name_plural = "UploadQuotas"
+        constraints = [
+            m.UniqueConstraint(
+                fields=["user", "date"], name="unique_upload_quota"
+            )
+        ]
+
+    @staticmethod
+    def uploads_of(user: u.User, date: date) -> int:
+        return (
+            UploadQuota.objects.filter(user=user, date=date)
+            .values_list("uploads", flat=True)
+            .first()
+            or 0
+        )
+
+    @staticmethod
+    def reserve(user: u.User, date: date, capacity: int) -> bool:
+        """
+        Taking an upload slot if the user hasn't reached 'capacity', the
+        check and increment are a single conditional UPDATE, so parallel
+        uploads can't exceed it.
+        """
+
+        insert_ignore(UploadQuota, user=user, date=date, uploads=0)
+        return bool(
+            UploadQuota.objects.filter(
+                user=user, date=date, uploads__lt=capacity
+            ).update(uploads=m.F("uploads") + 1)
+        )
+
+    @staticmethod
+    def release(user_id: int, date: date, count: int = 1) -> None:
+        UploadQuota.objects.filter(user_id=user_id, date=date).update(
+            uploads=Greatest(m.F("uploads") - count, 0)
+        )
+
+
+class MediaBlob(m.Model):
+    """
+    Reference count of a file in 'ContentAddressedStorage', which is
+    shared by every post file and story with the same content.
+    """
+
+    name = m.CharField(max_length=255, primary_key=True)
+    references = m.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "MediaBlob"
+        verbose_name_plural = "MediaBlobs"
+
+
+def _get_upload_session_expiry():
+    return timezone.now() + timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+
+
+class UploadSession(m.Model):
+    """
+    Resumable chunked upload of a post or story file.
+
+    Chunks are written to a temporary file in 'CHUNKED_UPLOAD_DIR' in
+    order, 'received' is the number of bytes written so far, which is
+    where an interrupted upload resumes from.
+
+    Every written chunk pushes 'expires_at' forward, abandoned sessions
+    and their files are deleted by 'post.tasks.delete_expired_uploads'.
+    """
+
+    id = m.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = m.ForeignKey(u.User, on_delete=m.CASCADE)
+    name = m.CharField(max_length=54)
+    content_type = m.CharField(max_length=20)
+    size = m.PositiveIntegerField()
+    checksum = m.CharField(max_length=64)
+    received = m.PositiveIntegerField(default=0)
+    created_at = m.DateTimeField(auto_now_add=True)
+    expires_at = m.DateTimeField(default=_get_upload_session_expiry)
+
+    class Meta:
+        verbose_name = "UploadSession"
+        verbose_name_plural = "UploadSessions"
+        indexes = [
+            m.Index(
+                fields=["expires_at"], name="upload_session_expires_at_idx"
+            ),
+        ]
+
+    @property
+    def path(self) -> Path:
+        return Path(settings.CHUNKED_UPLOAD_DIR) / self.id.hex
+
+    def delete(self, *args, **kwargs):
+        path = self.path
+        result = super().delete(*args, **kwargs)
+        path.unlink(missing_ok=True)
+        return result
+
+
+class PostQuerySet(m.QuerySet):
+    def for_feed(self, viewer: Optional[u.User] = None) -> "PostQuerySet":
+        """
+        Loading everything 'PostSerializer' needs with a constant
+        number of queries, no matter how many posts are fetched.
+
+        If 'viewer' is provided, posts get annotated with 'is_liked'.
+        """
+
+        comment_model = self.model._meta.get_field("comments").related_model
+        posts = self.select_related("user").prefetch_related(
+            "tags",
+            "postfile_set",
+            m.Prefetch(
+                "comments",
+                queryset=comment_model.objects.select_related("user"),
+            ),
+        )
+        if viewer is None:
+            return posts
+
+        return posts.annotate(
+            is_liked=m.Exists(
+                PostLikes.objects.filter(post=m.OuterRef("pk"), user=viewer)
+            )
+        )
+
+
 class Post(m.Model):
     user = m.ForeignKey(u.User, on_delete=m.CASCADE)
     caption = m.TextField(null=True, blank=True)
@@ -105,15 +348,30 @@ class Post(m.Model):
     hashtags = m.ManyToManyField(
         Hashtag, related_name="posts", symmetrical=False, blank=True
     )
+    is_fanned_out = m.BooleanField(default=True)
+    likes_count = m.IntegerField(default=0)
+    comments_count = m.IntegerField(default=0)
     created_at = m.DateTimeField(auto_now_add=True)
     updated_at = m.DateTimeField(auto_now=True)
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            m.Index(
+                fields=["is_fanned_out", "created_at"],
+                name="post_fanned_out_created_idx",
+            ),
+            m.Index(
+                fields=["user", "created_at"], name="post_user_created_idx"
+            ),
+        ]
 
     @staticmethod
     def _create_test_post(user: u.User, is_active: bool) -> "Post":
         post = Post.objects.create(user=user, is_active=is_active)
+        increment_counters(user, posts_count=1)
         PostFile.objects.create(
             user=user, content="tt", post=post, content_type="gif"
         )
@@ -121,14 +379,88 @@ class Post(m.Model):
 
     @property
     def total_likes(self):
-        return self.likes.count()
+        return self.likes_count
 
     @property
     def total_comments(self):
-        return self.comments.count()
+        return self.comments_count
 
 
 class PostViewsHistory(m.Model):
     user = m.ForeignKey(u.User, on_delete=m.CASCADE)
     post = m.ForeignKey(Post, on_delete=m.CASCADE)
     date = m.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            m.UniqueConstraint(
+                fields=["user", "post"], name="unique_post_view"
+            )
+        ]
+        indexes = [
+            m.Index(fields=["user", "-date"], name="post_view_user_date_idx")
+        ]
+
+
+class TimelineEntry(m.Model):
+    """
+    Materialized timeline inbox, every row is a post which has been
+    pushed into one of the author's followers timeline.
+    """
+
+    user = m.ForeignKey(
+        u.User, on_delete=m.CASCADE, related_name="timeline_entries"
+    )
+    post = m.ForeignKey(
+        Post, on_delete=m.CASCADE, related_name="timeline_entries"
+    )
+    post_created_at = m.DateTimeField()
+
+    class Meta:
+        verbose_name = "TimelineEntry"
+        verbose_name_plural = "TimelineEntries"
+        constraints = [
+            m.UniqueConstraint(
+                fields=["user", "post"], name="unique_timeline_entry"
+            )
+        ]
+        indexes = [
+            m.Index(
+                fields=["user", "-post_created_at", "-post"],
+                name="timeline_user_keyset_idx",
+            ),
+            m.Index(
+                fields=["post_created_at"], name="timeline_post_created_idx"
+            ),
+        ]
+
+
+class HashtagIndexEntry(m.Model):
+    """
+    Hashtag posting lists, every row is a public post containing the
+    hashtag. Lists are kept in recency order by the keyset index, and
+    trimmed to the most recent 'HASHTAG_INDEX_SIZE' posts.
+    """
+
+    hashtag = m.ForeignKey(
+        Hashtag, on_delete=m.CASCADE, related_name="index_entries"
+    )
+    post = m.ForeignKey(
+        Post, on_delete=m.CASCADE, related_name="hashtag_index_entries"
+    )
+    post_created_at = m.DateTimeField()
+
+    class Meta:
+        verbose_name = "HashtagIndexEntry"
+        verbose_name_plural = "HashtagIndexEntries"
+        constraints = [
+            m.UniqueConstraint(
+                fields=["hashtag", "post"], name="unique_hashtag_index_entry"
+            )
+        ]
+        indexes = [
+            m.Index(
+                fields=["hashtag", "-post_created_at", "-post"],
+                name="hashtag_index_keyset_idx",
+            )
+        ]
@@ -1,20 +1,121 @@
 import re
+from collections import Counter
 
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
 from django.db.models import QuerySet
 from rest_framework import serializers
 from user.models import User
-from utils.validators import validate_content
+from utils.exceptions import JsonSerializableValueError
+from utils import renditions
+from utils.model_utils import increment_counters
+from utils.validators import validate_content, validate_content_metadata
 
+from . import core
 from . import models as m
+from . import tasks
 
 # Pattern for extracting extension from file names.
 NAME_EXT_PATTERN = r"^[^.\\/<>%#{}]{1,50}\.(?<=\.)(\w{3,4}$)"
 
 
-class UploadPostFileSerializer(serializers.Serializer):
+class UploadSessionField(serializers.UUIDField):
+    """
+    Id of a finished upload session of the request user, which is
+    resolved into its assembled file after checksum verification.
+    """
+
+    def to_internal_value(self, data) -> core.ChunkedUploadFile:
+        upload_id = super().to_internal_value(data)
+        session = m.UploadSession.objects.filter(
+            pk=upload_id, user=self.context["request"].user
+        ).first()
+        if not session:
+            raise serializers.ValidationError(
+                {"error": "upload not found.", "code": "notFound"}
+            )
+
+        try:
+            return core.ChunkedUploadFile.from_session(session)
+        except JsonSerializableValueError as e:
+            raise serializers.ValidationError(e.message)
+
+    def run_validators(self, value: core.ChunkedUploadFile):
+        # Releasing the file handle whether validation passes or not,
+        # nothing closes it if a later field or validator fails.
+        try:
+            super().run_validators(value)
+        finally:
+            value.close()
+
+
+class ChunkedContentMixin(serializers.Serializer):
+    """
+    File content can either be uploaded directly in 'content', or
+    through a resumable upload session whose id is sent in 'uploadId'.
+    'content' must be the last field of the form, fields after a file
+    that's rejected while streaming are dropped.
+    """
+
     content = serializers.FileField(
-        max_length=54, validators=[validate_content]
+        max_length=54, validators=[validate_content], required=False
     )
+    uploadId = UploadSessionField(
+        source="content",
+        validators=[validate_content],
+        required=False,
+        write_only=True,
+    )
+
+    def validate(self, attrs: dict) -> dict:
+        if "content" not in attrs:
+            # Uploads which are aborted while streaming never reach here.
+            upload_errors = getattr(
+                self.context["request"], "upload_errors", {}
+            )
+            raise serializers.ValidationError(
+                {
+                    "content": upload_errors.get("content")
+                    or {
+                        "error": "either content or uploadId is required.",
+                        "code": "missingContent",
+                    }
+                }
+            )
+        return attrs
+
+
+class UploadPostFileSerializer(ChunkedContentMixin):
+    pass
+
+
+class CreateUploadSessionSerializer(serializers.Serializer):
+    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    name = serializers.CharField(max_length=54)
+    contentType = serializers.CharField(source="content_type")
+    size = serializers.IntegerField(min_value=0)
+    checksum = serializers.RegexField(r"^[0-9a-f]{64}$")
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Validating the file's name, type and size before any chunk is
+        uploaded, its content is sniffed from the first chunk.
+        """
+
+        try:
+            validate_content_metadata(
+                UploadedFile(
+                    name=attrs["name"],
+                    content_type=attrs["content_type"],
+                    size=attrs["size"],
+                )
+            )
+        except serializers.ValidationError as e:
+            raise serializers.ValidationError({"content": e.detail})
+        return attrs
+
+    def create(self, validated_data: dict) -> m.UploadSession:
+        return m.UploadSession.objects.create(**validated_data)
 
 
 class CreatePostSerializer(serializers.Serializer):
@@ -75,56 +176,95 @@ class CreatePostSerializer(serializers.Serializer):
     def to_internal_value(self, data):
         caption = data.get("caption")
         hashtags_pattern = r"(?:\r|^| )(?:\#)([a-z0-9]{1,250})\b"
-        data["hashtags"] = set(re.findall(hashtags_pattern, caption))
+        data["hashtags"] = set(
+            re.findall(hashtags_pattern, caption, re.IGNORECASE)
+        )
         return super().to_internal_value(data)
 
     def validate_hashtags(self, hashtags):
-        hashtags = set(hashtags)
-        db_hashtags_obj = m.Hashtag.objects.filter(title__in=hashtags)
-        db_hashtags = db_hashtags_obj.values_list("title", flat=True)
-        diffs = hashtags.difference(db_hashtags)
-        if not diffs:
-            return db_hashtags_obj.values_list("id", flat=True)
-
-        m.Hashtag.objects.bulk_create(
-            [m.Hashtag(title=title) for title in diffs]
-        )
-
-        # Here the hashtags are updated with the newly created ones
-        # since querysets are  lazy.
-        return db_hashtags_obj.values_list("id", flat=True)
+        return m.Hashtag.objects.bulk_get_or_create(hashtags)
 
     def create(self, validated_data: dict):
         post_files: QuerySet[m.PostFile] = validated_data.pop("files")
 
         tags = validated_data.pop("tags", None)
         hashtags = validated_data.pop("hashtags", None)
-        post = m.Post.objects.create(**validated_data)
+        post = m.Post.objects.create(
+            **validated_data,
+            is_fanned_out=core.TimelineInbox.should_fan_out(
+                validated_data["user"]
+            ),
+        )
 
         # Updating junction table if tags exists.
         if tags:
             post.tags.set(tags)
 
         if hashtags:
-            post.hashtags.set(hashtags)
+            post.hashtags.set(hashtags.values())
+            core.HashtagIndex.add(post, list(hashtags.values()))
+            transaction.on_commit(
+                lambda: core.TrendingHashtags.record(hashtags)
+            )
+
+        # Attached files no longer count against the daily capacity.
+        dates = Counter(post_files.values_list("created_at", flat=True))
+        for created_at, count in dates.items():
+            m.UploadQuota.release(post.user_id, created_at, count)
 
         # Changing PostFile's post values from null to 'post' id.
         post_files.update(post=post)
+        increment_counters(post.user, posts_count=1)
+
+        # Pushing the post into followers timelines once it's committed.
+        if post.is_fanned_out:
+            tasks.fan_out_post.delay_on_commit(post.pk)
         return post
 
 
+class RenditionsField(serializers.ReadOnlyField):
+    """
+    Urls of an image's renditions keyed by width and format, e.g.
+    {"320": {"webp": url, "jpeg": url}}, so clients can pick the right
+    size. It's empty until renditions are generated.
+    """
+
+    def __init__(self, file_field: str, renditions_field: str, **kwargs):
+        self.file_field = file_field
+        self.renditions_field = renditions_field
+        super().__init__(source="*", **kwargs)
+
+    def to_representation(self, instance) -> dict[str, dict[str, str]]:
+        file = getattr(instance, self.file_field)
+        request = self.context.get("request")
+        urls = {}
+        for width, formats in renditions.current(
+            file, getattr(instance, self.renditions_field)
+        ).items():
+            urls[width] = {}
+            for extension, name in formats.items():
+                url = file.storage.url(name)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                urls[width][extension] = url
+        return urls
+
+
 class PostFileSerializer(serializers.ModelSerializer):
     contentType = serializers.CharField(source="content_type")
+    renditions = RenditionsField("content", "renditions")
 
     class Meta:
         model = m.PostFile
-        fields = ["contentType", "content"]
+        fields = ["contentType", "content", "renditions"]
 
 
 class UserMinimalSerializer(serializers.ModelSerializer):
+    profileRenditions = RenditionsField("profile", "profile_renditions")
+
     class Meta:
         model = User
-        fields = ["id", "username", "nickname", "profile"]
+        fields = ["id", "username", "nickname", "profile", "profileRenditions"]
 
 
 class CommentSerializer(serializers.Serializer):
@@ -139,6 +279,9 @@ class PostSerializer(serializers.ModelSerializer):
     tags = UserMinimalSerializer(many=True)
     comments = CommentSerializer(many=True)
     likes = serializers.IntegerField(source="total_likes")
+    isLiked = serializers.BooleanField(
+        source="is_liked", read_only=True, default=False
+    )
     files = PostFileSerializer(many=True, source="postfile_set")
 
     class Meta:
@@ -150,6 +293,7 @@ class PostSerializer(serializers.ModelSerializer):
             "tags",
             "comments",
             "likes",
+            "isLiked",
             "files",
         ]
 
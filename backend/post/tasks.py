@@ -0,0 +1,112 @@
+from celery import shared_task
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Model
+from django.utils import timezone
+
+from utils import renditions
+
+from . import core
+from . import models as m
+
+
+@shared_task
+def fan_out_post(post_id: int) -> int:
+    post = m.Post.objects.filter(pk=post_id).first()
+    if not post:
+        return 0
+
+    return core.TimelineInbox.fan_out(post)
+
+
+@shared_task
+def trim_timeline_inboxes() -> int:
+    return core.TimelineInbox.trim()
+
+
+@shared_task
+def flush_post_views() -> int:
+    return core.PostViewsRecorder.flush()
+
+
+@shared_task
+def delete_expired_uploads() -> int:
+    """
+    Deleting abandoned upload sessions in bounded batches, their partial
+    files are removed once each batch commits. Sessions which are being
+    written to are skipped, a written chunk extends their expiry.
+
+    Returns the number of deleted sessions, a sweep stops after
+    'UPLOAD_SESSION_SWEEP_MAX_BATCHES' and the rest is left to the
+    next one.
+    """
+
+    now = timezone.now()
+    batch_size = settings.UPLOAD_SESSION_SWEEP_BATCH_SIZE
+    deleted = 0
+    for _ in range(settings.UPLOAD_SESSION_SWEEP_MAX_BATCHES):
+        with transaction.atomic():
+            expired = [
+                m.UploadSession(pk=pk)
+                for pk in m.UploadSession.objects.select_for_update(
+                    skip_locked=True
+                )
+                .filter(expires_at__lte=now)
+                .order_by("expires_at")
+                .values_list("pk", flat=True)[:batch_size]
+            ]
+            if not expired:
+                break
+
+            m.UploadSession.objects.filter(
+                pk__in=[session.pk for session in expired]
+            ).delete()
+        for session in expired:
+            session.path.unlink(missing_ok=True)
+        deleted += len(expired)
+    return deleted
+
+
+@shared_task
+def generate_renditions(
+    model: str, pk: int, file_field: str, renditions_field: str
+) -> int:
+    """
+    Generating renditions of an image field, which are saved in
+    'renditions_field' unless the image has changed meanwhile.
+
+    Returns the number of widths generated.
+    """
+
+    model = apps.get_model(model)
+    obj = model.objects.filter(pk=pk).first()
+    if not obj:
+        return 0
+
+    file = getattr(obj, file_field)
+    old = getattr(obj, renditions_field)
+    if not renditions.is_stale(file, old):
+        return 0
+
+    new = renditions.generate(file) if file else {}
+    updated = model.objects.filter(
+        pk=pk, **{file_field: file.name or ""}
+    ).update(**{renditions_field: new})
+    renditions.delete(file.storage, old if updated else new)
+    return len(new.get("widths", {})) if updated else 0
+
+
+def schedule_renditions(
+    instance: Model, file_field: str, renditions_field: str
+) -> None:
+    """
+    Generating renditions after the transaction commits, if the image
+    has changed since they were last generated.
+    """
+
+    file = getattr(instance, file_field)
+    if renditions.is_stale(file, getattr(instance, renditions_field)):
+        generate_renditions.delay_on_commit(
+            instance._meta.label, instance.pk, file_field, renditions_field
+        )
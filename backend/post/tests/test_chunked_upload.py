@@ -0,0 +1,222 @@
+from datetime import timedelta
+from hashlib import sha256
+from unittest import mock
+from uuid import UUID
+
+from django.test import override_settings
+from django.utils import timezone
+
+from post import core
+from post import models as m
+from post import tasks
+from utils.utils_tests import ViewTests, create_image, use_temp_media
+
+CONTENT = create_image()
+
+
+class TestChunkedUpload(ViewTests):
+    def setUp(self):
+        use_temp_media(self)
+        self.user = self.create_user("test")
+        self.set_cookie("token", self.user)
+        self.create_url("post:upload_session", [])
+
+    def create_session(self, checksum: str = None) -> str:
+        res = self.launch_post(
+            {
+                "name": "test.jpg",
+                "contentType": "image/jpg",
+                "size": len(CONTENT),
+                "checksum": checksum or sha256(CONTENT).hexdigest(),
+            }
+        )
+        self.assertEqual(res.status_code, 201, res.json())
+        self.create_url("post:upload_session", [res.json()["id"]])
+        return res.json()["id"]
+
+    def put_chunk(self, start: int, end: int):
+        return self.client.put(
+            self.url,
+            CONTENT[start : end + 1],
+            content_type="application/octet-stream",
+            headers={"Content-Range": f"bytes {start}-{end}/{len(CONTENT)}"},
+        )
+
+    def finalize(self, upload_id: str):
+        self.create_url("post:upload", [])
+        return self.client.put(
+            self.url, {"uploadId": upload_id}, format="multipart"
+        )
+
+    def test_chunked_upload(self):
+        upload_id = self.create_session()
+        for start in range(0, len(CONTENT), 1000):
+            end = min(start + 999, len(CONTENT) - 1)
+            res = self.put_chunk(start, end)
+            self.assertEqual(res.status_code, 200, res.json())
+            self.assertEqual(res.json()["offset"], end + 1)
+
+        session = m.UploadSession.objects.get()
+        res = self.finalize(upload_id)
+        self.assertEqual(res.status_code, 201, res.json())
+
+        post_file = m.PostFile.objects.get(pk=res.json()["id"])
+        self.assertEqual(post_file.user, self.user)
+        self.assertEqual(post_file.content_type, m.PostFile.ContentType.IMAGE)
+        with post_file.content.open("rb") as file:
+            self.assertEqual(file.read(), CONTENT)
+        self.assertFalse(m.UploadSession.objects.exists())
+        self.assertFalse(session.path.exists())
+
+    def test_resume(self):
+        self.create_session()
+        self.put_chunk(0, 999)
+
+        res = self.put_chunk(1500, 2000)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["code"], "invalidOffset")
+        self.assertEqual(res.json()["offset"], 1000)
+
+        res = self.client.get(self.url)
+        self.assertEqual(res.json()["offset"], 1000)
+
+        res = self.put_chunk(1000, len(CONTENT) - 1)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["offset"], len(CONTENT))
+
+    def test_invalid_range(self):
+        self.create_session()
+        res = self.client.put(
+            self.url,
+            CONTENT[:100],
+            content_type="application/octet-stream",
+            headers={"Content-Range": f"bytes 0-199/{len(CONTENT)}"},
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["code"], "invalidRange")
+
+    def test_invalid_length(self):
+        self.create_session()
+        res = self.client.generic(
+            "PUT",
+            self.url,
+            CONTENT[:1000],
+            content_type="application/octet-stream",
+            headers={
+                "Content-Range": f"bytes 0-999/{len(CONTENT)}",
+                "Content-Length": "1e3",
+            },
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["code"], "invalidRange")
+
+    def test_incomplete_upload(self):
+        upload_id = self.create_session()
+        self.put_chunk(0, 999)
+
+        res = self.finalize(upload_id)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["uploadId"]["code"], "incomplete")
+        self.assertFalse(m.PostFile.objects.exists())
+
+    def test_checksum_mismatch(self):
+        upload_id = self.create_session(sha256(b"another").hexdigest())
+        self.put_chunk(0, len(CONTENT) - 1)
+
+        res = self.finalize(upload_id)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["uploadId"]["code"], "checksumMismatch")
+        self.assertFalse(m.PostFile.objects.exists())
+        self.assertFalse(m.UploadSession.objects.exists())
+
+    def test_invalid_file(self):
+        res = self.launch_post(
+            {
+                "name": "test.php",
+                "contentType": "application/php",
+                "size": len(CONTENT),
+                "checksum": sha256(CONTENT).hexdigest(),
+            }
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["content"]["code"], "invalidExtension")
+
+    def test_bogus_first_chunk(self):
+        self.create_session()
+        res = self.client.put(
+            self.url,
+            b"#!/bin/sh" * 200,
+            content_type="application/octet-stream",
+            headers={"Content-Range": f"bytes 0-1799/{len(CONTENT)}"},
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["code"], "invalidContent")
+        self.assertFalse(m.UploadSession.objects.exists())
+
+    def test_another_users_upload(self):
+        self.create_session()
+        self.set_cookie("token", self.create_user("another_test"))
+        res = self.put_chunk(0, 999)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["code"], "notFound")
+
+    def test_file_closed_on_invalid_upload(self):
+        upload_id = self.create_session()
+        self.put_chunk(0, len(CONTENT) - 1)
+        opened = []
+        file_property = core.ChunkedUploadFile.file
+
+        def record(upload):
+            opened.append(file_property.fget(upload))
+            return opened[-1]
+
+        self.create_url("story:upload_story", [])
+        with mock.patch.object(
+            core.ChunkedUploadFile,
+            "file",
+            property(record, file_property.fset),
+        ):
+            res = self.client.post(
+                self.url,
+                {"uploadId": upload_id, "privacy": "normal"},
+                format="multipart",
+            )
+        self.assertEqual(res.status_code, 400)
+        self.assertTrue(opened)
+        self.assertTrue(all(file.closed for file in opened))
+
+    def test_delete_expired_uploads(self):
+        expired = []
+        for _ in range(3):
+            self.create_session()
+            self.put_chunk(0, 999)
+            expired.append(m.UploadSession.objects.latest("created_at"))
+        m.UploadSession.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        upload_id = self.create_session()
+        self.put_chunk(0, 999)
+        with override_settings(
+            UPLOAD_SESSION_SWEEP_BATCH_SIZE=2,
+            UPLOAD_SESSION_SWEEP_MAX_BATCHES=1,
+        ):
+            self.assertEqual(tasks.delete_expired_uploads(), 2)
+        self.assertEqual(tasks.delete_expired_uploads(), 1)
+
+        self.assertEqual(
+            list(m.UploadSession.objects.values_list("pk", flat=True)),
+            [UUID(upload_id)],
+        )
+        self.assertFalse(any(session.path.exists() for session in expired))
+
+    def test_chunk_extends_expiry(self):
+        self.create_session()
+        m.UploadSession.objects.update(
+            expires_at=timezone.now() + timedelta(seconds=1)
+        )
+        self.put_chunk(0, 999)
+        session = m.UploadSession.objects.get()
+        self.assertGreater(
+            session.expires_at, timezone.now() + timedelta(hours=1)
+        )
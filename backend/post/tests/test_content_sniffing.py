@@ -0,0 +1,96 @@
+import struct
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopUpload
+from django.http import HttpRequest
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APITestCase
+
+from utils import media_sniffing
+from utils.upload_handlers import SniffingUploadHandler
+from utils.utils_tests import ViewTests, create_image
+from utils.validators import validate_content
+
+
+def box(box_type: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body) + 8) + box_type + body
+
+
+def create_mp4(width: int, height: int) -> bytes:
+    tkhd = bytes(76) + struct.pack(">II", width << 16, height << 16)
+    trak = box(b"trak", box(b"tkhd", tkhd))
+    moov = box(b"moov", box(b"mvhd", bytes(100)) + trak)
+    return box(b"ftyp", b"isom" + bytes(4) + b"isommp41") + moov + bytes(2048)
+
+
+class TestSniff(APITestCase):
+    def test_images(self):
+        for image_format, kind in (
+            ("PNG", "png"),
+            ("GIF", "gif"),
+            ("JPEG", "jpeg"),
+        ):
+            info = media_sniffing.sniff(create_image(image_format, (64, 48)))
+            self.assertEqual(info, media_sniffing.MediaInfo(kind, 64, 48))
+
+    def test_mp4(self):
+        self.assertEqual(
+            media_sniffing.sniff(create_mp4(1920, 1080)),
+            media_sniffing.MediaInfo("mp4", 1920, 1080),
+        )
+
+        # Dimensions are unknown when 'moov' is after media data.
+        head = box(b"ftyp", b"mp42" + bytes(8)) + box(b"mdat", bytes(1024))
+        self.assertEqual(
+            media_sniffing.sniff(head[:100]), media_sniffing.MediaInfo("mp4")
+        )
+
+    def test_unknown(self):
+        self.assertIsNone(media_sniffing.sniff(b"<?php echo 1; ?>"))
+        self.assertIsNone(media_sniffing.sniff(b""))
+
+    def test_validate_content(self):
+        content = SimpleUploadedFile(
+            "test.png", create_image("JPEG"), "image/png"
+        )
+        with self.assertRaises(ValidationError) as e:
+            validate_content(content)
+        self.assertEqual(e.exception.detail["code"], "invalidContent")
+
+        content = SimpleUploadedFile(
+            "test.gif", create_image("GIF", (10001, 1)), "image/gif"
+        )
+        with self.assertRaises(ValidationError) as e:
+            validate_content(content)
+        self.assertEqual(e.exception.detail["code"], "invalidDimensions")
+
+        content = SimpleUploadedFile(
+            "test.mp4", create_mp4(1280, 720), "video/mp4"
+        )
+        self.assertEqual(validate_content(content).extension, "mp4")
+
+
+class TestStreamingValidation(ViewTests):
+    def setUp(self):
+        self.set_cookie("token", self.create_user("test"))
+        self.create_url("post:upload", [])
+
+    def test_abort_bogus_upload(self):
+        content = SimpleUploadedFile(
+            "test.png", b"MZ" + bytes(5 * 1024 * 1024), "image/png"
+        )
+        res = self.client.put(self.url, {"content": content}, "multipart")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["content"]["code"], "invalidContent")
+
+    def test_other_fields_not_sniffed(self):
+        request = HttpRequest()
+        handler = SniffingUploadHandler(request)
+        handler.new_file("profile", "photo.jpg", "image/jpeg", 2048)
+        data = b"MZ" + bytes(2046)
+        self.assertEqual(handler.receive_data_chunk(data, 0), data)
+
+        handler.new_file("content", "photo.jpg", "image/jpeg", 2048)
+        with self.assertRaises(StopUpload):
+            handler.receive_data_chunk(data, 0)
+        self.assertIn("content", request.upload_errors)
@@ -0,0 +1,50 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from comment.models import Comment
+from post import models as m
+from post.serializers import MinimalPostSerializer, PostSerializer
+from user.models import User
+
+
+class TestFeedQueries(APITestCase):
+    def setUp(self):
+        self.user = User._create_test_user("test")
+        self.another_user = User._create_test_user("another_test")
+
+    def _create_posts(self, count: int) -> None:
+        for _ in range(count):
+            post = m.Post._create_test_post(self.another_user, True)
+            post.tags.add(self.user, self.another_user)
+            m.PostLikes.objects.create(user=self.user, post=post)
+            for user in (self.user, self.another_user):
+                Comment.objects.create(user=user, post=post, content="test")
+
+    def _count_queries(self, serializer_class) -> int:
+        with CaptureQueriesContext(connection) as context:
+            posts = m.Post.objects.for_feed(self.user)
+            data = serializer_class(posts, many=True).data
+        self.assertEqual(len(data), m.Post.objects.count())
+        return len(context.captured_queries)
+
+    def test_constant_queries(self):
+        for serializer_class in (PostSerializer, MinimalPostSerializer):
+            self._create_posts(1)
+            single_post_queries = self._count_queries(serializer_class)
+            self._create_posts(4)
+            self.assertEqual(
+                self._count_queries(serializer_class), single_post_queries
+            )
+
+    def test_is_liked(self):
+        self._create_posts(1)
+        data = PostSerializer(
+            m.Post.objects.for_feed(self.user), many=True
+        ).data
+        self.assertEqual(data[0]["isLiked"], True)
+
+        data = PostSerializer(
+            m.Post.objects.for_feed(self.another_user), many=True
+        ).data
+        self.assertEqual(data[0]["isLiked"], False)
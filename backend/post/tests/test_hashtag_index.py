@@ -0,0 +1,75 @@
+from django.db.models import Q
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from post import core as pc
+from post import models as m
+from user.core import Timeline
+from user.models import User
+
+
+class TestHashtagIndex(APITestCase):
+    def setUp(self):
+        self.user = User._create_test_user("test")
+        self.author = User._create_test_user("author")
+        self.hashtags = [
+            m.Hashtag.objects.create(title=title) for title in ("a", "b")
+        ]
+
+    def _create_post(self, *hashtags: m.Hashtag, author=None) -> m.Post:
+        post = m.Post._create_test_post(author or self.author, True)
+        post.hashtags.set(hashtags)
+        pc.HashtagIndex.add(post, [hashtag.pk for hashtag in hashtags])
+        return post
+
+    def _fetch(self, limit=10, exclude=()) -> list[int]:
+        return [
+            post_id
+            for _, post_id in pc.HashtagIndex.fetch(
+                [hashtag.pk for hashtag in self.hashtags], Q(), limit, exclude
+            )
+        ]
+
+    def test_merge(self):
+        a, b = self.hashtags
+        posts = [
+            self._create_post(a),
+            self._create_post(b),
+            self._create_post(a, b),
+            self._create_post(),
+        ]
+        self.assertEqual(
+            self._fetch(), [posts[2].pk, posts[1].pk, posts[0].pk]
+        )
+        self.assertEqual(self._fetch(limit=2), [posts[2].pk, posts[1].pk])
+        self.assertEqual(
+            self._fetch(exclude=[posts[2].pk]), [posts[1].pk, posts[0].pk]
+        )
+
+    @override_settings(HASHTAG_INDEX_SIZE=2)
+    def test_trim(self):
+        posts = [self._create_post(self.hashtags[0]) for _ in range(3)]
+        self.assertEqual(self._fetch(), [posts[2].pk, posts[1].pk])
+
+    def test_private_author(self):
+        private_author = User._create_test_user("private", True)
+        self._create_post(self.hashtags[0], author=private_author)
+        self.assertEqual(self._fetch(), [])
+
+        private_author.is_private = False
+        pc.HashtagIndex.backfill_author(private_author)
+        self.assertEqual(len(self._fetch()), 1)
+
+        pc.HashtagIndex.remove_author(private_author)
+        self.assertEqual(self._fetch(), [])
+
+    def test_timeline_related_posts(self):
+        liked_post = self._create_post(self.hashtags[0])
+        m.PostLikes.objects.create(user=self.user, post=liked_post)
+        related_post = self._create_post(self.hashtags[0], self.hashtags[1])
+        self._create_post(self.hashtags[1])
+
+        posts = Timeline(self.user).fetch_posts()
+        self.assertEqual(
+            [post.pk for post in posts], [related_post.pk, liked_post.pk]
+        )
@@ -0,0 +1,36 @@
+from rest_framework.test import APITestCase
+
+from post import models as m
+
+
+class TestHashtags(APITestCase):
+    def setUp(self):
+        m.hashtag_id_cache.clear()
+
+    def test_normalize(self):
+        self.assertEqual(m.Hashtag.normalize("#Django"), "django")
+        self.assertEqual(m.Hashtag.normalize("ｆｕｌｌ"), "full")
+
+        hashtag = m.Hashtag.objects.create(title="#Test")
+        self.assertEqual(hashtag.title, "test")
+
+    def test_bulk_get_or_create(self):
+        existing = m.Hashtag.objects.create(title="old")
+
+        ids = m.Hashtag.objects.bulk_get_or_create(["OLD", "new", "#New"])
+        self.assertEqual(ids["old"], existing.pk)
+        self.assertEqual(ids["new"], m.Hashtag.objects.get(title="new").pk)
+        self.assertEqual(m.Hashtag.objects.count(), 2)
+
+    def test_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = m.Hashtag.objects.bulk_get_or_create(["a", "b"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                m.Hashtag.objects.bulk_get_or_create(["A", "b"]), ids
+            )
+
+    def test_rolled_back_hashtags_are_not_cached(self):
+        m.Hashtag.objects.bulk_get_or_create(["a"])
+        self.assertEqual(len(m.hashtag_id_cache), 0)
@@ -0,0 +1,87 @@
+import datetime
+import os
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from post import core as pc
+from post import models as m
+from story import models as sm
+from user.models import User
+from utils.storage import content_storage
+from utils.utils_tests import use_temp_media
+
+CONTENT = "".join(map(str, range(1, 1025))).encode()
+
+
+class TestContentAddressedStorage(TestCase):
+    def setUp(self):
+        use_temp_media(self)
+        self.user = User._create_test_user("test")
+
+    def create_post_file(self, name: str, content: bytes = CONTENT):
+        return m.PostFile.objects.create(
+            user=self.user,
+            content_type="jpg",
+            content=SimpleUploadedFile(name, content, "image/jpg"),
+        )
+
+    def references(self, name: str) -> int:
+        return m.MediaBlob.objects.get(pk=name).references
+
+    def test_deduplication(self):
+        first = self.create_post_file("first.jpg")
+        second = self.create_post_file("second.JPG")
+        another = self.create_post_file("first.jpg", b"another")
+
+        self.assertEqual(first.content.name, second.content.name)
+        self.assertNotEqual(first.content.name, another.content.name)
+        self.assertEqual(self.references(first.content.name), 2)
+        with first.content.open("rb") as file:
+            self.assertEqual(file.read(), CONTENT)
+
+        files = [
+            name
+            for _, _, names in os.walk(content_storage.location)
+            for name in names
+        ]
+        self.assertEqual(len(files), 2)
+
+    def test_release_on_delete(self):
+        first = self.create_post_file("first.jpg")
+        second = self.create_post_file("second.jpg")
+        name = first.content.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.references(name), 1)
+        self.assertTrue(content_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertEqual(self.references(name), 0)
+        self.assertFalse(content_storage.exists(name))
+
+        # Same content is stored again after being removed.
+        post_file = self.create_post_file("test.jpg")
+        self.assertTrue(content_storage.exists(post_file.content.name))
+
+    def test_delete_today_files(self):
+        name = self.create_post_file("first.jpg").content.name
+        self.create_post_file("second.jpg")
+        story = sm.Story.objects.create(
+            user=self.user,
+            content_type="jpg",
+            content=SimpleUploadedFile("story.jpg", CONTENT, "image/jpg"),
+            privacy_type="normal",
+        )
+        self.assertEqual(story.content.name, name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pc.PostFile.delete_today_files(datetime.date.today())
+        self.assertEqual(self.references(name), 1)
+        self.assertTrue(content_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            story.delete()
+        self.assertFalse(content_storage.exists(name))
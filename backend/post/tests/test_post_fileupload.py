@@ -7,12 +7,12 @@ from rest_framework.test import APITestCase
 from post.models import PostFile
 from user.authenticate import generate_jwt_for_test_user
 from user.models import User
-
-ENOUGH_DATA = "".join(map(str, range(1, 1025))).encode()
+from utils.utils_tests import create_image, use_temp_media
 
 
 class TestPostUpload(APITestCase):
     def setUp(self):
+        use_temp_media(self)
         self.url = reverse("post:upload")
         self.token = generate_jwt_for_test_user(User._create_test_user("test"))
         self.client.cookies = SimpleCookie({"token": self.token})
@@ -29,7 +29,7 @@ class TestPostUpload(APITestCase):
 
     def test_regular_upload(self):
         data = dict(
-            content=SimpleUploadedFile("test.jpg", ENOUGH_DATA, "image/jpg")
+            content=SimpleUploadedFile("test.jpg", create_image(), "image/jpg")
         )
         res = self.launch(data)
         self.assertEqual(
@@ -108,7 +108,9 @@ class TestPostUpload(APITestCase):
 
     def test_post_with_tags(self):
         data = dict(
-            content=SimpleUploadedFile("test.jpg", ENOUGH_DATA, "image/jpg"),
+            content=SimpleUploadedFile(
+                "test.jpg", create_image(), "image/jpg"
+            ),
             tags=["test"],
         )
         res = self.launch(data)
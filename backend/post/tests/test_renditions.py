@@ -0,0 +1,104 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from PIL import Image
+
+from post import models as m
+from post import serializers as s
+from post import tasks
+from user.models import User
+from utils.utils_tests import create_image, use_temp_media
+
+
+class TestRenditions(TestCase):
+    def setUp(self):
+        use_temp_media(self, RENDITION_WIDTHS=[100, 200, 1000])
+        self.user = User._create_test_user("test")
+
+    def create_post_file(self) -> m.PostFile:
+        with self.captureOnCommitCallbacks() as callbacks:
+            post_file = m.PostFile.objects.create(
+                user=self.user,
+                content_type="png",
+                content=SimpleUploadedFile(
+                    "test.png", create_image("PNG", (400, 300)), "image/png"
+                ),
+            )
+        self.assertEqual(len(callbacks), 1)
+        return post_file
+
+    def test_generate(self):
+        post_file = self.create_post_file()
+        data = s.PostFileSerializer(post_file).data
+        self.assertEqual(data["renditions"], {})
+
+        generated = tasks.generate_renditions(
+            "post.PostFile", post_file.pk, "content", "renditions"
+        )
+        self.assertEqual(generated, 2)
+        post_file.refresh_from_db()
+
+        renditions = s.PostFileSerializer(post_file).data["renditions"]
+        self.assertEqual(list(renditions), ["100", "200"])
+        self.assertEqual(list(renditions["100"]), ["webp", "jpeg"])
+
+        name = post_file.renditions["widths"]["100"]["webp"]
+        with post_file.content.storage.open(name) as file:
+            image = Image.open(file)
+            self.assertEqual(image.format, "WEBP")
+            self.assertEqual(image.size, (100, 75))
+
+        # Renditions which are up to date aren't generated again.
+        self.assertEqual(
+            tasks.generate_renditions(
+                "post.PostFile", post_file.pk, "content", "renditions"
+            ),
+            0,
+        )
+
+    def test_release_on_delete(self):
+        post_file = self.create_post_file()
+        tasks.generate_renditions(
+            "post.PostFile", post_file.pk, "content", "renditions"
+        )
+        post_file.refresh_from_db()
+        name = post_file.renditions["widths"]["200"]["jpeg"]
+        self.assertTrue(post_file.content.storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post_file.delete()
+        self.assertFalse(post_file.content.storage.exists(name))
+
+    def test_profile(self):
+        self.user.save()
+        self.assertEqual(self.user.profile_renditions, {})
+
+        self.user.profile = SimpleUploadedFile(
+            "profile.jpg", create_image(size=(300, 300)), "image/jpeg"
+        )
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.save(update_fields=["profile"])
+        # Forgetting cached auth snapshot, then scheduling renditions.
+        self.assertEqual(len(callbacks), 2)
+
+        tasks.generate_renditions(
+            "user.User", self.user.pk, "profile", "profile_renditions"
+        )
+        self.user.refresh_from_db()
+        old = self.user.profile_renditions["widths"]["100"]["webp"]
+        data = s.UserMinimalSerializer(self.user).data
+        self.assertEqual(list(data["profileRenditions"]), ["100", "200"])
+
+        # Renditions of the previous profile are replaced.
+        self.user.profile = SimpleUploadedFile(
+            "another.png", create_image("PNG", (150, 150)), "image/png"
+        )
+        self.user.save()
+        data = s.UserMinimalSerializer(self.user).data
+        self.assertEqual(data["profileRenditions"], {})
+
+        tasks.generate_renditions(
+            "user.User", self.user.pk, "profile", "profile_renditions"
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(list(self.user.profile_renditions["widths"]), ["100"])
+        self.assertFalse(self.user.profile.storage.exists(old))
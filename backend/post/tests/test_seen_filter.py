@@ -0,0 +1,92 @@
+from unittest import mock
+
+from rest_framework.test import APITestCase
+
+from post import core as pc
+from post import models as pm
+from user.models import User
+from utils.bloom_filter import RotatingBloomFilter
+from utils.utils_tests import use_fake_redis
+
+
+class TestSeenFilter(APITestCase):
+    def test_parameters(self):
+        seen_filter = RotatingBloomFilter(None, "test", 10000, 0.01, 60, 7)
+        self.assertEqual(seen_filter.size, 95851)
+        self.assertEqual(seen_filter.hashes, 7)
+
+        positions = seen_filter._positions(1)
+        self.assertEqual(positions, seen_filter._positions(1))
+        self.assertEqual(len(set(positions)), seen_filter.hashes)
+        self.assertTrue(all(0 <= p < seen_filter.size for p in positions))
+
+    def test_window_rotation(self):
+        seen_filter = RotatingBloomFilter(None, "test", 10, 0.01, 60, 3)
+        self.assertEqual(
+            seen_filter._window_keys(now=125),
+            ["test:2", "test:1", "test:0"],
+        )
+
+    def test_database_fallback(self):
+        user = User._create_test_user("test")
+        posts = [pm.Post._create_test_post(user, True) for _ in range(3)]
+
+        pc.PostViewsRecorder.record(user.pk, [posts[0].pk, posts[2].pk])
+        self.assertEqual(
+            pc.PostViewsRecorder.seen_post_ids(
+                user.pk, [post.pk for post in posts]
+            ),
+            {posts[0].pk, posts[2].pk},
+        )
+
+
+class TestRedisSeenFilter(APITestCase):
+    def setUp(self):
+        self.redis = use_fake_redis(self)
+        self.user = User._create_test_user("test")
+
+    def test_add_and_contains(self):
+        seen_filter = RotatingBloomFilter(self.redis, "test", 100, 0.01, 60, 3)
+        seen_filter.add(range(50))
+        self.assertTrue(all(seen_filter.contains(list(range(50)))))
+        self.assertEqual(sum(seen_filter.contains(list(range(50, 150)))), 0)
+
+    def test_rotation(self):
+        seen_filter = RotatingBloomFilter(self.redis, "test", 100, 0.01, 60, 2)
+        with mock.patch("time.time", return_value=0):
+            seen_filter.add([1])
+        with mock.patch("time.time", return_value=60):
+            seen_filter.add([2])
+            self.assertEqual(seen_filter.contains([1, 2]), [True, True])
+        with mock.patch("time.time", return_value=120):
+            self.assertEqual(seen_filter.contains([1, 2]), [False, True])
+
+    def test_error_rate_after_load(self):
+        seen_filter = RotatingBloomFilter(
+            self.redis, "test", 1000, 0.01, 60, 1
+        )
+        seen_filter.load(range(1000))
+        seen_filter.add(range(1000, 2000))
+        self.assertTrue(all(seen_filter.contains(list(range(2000)))))
+
+        # Each bitmap holds its capacity, so lookups over both of them
+        # stay within about twice the error rate.
+        false_positives = sum(seen_filter.contains(list(range(2000, 7000))))
+        self.assertLess(false_positives / 5000, 0.025)
+
+    def test_recorded_views(self):
+        posts = [pm.Post._create_test_post(self.user, True) for _ in range(3)]
+        post_ids = [post.pk for post in posts]
+        pm.PostViewsHistory.objects.create(user=self.user, post=posts[0])
+
+        # Views written before the filter existed are loaded into it.
+        pc.PostViewsRecorder.record(self.user.pk, [posts[1].pk])
+        self.assertEqual(
+            pc.PostViewsRecorder.seen_post_ids(self.user.pk, post_ids),
+            {posts[0].pk, posts[1].pk},
+        )
+
+        self.assertEqual(pc.PostViewsRecorder.flush(), 1)
+        self.assertTrue(
+            pm.PostViewsHistory.objects.filter(post=posts[1]).exists()
+        )
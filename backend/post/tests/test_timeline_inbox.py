@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from post import core as c
+from post import models as m
+from user.core import Follow, Timeline
+from user.models import User
+
+
+class TestTimelineInbox(APITestCase):
+    def setUp(self):
+        self.author = User._create_test_user("author")
+        self.follower = User._create_test_user("follower")
+        follow = Follow(self.author.pk, self.follower)
+        follow.is_valid() and follow.follow_user()
+        self.author.refresh_from_db()
+
+    def test_fan_out(self):
+        post = m.Post._create_test_post(self.author, True)
+        self.assertEqual(c.TimelineInbox.fan_out(post), 1)
+        entries = self.follower.timeline_entries.values_list("post_id")
+        self.assertEqual(list(entries), [(post.pk,)])
+        self.assertEqual(Timeline(self.follower).fetch_posts(), [post])
+
+    def test_backfill_and_remove(self):
+        post = m.Post._create_test_post(self.author, True)
+        another_follower = User._create_test_user("another")
+        c.TimelineInbox.backfill(self.author, [another_follower.pk])
+        self.assertEqual(Timeline(another_follower).fetch_posts(), [post])
+
+        c.TimelineInbox.remove(self.author, another_follower)
+        self.assertEqual(another_follower.timeline_entries.count(), 0)
+
+    @override_settings(TIMELINE_TRIM_BATCH_SIZE=2, TIMELINE_TRIM_MAX_BATCHES=1)
+    def test_trim(self):
+        posts = [m.Post._create_test_post(self.author, True) for _ in range(4)]
+        for post in posts:
+            c.TimelineInbox.fan_out(post)
+        old = timezone.now() - c.TimelineInbox.WINDOW - timedelta(minutes=1)
+        m.TimelineEntry.objects.filter(post__in=posts[:3]).update(
+            post_created_at=old
+        )
+
+        self.assertEqual(c.TimelineInbox.trim(), 2)
+        self.assertEqual(c.TimelineInbox.trim(), 1)
+        self.assertEqual(c.TimelineInbox.trim(), 0)
+        entries = self.follower.timeline_entries.values_list("post_id")
+        self.assertEqual(list(entries), [(posts[3].pk,)])
+
+    @override_settings(TIMELINE_FANOUT_THRESHOLD=0)
+    def test_fan_out_on_read(self):
+        self.assertEqual(c.TimelineInbox.should_fan_out(self.author), False)
+        post = m.Post._create_test_post(self.author, True)
+        post.is_fanned_out = False
+        post.save()
+
+        self.assertEqual(c.TimelineInbox.fan_out(post), 0)
+        self.assertEqual(self.follower.timeline_entries.count(), 0)
+        self.assertEqual(Timeline(self.follower).fetch_posts(), [post])
+
+    def test_seen_posts_are_skipped(self):
+        post = m.Post._create_test_post(self.author, True)
+        c.TimelineInbox.fan_out(post)
+        post.viewers.add(self.follower)
+        self.assertEqual(list(Timeline(self.follower).fetch_posts()), [])
@@ -0,0 +1,67 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from post import core as pc
+from utils.utils_tests import use_fake_redis
+
+
+class TestTrendingHashtags(APITestCase):
+    def setUp(self):
+        pc.TrendingHashtags._buckets.clear()
+
+    def test_decayed_top(self):
+        now = 1_000_000
+        pc.TrendingHashtags.record(["old"] * 3, now - 6 * 3600)
+        pc.TrendingHashtags.record(["new", "new", "other"], now)
+
+        top = pc.TrendingHashtags.top("24h", 2, now)
+        self.assertEqual([title for title, _ in top], ["new", "old"])
+        self.assertLess(top[1][1], 3)
+
+        self.assertEqual(
+            [title for title, _ in pc.TrendingHashtags.top("1h", 10, now)],
+            ["new", "other"],
+        )
+
+    def test_sliding_window(self):
+        now = 1_000_000
+        pc.TrendingHashtags.record(["test"], now)
+        self.assertEqual(pc.TrendingHashtags.top("1h", 10, now + 3600), [])
+        self.assertEqual(
+            len(pc.TrendingHashtags.top("24h", 10, now + 3600)), 1
+        )
+
+    def test_view(self):
+        pc.TrendingHashtags.record(["test", "test", "another"])
+        res = self.client.get(
+            reverse("post:trending_hashtags"), {"window": "1h", "limit": 1}
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["hashtags"][0]["title"], "test")
+        self.assertEqual(len(res.json()["hashtags"]), 1)
+
+        # Zero limit is clamped, rather than meaning the whole window.
+        res = self.client.get(
+            reverse("post:trending_hashtags"), {"window": "1h", "limit": 0}
+        )
+        self.assertEqual(len(res.json()["hashtags"]), 1)
+
+        res = self.client.get(
+            reverse("post:trending_hashtags"), {"window": "1y"}
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["code"], "invalidWindow")
+
+
+class TestRedisTrendingHashtags(APITestCase):
+    def setUp(self):
+        use_fake_redis(self)
+
+    def test_top(self):
+        now = 1_000_000
+        pc.TrendingHashtags.record(["old"] * 3, now - 6 * 3600)
+        pc.TrendingHashtags.record(["new", "new", "other"], now)
+
+        top = pc.TrendingHashtags.top("24h", 2, now)
+        self.assertEqual([title for title, _ in top], ["new", "old"])
+        self.assertEqual(pc.TrendingHashtags.top("24h", 0, now), [])
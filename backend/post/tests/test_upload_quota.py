@@ -0,0 +1,72 @@
+from datetime import date
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from post import core
+from post import models as m
+from utils.utils_tests import ViewTests, create_image, use_temp_media
+
+
+class TestUploadQuota(ViewTests):
+    def setUp(self):
+        use_temp_media(self)
+        self.user = self.create_user("test")
+        self.set_cookie("token", self.user)
+        self.create_url("post:upload", [])
+
+    def upload(self):
+        content = SimpleUploadedFile("test.jpg", create_image(), "image/jpg")
+        return self.client.put(self.url, {"content": content}, "multipart")
+
+    def test_capacity(self):
+        for total in range(1, 11):
+            res = self.upload()
+            self.assertEqual(res.status_code, 201, res.json())
+            self.assertEqual(res.json()["totalUploads"], total)
+
+        res = self.upload()
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["code"], "capacity")
+        self.assertEqual(m.PostFile.objects.count(), 10)
+        self.assertEqual(m.UploadQuota.uploads_of(self.user, date.today()), 10)
+
+    def test_reserve(self):
+        m.UploadQuota.reserve(self.user, date.today(), 2)
+        self.assertTrue(m.UploadQuota.reserve(self.user, date.today(), 2))
+        self.assertFalse(m.UploadQuota.reserve(self.user, date.today(), 2))
+        self.assertEqual(m.UploadQuota.uploads_of(self.user, date.today()), 2)
+
+    def test_released_on_delete(self):
+        self.upload()
+        self.upload()
+        m.PostFile.objects.first().delete()
+        self.assertEqual(m.UploadQuota.uploads_of(self.user, date.today()), 1)
+
+    def test_other_users_uploads(self):
+        another = self.create_user("another_test")
+        m.UploadQuota.objects.create(
+            user=another, date=date.today(), uploads=10
+        )
+
+        res = self.upload()
+        self.assertEqual(res.status_code, 201, res.json())
+        self.assertEqual(res.json()["totalUploads"], 1)
+
+    def test_filled_after_validation(self):
+        is_valid = core.PostFileValidator.is_valid
+
+        def fill_after_validating(validator):
+            valid = is_valid(validator)
+            # Another request takes the last slots meanwhile.
+            m.UploadQuota.objects.filter(user=self.user).update(uploads=10)
+            return valid
+
+        m.UploadQuota.objects.create(user=self.user, date=date.today())
+        with mock.patch.object(
+            core.PostFileValidator, "is_valid", fill_after_validating
+        ):
+            res = self.upload()
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["code"], "capacity")
+        self.assertFalse(m.PostFile.objects.exists())
@@ -0,0 +1,56 @@
+from post import models as m
+from utils.utils_tests import ViewTests
+
+
+class TestViewPost(ViewTests):
+    def setUp(self):
+        self.user = self.create_user("test")
+        self.another_user = self.create_user("another_test", True)
+        self.post = m.Post._create_test_post(self.another_user, True)
+        self.create_url("post:view_post", [self.post.pk])
+        self.set_cookie("token", self.user)
+
+    def test_private_post(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 403)
+        self.assertEqual(self.post.viewers.count(), 0)
+
+    def test_view_post(self):
+        self.another_user.followers.add(self.user)
+
+        for _ in range(2):
+            res = self.client.get(self.url)
+            self.assertEqual(res.status_code, 200, res.content)
+            self.assertEqual(res.json()["id"], self.post.pk)
+        self.assertEqual(list(self.post.viewers.all()), [self.user])
+
+    def test_owner_private_post(self):
+        self.set_cookie("token", self.another_user)
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200, res.content)
+
+    def test_invalid_post(self):
+        self.create_url("post:view_post", [self.post.pk + 1])
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(res["Content-Type"], "application/json")
+
+    def test_method_not_allowed(self):
+        res = self.launch_post()
+        self.assertEqual(res.status_code, 405)
+
+    def test_without_token(self):
+        self.client.cookies.clear()
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 302)
+
+    def test_anonymous_view(self):
+        self.create_url("post:view_post_anonymously", [self.post.pk])
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 404)
+
+        self.another_user.is_private = False
+        self.another_user.save()
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["id"], self.post.pk)
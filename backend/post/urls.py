@@ -11,6 +11,17 @@ urlpatterns = [
         views.view_post_anonymously,
         name="view_post_anonymously",
     ),
+    path("uploads/", views.upload_session, name="upload_session"),
+    path(
+        "uploads/<uuid:upload_id>/",
+        views.upload_session,
+        name="upload_session",
+    ),
+    path(
+        "trending-hashtags/",
+        views.trending_hashtags,
+        name="trending_hashtags",
+    ),
     path("<int:post_id>/", views.view_post, name="view_post"),
     path("like/<int:post_id>/", views.like, name="like"),
     path("comment/<int:post_id>/", views.add_comment, name="add_comment"),
@@ -1,10 +1,11 @@
 from datetime import date
 
-from django.shortcuts import get_object_or_404
+from django.shortcuts import aget_object_or_404, get_object_or_404
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from user.authenticate import authenticate
+from utils.view_utils import async_api_view
 
 from . import core
 from . import models as m
@@ -22,36 +23,46 @@ def upload(request):
     be used in post creation api.
 
     Request body schema:
-        'content' (str): file content.
+        'content' (str): file content, sent as the last field since
+            fields after a rejected file are dropped.
+        'uploadId' (Optional[str]): id of a finished upload session,
+            instead of 'content', see 'upload_session'.
     """
 
     UPLOAD_CAPACITY = 10
 
     if request.method == "PUT":
-        serializer = s.UploadPostFileSerializer(data=request.FILES)
-        if not serializer.is_valid():
-            return Response(serializer.errors, status.HTTP_400_BAD_REQUEST)
-
+        # Capacity is checked before 'request.data' is accessed, so the
+        # body of a rejected upload isn't read.
         post_file_validator = core.PostFileValidator(
             request.user, UPLOAD_CAPACITY, date.today()
         )
+        if not post_file_validator.is_valid():
+            return Response(
+                post_file_validator.errors, status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = s.UploadPostFileSerializer(
+            data=request.data, context={"request": request}
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
         post_file = core.PostFile(
             **serializer.validated_data, validator=post_file_validator
         )
-        if not post_file.validator.is_valid():
+        id = post_file.upload_file()
+        if id is None:
             return Response(
                 post_file.validator.errors, status.HTTP_400_BAD_REQUEST
             )
 
-        id = post_file.upload_file()
         return Response(
             {
                 "message": "file successfully uploaded.",
                 "id": id,
                 "capacity": UPLOAD_CAPACITY,
-                "totalUploads": m.PostFile.specific_date_uploads(
-                    request.user, date.today()
-                ),
+                "totalUploads": post_file_validator.total_uploads,
             },
             status.HTTP_201_CREATED,
         )
@@ -71,6 +82,71 @@ def upload(request):
     )
 
 
+@api_view(["POST", "GET", "PUT"])
+@authenticate
+def upload_session(request, upload_id=None):
+    """
+    Resumable chunked uploads for post and story files.
+
+    'POST' creates a session, request schema can be found in
+    'CreateUploadSessionSerializer', 'checksum' is the file's sha256
+    hex digest.
+
+    'PUT' writes the next chunk of the file, raw bytes are sent in the
+    body with a 'Content-Range' header, e.g. 'bytes 0-1048575/5242880'.
+    'GET' returns the current offset, where an interrupted upload must
+    resume from.
+
+    After the last chunk, session's id is sent as 'uploadId' to the post
+    file or story upload apis.
+    """
+
+    if request.method == "POST":
+        serializer = s.CreateUploadSessionSerializer(
+            data=request.data, context={"request": request}
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+        session = serializer.save()
+        return Response(
+            {"id": session.pk, "offset": session.received},
+            status.HTTP_201_CREATED,
+        )
+
+    if request.method == "GET":
+        session = get_object_or_404(
+            m.UploadSession, pk=upload_id, user=request.user
+        )
+        return Response(
+            {
+                "id": session.pk,
+                "offset": session.received,
+                "size": session.size,
+            },
+            status.HTTP_200_OK,
+        )
+
+    upload_chunk = core.UploadChunk(
+        request.user,
+        upload_id,
+        request.headers.get("Content-Range", ""),
+        request.headers.get("Content-Length", ""),
+        request.stream,
+    )
+    if not upload_chunk.is_valid():
+        return Response(upload_chunk.errors, status.HTTP_400_BAD_REQUEST)
+
+    offset = upload_chunk.write()
+    if offset is None:
+        return Response(upload_chunk.errors, status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        {"id": upload_id, "offset": offset, "size": upload_chunk.session.size},
+        status.HTTP_200_OK,
+    )
+
+
 @api_view(["PUT", "DELETE"])
 @authenticate
 def like(request, post_id):
@@ -86,7 +162,11 @@ def like(request, post_id):
                 like_post_proccess.errors, status.HTTP_400_BAD_REQUEST
             )
 
-        like_post_proccess.like_post()
+        if not like_post_proccess.like_post():
+            return Response(
+                like_post_proccess.errors, status.HTTP_400_BAD_REQUEST
+            )
+
         return Response(
             {"message": "post liked successfully."}, status.HTTP_201_CREATED
         )
@@ -103,15 +183,18 @@ def like(request, post_id):
         )
 
 
-@api_view(["GET"])
-def view_post_anonymously(request, post_id):
+@async_api_view(["GET"])
+async def view_post_anonymously(request, post_id):
     """
     Users can see a public non archived post anonymously from
     this endpoint.
     """
 
-    post = get_object_or_404(
-        m.Post, pk=post_id, is_active=True, user__is_private=False
+    post = await aget_object_or_404(
+        m.Post.objects.for_feed(),
+        pk=post_id,
+        is_active=True,
+        user__is_private=False,
     )
     serializer = s.PostSerializer(post)
     return Response(serializer.data, status.HTTP_200_OK)
@@ -163,26 +246,61 @@ def add_comment(request, post_id):
         )
 
 
-@api_view(["GET"])
+@async_api_view(["GET"])
 @authenticate
-def view_post(request, post_id):
+async def view_post(request, post_id):
     """
     Authenticated post viewing, the purpose is to let post owners
     see their archived posts as well, and also post viewers will
     get updated so users won't see duplicate posts in their timeline.
     """
 
-    post = get_object_or_404(m.Post, pk=post_id)
+    post = await aget_object_or_404(
+        m.Post.objects.for_feed(request.user), pk=post_id
+    )
     is_owner = post.user == request.user
 
     if not post.is_active and not is_owner:
         return Response(status=status.HTTP_404_NOT_FOUND)
 
-    if post.user.is_private:
-        if not post.user.followers.filter(pk=request.user.pk):
-            return Response(status=status.HTTP_403_FORBIDDEN)
+    if not await request.user.acan_view(post.user):
+        return Response(status=status.HTTP_403_FORBIDDEN)
 
     if not is_owner:
-        post.viewers.add(request.user)
+        await core.PostViewsRecorder.arecord(request.user.pk, [post.pk])
 
     return Response(s.PostSerializer(post).data, status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+def trending_hashtags(request):
+    """
+    Returns top trending hashtags, recent usages weigh more than the
+    older ones.
+
+    Query parameters:
+        'window' (Optional[str]): One of '1h', '24h' or '7d', defaults
+            to '24h'.
+        'limit' (Optional[int]): Number of hashtags, at most 100.
+    """
+
+    window = request.query_params.get("window", "24h")
+    if window not in core.TrendingHashtags.WINDOWS:
+        return Response(
+            {"error": "invalid window.", "code": "invalidWindow"},
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    limit = request.query_params.get("limit", "")
+    limit = min(max(int(limit), 1), 100) if limit.isdigit() else 10
+    hashtags = core.TrendingHashtags.top(window, limit)
+    return Response(
+        {
+            "window": window,
+            "hashtags": [
+                {"title": title, "score": round(score, 2)}
+                for title, score in hashtags
+            ],
+        },
+        status.HTTP_200_OK,
+    )
@@ -0,0 +1,129 @@
+import datetime
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from user import models as u
+from user.core import FollowGraph
+
+from . import models as m
+
+
+@dataclass(frozen=True)
+class StoryAudience:
+    """
+    Sets of user ids which decide whose stories a viewer can see, they
+    are cached per viewer and forgotten whenever one of them changes.
+    Followings are kept by 'FollowGraph'.
+
+    Attributes:
+        close_friend_of: Users who have the viewer in their close friends.
+        hidden_by: Users who hide their stories from the viewer.
+    """
+
+    close_friend_of: frozenset[int]
+    hidden_by: frozenset[int]
+
+    @staticmethod
+    def cache_key(user_id: int) -> str:
+        return f"story:audience:{user_id}"
+
+    @classmethod
+    def of(cls, user: u.User) -> "StoryAudience":
+        key = cls.cache_key(user.pk)
+        if (audience := cache.get(key)) is not None:
+            return audience
+
+        audience = cls(
+            close_friend_of=frozenset(
+                user.followings_close_friends.values_list("pk", flat=True)
+            ),
+            hidden_by=frozenset(
+                user.followings_hide_story.values_list("pk", flat=True)
+            ),
+        )
+        cache.set(key, audience, settings.STORY_AUDIENCE_CACHE_TTL)
+        return audience
+
+    @classmethod
+    def forget(cls, user_ids: Iterable[int]) -> None:
+        cache.delete_many([cls.cache_key(user_id) for user_id in user_ids])
+
+
+@dataclass
+class TrayEntry:
+    """
+    Attributes:
+        user: Author of the stories.
+        stories: Ids of visible active stories, oldest first.
+        unseen: Whether the viewer hasn't seen some of the stories.
+        latest: Expiry of the most recent story.
+    """
+
+    user: Optional[u.User] = None
+    stories: list[int] = field(default_factory=list)
+    unseen: bool = False
+    latest: Optional[datetime.datetime] = None
+
+
+@dataclass
+class StoryTray:
+    """
+    Followings of a user which have active stories they can see, with
+    unseen ones first, then the most recent ones.
+
+    Visible authors are found with set operations over the followings
+    from 'FollowGraph' and the cached 'StoryAudience', so whole tray
+    costs a fixed number of queries no matter how many stories it holds.
+    """
+
+    user: u.User
+
+    def fetch(self) -> list[TrayEntry]:
+        audience = StoryAudience.of(self.user)
+        followings = FollowGraph.followings(self.user.pk)
+        authors = followings - audience.hidden_by
+        if not authors:
+            return []
+
+        stories = (
+            m.Story.active(timezone.now())
+            .filter(user_id__in=authors)
+            .order_by("active_until")
+            .values_list("pk", "user_id", "privacy_type", "active_until")
+        )
+        entries: dict[int, TrayEntry] = {}
+        for pk, author_id, privacy_type, active_until in stories:
+            if (
+                privacy_type == m.Story.PrivacyType.CLOSE_FRIEND
+                and author_id not in audience.close_friend_of
+            ):
+                continue
+
+            entry = entries.setdefault(author_id, TrayEntry())
+            entry.stories.append(pk)
+            entry.latest = active_until
+        if not entries:
+            return []
+
+        story_ids = [pk for entry in entries.values() for pk in entry.stories]
+        seen = set(
+            m.StoryViews.objects.filter(
+                user=self.user, story_id__in=story_ids
+            ).values_list("story_id", flat=True)
+        )
+        users = u.User.objects.only(
+            "id", "username", "nickname", "profile", "profile_renditions"
+        ).in_bulk(entries.keys())
+        for author_id, entry in entries.items():
+            entry.user = users[author_id]
+            entry.unseen = not seen.issuperset(entry.stories)
+
+        return sorted(
+            entries.values(),
+            key=lambda entry: (entry.unseen, entry.latest),
+            reverse=True,
+        )
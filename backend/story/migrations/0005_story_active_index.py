@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('story', '0004_alter_story_content'),
+        ('user', '0013_follow_follower_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='story',
+            index=models.Index(fields=['user', 'active_until'], name='story_user_active_until_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:43
+
+from django.db import migrations, models
+
+
+def delete_duplicates(model_name, fields):
+    """
+    Keeping only the oldest row of each duplicate group, so the unique
+    constraint can be created.
+    """
+
+    def operation(apps, schema_editor):
+        model = apps.get_model(*model_name.split("."))
+        keep = (
+            model.objects.values(*fields)
+            .annotate(keep_id=models.Min("id"))
+            .values("keep_id")
+        )
+        model.objects.exclude(id__in=keep).delete()
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('story', '0005_story_active_index'),
+        ('user', '0014_follow_unique_follow'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            delete_duplicates("story.StoryViews", ("story", "user")),
+            migrations.RunPython.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='storyviews',
+            constraint=models.UniqueConstraint(fields=('story', 'user'), name='unique_story_view'),
+        ),
+    ]
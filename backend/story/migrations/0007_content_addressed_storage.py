@@ -0,0 +1,50 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:58
+
+from collections import Counter
+
+import utils.model_utils
+import utils.storage
+from django.db import migrations, models
+
+
+def count_references(apps, schema_editor):
+    """
+    Counting references of files which are already stored, so they are
+    released like content addressed ones.
+    """
+
+    MediaBlob = apps.get_model("post", "MediaBlob")
+    references = Counter()
+    for model in (
+        apps.get_model("post", "PostFile"),
+        apps.get_model("story", "Story"),
+    ):
+        references.update(
+            model.objects.exclude(content="").values_list("content", flat=True)
+        )
+
+    MediaBlob.objects.bulk_create(
+        [
+            MediaBlob(name=name, references=count)
+            for name, count in references.items()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0016_content_addressed_storage'),
+        ('story', '0006_storyviews_unique_story_view'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='story',
+            name='content',
+            field=models.FileField(max_length=255, storage=utils.storage.ContentAddressedStorage(), upload_to=utils.model_utils.generate_media_path),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
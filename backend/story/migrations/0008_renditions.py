@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('story', '0007_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='story',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
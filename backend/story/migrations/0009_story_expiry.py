@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('story', '0008_renditions'),
+        ('user', '0015_renditions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='story',
+            index=models.Index(fields=['active_until'], name='story_active_until_idx'),
+        ),
+    ]
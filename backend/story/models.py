@@ -1,20 +1,33 @@
 import datetime
+from typing import Optional
 
-from utils.model_utils import generate_path
+from django.utils import timezone
+from utils import renditions
+from utils.model_utils import generate_media_path
+from utils.storage import content_storage
 from django.db import models as m
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 from user import models as u
 
 # Create your models here.
 
 
 def _get_story_lifetime():
-    return datetime.datetime.now() + datetime.timedelta(days=1)
+    return timezone.now() + datetime.timedelta(days=1)
 
 
 class StoryViews(m.Model):
     story = m.ForeignKey("Story", on_delete=m.CASCADE)
     user = m.ForeignKey(u.User, on_delete=m.CASCADE)
 
+    class Meta:
+        constraints = [
+            m.UniqueConstraint(
+                fields=["story", "user"], name="unique_story_view"
+            )
+        ]
+
 
 class Story(m.Model):
 
@@ -29,8 +42,9 @@ class Story(m.Model):
     user = m.ForeignKey(u.User, on_delete=m.CASCADE)
     content_type = m.CharField(choices=ContentType.choices, max_length=3)
     content = m.FileField(
-        upload_to=generate_path
+        upload_to=generate_media_path, storage=content_storage, max_length=255
     )
+    renditions = m.JSONField(default=dict, blank=True)
     caption = m.TextField(null=True, blank=True)
     privacy_type = m.CharField(choices=PrivacyType.choices, max_length=3)
     active_until = m.DateTimeField(default=_get_story_lifetime)
@@ -44,6 +58,15 @@ class Story(m.Model):
         u.User, related_name="user_story_likes", blank=True
     )
 
+    class Meta:
+        indexes = [
+            m.Index(
+                fields=["user", "active_until"],
+                name="story_user_active_until_idx",
+            ),
+            m.Index(fields=["active_until"], name="story_active_until_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         if self.privacy_type.lower() == "closefriend":
             self.privacy_type = Story.PrivacyType.CLOSE_FRIEND
@@ -59,3 +82,45 @@ class Story(m.Model):
                 raise ValueError("invalid extension type.")
 
         super().save(*args, **kwargs)
+
+    @staticmethod
+    def active(
+        now: Optional[datetime.datetime] = None,
+    ) -> m.QuerySet["Story"]:
+        """Stories which haven't expired by 'now'."""
+
+        return Story.objects.filter(active_until__gt=now or timezone.now())
+
+
+@receiver(post_save, sender=Story)
+def render_story_content(sender, instance: Story, **kwargs):
+    from post import tasks
+
+    if instance.content_type == Story.ContentType.IMAGE:
+        tasks.schedule_renditions(instance, "content", "renditions")
+
+
+@receiver(post_delete, sender=Story)
+def release_story_content(sender, instance: Story, **kwargs):
+    # Also runs for bulk and cascading deletes, unlike 'delete()'.
+    renditions.delete(instance.content.storage, instance.renditions)
+    instance.content.delete(save=False)
+
+
+@receiver(m2m_changed, sender=u.User.close_friends.through)
+@receiver(m2m_changed, sender=u.User.hide_story.through)
+def forget_audience(
+    sender, instance: u.User, action: str, reverse: bool, pk_set, **kwargs
+):
+    from . import core
+
+    if reverse and action in ("post_add", "post_remove", "pre_clear"):
+        core.StoryAudience.forget([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        core.StoryAudience.forget(pk_set)
+    elif action == "pre_clear":
+        core.StoryAudience.forget(
+            sender.objects.filter(from_user=instance).values_list(
+                "to_user_id", flat=True
+            )
+        )
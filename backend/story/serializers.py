@@ -2,19 +2,20 @@ import re
 
 from rest_framework import serializers
 
-from post.serializers import UserMinimalSerializer
+from post.core import ChunkedUploadFile
+from post.serializers import (
+    ChunkedContentMixin,
+    RenditionsField,
+    UserMinimalSerializer,
+)
 from user.models import User
-from utils.validators import validate_content
 
 from . import models as m
 
 
-class UploadStorySerializer(serializers.Serializer):
+class UploadStorySerializer(ChunkedContentMixin):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
     caption = serializers.CharField(max_length=1000)
-    content = serializers.FileField(
-        max_length=54, validators=[validate_content]
-    )
     privacy = serializers.CharField(source="privacy_type")
     tags = serializers.ListField(read_only=True)
 
@@ -35,16 +36,32 @@ class UploadStorySerializer(serializers.Serializer):
         validated_data["content_type"] = validated_data["content"].extension
         story = m.Story.objects.create(**validated_data)
         story.tags.set(tags)
+        if isinstance(validated_data["content"], ChunkedUploadFile):
+            validated_data["content"].session.delete()
         return story
 
 
 class StorySerializer(serializers.ModelSerializer):
     user = UserMinimalSerializer()
     tags = UserMinimalSerializer(many=True)
+    renditions = RenditionsField("content", "renditions")
 
     class Meta:
         model = m.Story
-        fields = ["user", "content_type", "content", "caption", "tags"]
+        fields = [
+            "user",
+            "content_type",
+            "content",
+            "renditions",
+            "caption",
+            "tags",
+        ]
+
+
+class StoryTraySerializer(serializers.Serializer):
+    user = UserMinimalSerializer()
+    stories = serializers.ListField(child=serializers.IntegerField())
+    unseen = serializers.BooleanField()
 
 
 class FullStorySerializer(StorySerializer):
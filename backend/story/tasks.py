@@ -0,0 +1,34 @@
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import models as m
+
+
+@shared_task
+def delete_expired_stories() -> int:
+    """
+    Deleting expired stories in bounded batches, their stored contents
+    are released by Story's post_delete receiver.
+
+    Returns the number of deleted stories, a sweep stops after
+    'STORY_SWEEP_MAX_BATCHES' and the rest is left to the next one.
+    """
+
+    now = timezone.now()
+    batch_size = settings.STORY_SWEEP_BATCH_SIZE
+    deleted = 0
+    for _ in range(settings.STORY_SWEEP_MAX_BATCHES):
+        with transaction.atomic():
+            expired = list(
+                m.Story.objects.filter(active_until__lte=now)
+                .order_by("active_until")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not expired:
+                break
+
+            m.Story.objects.filter(pk__in=expired).delete()
+        deleted += len(expired)
+    return deleted
@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+
+from story import models as m
+from story import tasks
+from utils.utils_tests import ViewTests, use_temp_media
+
+
+class TestStoryExpiry(ViewTests):
+    def setUp(self):
+        use_temp_media(
+            self, STORY_SWEEP_BATCH_SIZE=2, STORY_SWEEP_MAX_BATCHES=2
+        )
+        self.user = self.create_user("test")
+
+    def create_story(self, content: bytes, **kwargs) -> m.Story:
+        return m.Story.objects.create(
+            user=self.user,
+            content_type="mp4",
+            privacy_type="normal",
+            content=SimpleUploadedFile("test.mp4", content, "video/mp4"),
+            **kwargs,
+        )
+
+    def test_lifetime(self):
+        story = self.create_story(b"live")
+        self.assertTrue(timezone.is_aware(story.active_until))
+        self.assertGreater(story.active_until, timezone.now())
+
+    def test_delete_expired(self):
+        expired = timezone.now() - timedelta(minutes=1)
+        stories = [
+            self.create_story(bytes([i]), active_until=expired)
+            for i in range(5)
+        ]
+        live = self.create_story(b"live")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(tasks.delete_expired_stories(), 4)
+        self.assertEqual(list(m.Story.active()), [live])
+        content = stories[0].content
+        self.assertFalse(content.storage.exists(content.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(tasks.delete_expired_stories(), 1)
+        self.assertEqual(list(m.Story.objects.all()), [live])
+        self.assertTrue(live.content.storage.exists(live.content.name))
+
+    def test_expired_story_view(self):
+        story = self.create_story(
+            b"expired", active_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.set_cookie("token", self.user)
+        self.create_url("story:get_story", [story.pk])
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 404)
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+
+from story import models as m
+from user.models import Follow
+from utils.utils_tests import ViewTests, use_temp_media
+
+
+class TestStoryTray(ViewTests):
+    def setUp(self):
+        use_temp_media(self)
+        cache.clear()
+
+        self.user = self.create_user("test")
+        self.first = self.create_user("first")
+        self.second = self.create_user("second")
+        for following in (self.first, self.second):
+            Follow.objects.create(follower=self.user, following=following)
+
+        self.set_cookie("token", self.user)
+        self.create_url("story:tray", [])
+
+    def create_story(self, user, privacy="normal", **kwargs) -> m.Story:
+        return m.Story.objects.create(
+            user=user,
+            content_type="mp4",
+            privacy_type=privacy,
+            content=SimpleUploadedFile(
+                "test.mp4", f"{user.pk}{kwargs}".encode(), "video/mp4"
+            ),
+            **kwargs,
+        )
+
+    def fetch_tray(self) -> list[dict]:
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        return [
+            (item["user"]["username"], item["stories"], item["unseen"])
+            for item in res.json()["tray"]
+        ]
+
+    def test_tray(self):
+        now = timezone.now()
+        first = self.create_story(
+            self.first, active_until=now + timedelta(hours=2)
+        )
+        second = self.create_story(
+            self.second, active_until=now + timedelta(hours=1)
+        )
+        self.create_story(
+            self.second, active_until=now - timedelta(minutes=1)
+        )
+        self.create_story(self.create_user("stranger"))
+
+        self.assertEqual(
+            self.fetch_tray(),
+            [("first", [first.pk], True), ("second", [second.pk], True)],
+        )
+
+        # Authors whose stories are all seen go last.
+        m.StoryViews.objects.create(story=first, user=self.user)
+        self.assertEqual(
+            self.fetch_tray(),
+            [("second", [second.pk], True), ("first", [first.pk], False)],
+        )
+
+    def test_privacy(self):
+        close_friends = self.create_story(self.first, privacy="closefriend")
+        hidden = self.create_story(self.second)
+        self.second.hide_story.add(self.user)
+        self.assertEqual(self.fetch_tray(), [])
+
+        self.first.close_friends.add(self.user)
+        self.second.hide_story.remove(self.user)
+        self.assertEqual(
+            self.fetch_tray(),
+            [
+                ("second", [hidden.pk], True),
+                ("first", [close_friends.pk], True),
+            ],
+        )
+
+    def test_cached_audience(self):
+        self.create_story(self.first)
+        self.fetch_tray()
+
+        # Followings are queried since redis isn't configured in tests.
+        with self.assertNumQueries(4):
+            self.fetch_tray()
+
+        # Unfollowing is reflected right away.
+        Follow.objects.filter(following=self.first).delete()
+        self.assertEqual(self.fetch_tray(), [])
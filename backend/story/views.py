@@ -1,12 +1,15 @@
-from datetime import datetime
-
-from django.shortcuts import get_object_or_404
+from asgiref.sync import sync_to_async
+from django.db.models import prefetch_related_objects
+from django.shortcuts import aget_object_or_404
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 from user.authenticate import authenticate
+from utils.model_utils import ainsert_ignore
+from utils.view_utils import async_api_view
 
+from . import core
 from . import models as m
 from . import serializers as s
 
@@ -45,9 +48,9 @@ def story(request, story_id=None):
         )
 
 
-@api_view(["GET"])
+@async_api_view(["GET"])
 @authenticate
-def get_story(request, story_id):
+async def get_story(request, story_id):
     """
     Retriving story based on id.
     Users which they own the story will receive extera informations
@@ -60,23 +63,51 @@ def get_story(request, story_id):
     they are not the creator themselves.
     """
 
-    now = datetime.now()
-    story_obj = get_object_or_404(m.Story, pk=story_id, active_until__gt=now)
+    story_obj = await aget_object_or_404(
+        m.Story.active().select_related("user").prefetch_related("tags"),
+        pk=story_id,
+    )
     if story_obj.user == request.user:
+        await sync_to_async(prefetch_related_objects)(
+            [story_obj], "views", "likes"
+        )
         return Response(
             s.FullStorySerializer(story_obj).data, status.HTTP_200_OK
         )
 
-    if story_obj.user.is_private:
-        if not story_obj.user.followers.filter(pk=request.user.pk).first():
-            return Response(status=status.HTTP_403_FORBIDDEN)
+    if not await request.user.acan_view(story_obj.user):
+        return Response(status=status.HTTP_403_FORBIDDEN)
+
+    hide_story = story_obj.user.hide_story
+    if await hide_story.filter(pk=request.user.pk).aexists():
+        return Response(status=status.HTTP_403_FORBIDDEN)
 
     if story_obj.privacy_type == m.Story.PrivacyType.CLOSE_FRIEND:
-        if not story_obj.user.close_friends.filter(pk=request.user.pk).first():
+        close_friends = story_obj.user.close_friends
+        if not await close_friends.filter(pk=request.user.pk).aexists():
             return Response(status=status.HTTP_403_FORBIDDEN)
 
-    if not story_obj.views.filter(pk=request.user.pk):
-        story_obj.views.add(request.user)
+    await ainsert_ignore(m.StoryViews, story=story_obj, user=request.user)
 
     serializer = s.StorySerializer(story_obj)
     return Response(serializer.data, status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@authenticate
+def tray(request):
+    """
+    Listing request user's followings which have active stories they
+    can see, followings with unseen stories come first, then the ones
+    with most recent stories.
+
+    Response schema:
+        'tray' (list): Items of 'StoryTraySerializer', 'stories' holds
+            story ids in the order they were posted.
+    """
+
+    entries = core.StoryTray(request.user).fetch()
+    return Response(
+        {"tray": s.StoryTraySerializer(entries, many=True).data},
+        status.HTTP_200_OK,
+    )
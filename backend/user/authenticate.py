@@ -1,8 +1,13 @@
 import datetime
 from functools import wraps
+from hashlib import sha256
+from inspect import iscoroutinefunction
 from typing import Callable, Optional
 
 import jwt
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
 from django.http.response import HttpResponse, HttpResponseRedirect
 from django.urls import reverse
 from rest_framework import status
@@ -10,24 +15,49 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 
 from utils import auth_utils as utils
+from utils import hashers
+from utils.cache_utils import ExpiringLRUCache
 from utils.configs import _JWT_CONFIG
 
 from . import models as m
 
+# Verified tokens claims, keyed by token digest, so the same cookie
+# doesn't pay for signature verification on every request.
+token_cache = ExpiringLRUCache(settings.JWT_CACHE_SIZE)
+
 
 def generate_jwt_for_test_user(user: m.User) -> str:
     return generate_jwt_token(user, utils.generate_expire_date())
 
 
-def login(username: str, password: str) -> Optional[m.User]:
+async def alogin(username: str, password: str) -> Optional[m.User]:
+    """
+    Returns the active user matching the credentials, password hashing
+    runs in a thread pool so it won't block the event loop.
+    """
+
     try:
-        user = m.User.objects.get(username=username, is_active=True)
+        user = await m.User.objects.aget(username=username, is_active=True)
     except m.User.DoesNotExist:
         return None
 
-    if user.password == utils.make_password(password, user.salt):
-        return user
-    return None
+    if not await hashers.acheck_password(password, user.password, user.salt):
+        return None
+
+    if utils.must_update(user.password):
+        new_password = await hashers.amake_password(password, user.salt)
+        await sync_to_async(_upgrade_password)(user, new_password)
+    return user
+
+
+def _upgrade_password(user: m.User, new_password: str):
+    """
+    Re-saving a password which was hashed with a legacy algorithm or
+    outdated cost, right after it has been verified.
+    """
+
+    user.password = new_password
+    user.save(update_fields=["password"])
 
 
 def generate_jwt_token(user: m.User, expire_date: datetime.datetime) -> str:
@@ -39,6 +69,14 @@ def generate_jwt_token(user: m.User, expire_date: datetime.datetime) -> str:
 
 
 def authenticate(func: Callable):
+    """
+    Authenticating request user from the 'token' cookie, works with
+    both sync and async views.
+    """
+
+    if iscoroutinefunction(func):
+        return _aauthenticate(func)
+
     @wraps(func)
     def wrapper(request: Request, *args, **kwargs):
         token = request.COOKIES.get("token")
@@ -49,10 +87,7 @@ def authenticate(func: Callable):
             return invalid_response
 
         if not (user := _get_user_from_jwt_token(decoded_token)):
-            return Response(
-                {"error": "user not found.", "code": "notFound"},
-                status.HTTP_404_NOT_FOUND,
-            )
+            return _user_not_found()
 
         request.user = user
         return func(request, *args, **kwargs)
@@ -60,9 +95,45 @@ def authenticate(func: Callable):
     return wrapper
 
 
+def _aauthenticate(func: Callable):
+    @wraps(func)
+    async def wrapper(request: Request, *args, **kwargs):
+        token = request.COOKIES.get("token")
+        if not token:
+            return HttpResponseRedirect(redirect_to=reverse("user:login"))
+        decoded_token, invalid_response = _validate_jwt_token(token)
+        if not decoded_token:
+            return invalid_response
+
+        if not (user := await _aget_user_from_jwt_token(decoded_token)):
+            return _user_not_found()
+
+        request.user = user
+        return await func(request, *args, **kwargs)
+
+    return wrapper
+
+
+def _user_not_found() -> Response:
+    return Response(
+        {"error": "user not found.", "code": "notFound"},
+        status.HTTP_404_NOT_FOUND,
+    )
+
+
 def _validate_jwt_token(
     token: str,
 ) -> tuple[Optional[HttpResponse], Optional[dict]]:
+    """
+    Verifying the token, valid tokens are cached until their 'exp',
+    invalid and expired ones are never cached so they always fail the
+    same way.
+    """
+
+    digest = sha256(token.encode()).digest()
+    if (decoded_token := token_cache.get(digest)) is not None:
+        return decoded_token, None
+
     try:
         decoded_token = jwt.decode(
             token, _JWT_CONFIG.secret, algorithms=_JWT_CONFIG.alg
@@ -77,12 +148,56 @@ def _validate_jwt_token(
             redirect_to=reverse("user:login"), content_type="application/json"
         )
 
+    if "exp" in decoded_token:
+        token_cache.set(digest, decoded_token, decoded_token["exp"])
     return decoded_token, None
 
 
 def _get_user_from_jwt_token(decoded_token: dict) -> Optional[m.User]:
+    """
+    Reading the token's user from cache, and falling back to database
+    on misses. Cached snapshots get invalidated whenever user's salt is
+    rotated or their account is changed.
+    """
+
     username = decoded_token["username"]
     salt = decoded_token["salt"]
-    return m.User.objects.filter(
-        username=username, salt=salt, is_active=True
-    ).first()
+    key = m.User.auth_cache_key(username, salt)
+    if snapshot := cache.get(key):
+        return m.User.from_auth_snapshot(snapshot)
+
+    snapshot = (
+        m.User.objects.filter(username=username, salt=salt, is_active=True)
+        .values(*m.User.AUTH_CACHE_FIELDS)
+        .first()
+    )
+    if not snapshot:
+        return None
+
+    cache.set(key, snapshot, settings.AUTH_USER_CACHE_TTL)
+    return m.User.from_auth_snapshot(snapshot)
+
+
+async def _aget_user_from_jwt_token(decoded_token: dict) -> Optional[m.User]:
+    """
+    Async version of '_get_user_from_jwt_token'.
+    """
+
+    username = decoded_token["username"]
+    salt = decoded_token["salt"]
+    key = m.User.auth_cache_key(username, salt)
+    if snapshot := await cache.aget(key):
+        return m.User.from_auth_snapshot(snapshot)
+
+    snapshot = (
+        await m.User.objects.filter(
+            username=username, salt=salt, is_active=True
+        )
+        .values(*m.User.AUTH_CACHE_FIELDS)
+        .afirst()
+    )
+    if not snapshot:
+        return None
+
+    await cache.aset(key, snapshot, settings.AUTH_USER_CACHE_TTL)
+    return m.User.from_auth_snapshot(snapshot)
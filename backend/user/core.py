@@ -1,18 +1,224 @@
 import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import defaultdict
 from dataclasses import dataclass, field
-from itertools import chain
-from typing import Callable
-
-from django.db.models import QuerySet
+from functools import partial
+from heapq import merge
+from itertools import chain, islice
+from typing import Callable, Iterable, Optional
+from uuid import uuid4
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from post import core as pm_core
 from post import models as pm
 from post.core import JsonSerializableValueError
-from utils.auth_utils import make_password
+from utils.auth_utils import check_password
 from utils.decorators import validation_required
+from utils.model_utils import increment_counters, insert_ignore
+from utils.redis_utils import get_redis
 from utils.validators import Validator
 
 from . import models as m
 
 
+class FollowGraph:
+    """
+    Followings of each user kept in redis sets, so checking whether
+    users follow others doesn't query 'Follow'.
+
+    A set is loaded from database when it's first used and expires
+    'FOLLOW_GRAPH_TTL' seconds after it's loaded, reads don't extend
+    it. Follows and unfollows must be written through with 'add' and
+    'remove', which only touch sets that are already loaded.
+
+    A load marks the set as loading before it reads the database, and
+    write-through clears the mark, so a load which may have missed a
+    follow or unfollow committed meanwhile isn't stored.
+
+    Checks query the database when redis is not configured.
+    """
+
+    KEY = "follow:followings:{user_id}"
+    LOADING_KEY = "follow:loading:{user_id}"
+    # Member of every loaded set, so users following nobody have one.
+    SENTINEL = "-"
+    # Seconds a loading mark lives, slower loads aren't stored.
+    LOADING_TIMEOUT = 10
+
+    # Updating a set only if it's loaded, otherwise it would hold a
+    # partial followings list until it expires.
+    ADD_SCRIPT = """
+    redis.call('del', KEYS[2])
+    if redis.call('exists', KEYS[1]) == 1 then
+        return redis.call('sadd', KEYS[1], unpack(ARGV))
+    end
+    return 0
+    """
+    REMOVE_SCRIPT = """
+    redis.call('del', KEYS[2])
+    if redis.call('exists', KEYS[1]) == 1 then
+        return redis.call('srem', KEYS[1], unpack(ARGV))
+    end
+    return 0
+    """
+    # Storing a loaded set only if no write-through has cleared its
+    # loading mark, members are added in slices to stay within Lua's
+    # 'unpack' limit.
+    LOAD_SCRIPT = """
+    if redis.call('get', KEYS[2]) ~= ARGV[1] then
+        return 0
+    end
+    redis.call('del', KEYS[2])
+    if redis.call('exists', KEYS[1]) == 1 then
+        return 0
+    end
+    for i = 3, #ARGV, 1000 do
+        redis.call('sadd', KEYS[1], unpack(ARGV, i, math.min(i + 999, #ARGV)))
+    end
+    redis.call('expire', KEYS[1], ARGV[2])
+    return 1
+    """
+
+    @classmethod
+    def is_following(cls, follower_id: int, following_id: int) -> bool:
+        return following_id in cls.followings_among(
+            follower_id, [following_id]
+        )
+
+    @classmethod
+    async def ais_following(cls, follower_id: int, following_id: int) -> bool:
+        return await sync_to_async(cls.is_following)(
+            follower_id, following_id
+        )
+
+    @classmethod
+    def filter_visible(
+        cls, viewer: m.User, authors: Iterable[m.User]
+    ) -> list[m.User]:
+        """
+        Authors whose posts and stories 'viewer' can see, which are
+        public ones, themselves and the private ones they follow.
+        """
+
+        authors = list(authors)
+        followed = cls.followings_among(
+            viewer.pk,
+            [
+                author.pk
+                for author in authors
+                if author.is_private and author.pk != viewer.pk
+            ],
+        )
+        return [
+            author
+            for author in authors
+            if not author.is_private
+            or author.pk == viewer.pk
+            or author.pk in followed
+        ]
+
+    @classmethod
+    def followings(cls, user_id: int) -> set[int]:
+        client = get_redis()
+        if client is None:
+            return cls._query(user_id)
+
+        members = client.smembers(cls.KEY.format(user_id=user_id))
+        if not members:
+            return cls._load(client, user_id)
+        return {
+            int(member)
+            for member in members
+            if member != cls.SENTINEL.encode()
+        }
+
+    @classmethod
+    def followings_among(cls, user_id: int, user_ids: list[int]) -> set[int]:
+        """Returns which of 'user_ids' the user follows."""
+
+        if not user_ids:
+            return set()
+
+        client = get_redis()
+        if client is None:
+            return cls._query(user_id, user_ids)
+
+        key = cls.KEY.format(user_id=user_id)
+        loaded, flags = (
+            client.pipeline().exists(key).smismember(key, user_ids).execute()
+        )
+        if not loaded:
+            return cls._load(client, user_id).intersection(user_ids)
+        return {pk for pk, flag in zip(user_ids, flags) if flag}
+
+    @classmethod
+    def add(cls, following_id: int, follower_ids: Iterable[int]) -> None:
+        cls._write_through(cls.ADD_SCRIPT, following_id, follower_ids)
+
+    @classmethod
+    def remove(cls, following_id: int, follower_ids: Iterable[int]) -> None:
+        cls._write_through(cls.REMOVE_SCRIPT, following_id, follower_ids)
+
+    @classmethod
+    def _write_through(
+        cls, script: str, following_id: int, follower_ids: Iterable[int]
+    ) -> None:
+        client = get_redis()
+        if client is None:
+            return
+
+        def write(follower_ids: list[int]):
+            pipeline = client.pipeline(transaction=False)
+            for follower_id in follower_ids:
+                pipeline.eval(
+                    script,
+                    2,
+                    cls.KEY.format(user_id=follower_id),
+                    cls.LOADING_KEY.format(user_id=follower_id),
+                    following_id,
+                )
+            pipeline.execute()
+
+        # Sets must not see rows which may be rolled back.
+        transaction.on_commit(partial(write, list(follower_ids)))
+
+    @classmethod
+    def _load(cls, client, user_id: int) -> set[int]:
+        """
+        Loading user's followings into redis, the loaded followings are
+        returned whether they're stored or not.
+        """
+
+        token = uuid4().hex
+        loading_key = cls.LOADING_KEY.format(user_id=user_id)
+        client.set(loading_key, token, ex=cls.LOADING_TIMEOUT)
+
+        following_ids = cls._query(user_id)
+        client.eval(
+            cls.LOAD_SCRIPT,
+            2,
+            cls.KEY.format(user_id=user_id),
+            loading_key,
+            token,
+            settings.FOLLOW_GRAPH_TTL,
+            cls.SENTINEL,
+            *following_ids,
+        )
+        return following_ids
+
+    @staticmethod
+    def _query(user_id: int, user_ids: Optional[list[int]] = None) -> set[int]:
+        follows = m.Follow.objects.filter(follower=user_id)
+        if user_ids is not None:
+            follows = follows.filter(following__in=user_ids)
+        return set(follows.values_list("following_id", flat=True))
+
+
 @dataclass
 class Follows(Validator):
     """
@@ -67,21 +273,52 @@ class Follow(Follows):
         return super().is_valid([self._check_user_isnt_already_following])
 
     def _check_user_isnt_already_following(self):
-        if self._user_obj.followers.filter(pk=self.from_user.pk).first():
-            raise JsonSerializableValueError(
-                {
-                    "error": "user is already being followed",
-                    "code": "duplicateFollow",
-                }
-            )
+        # Follows of public users are de-duplicated by the insert itself.
+        if not self._is_user_private:
+            return
+
+        if FollowGraph.is_following(self.from_user.pk, self._user_obj.pk):
+            raise self._duplicate_follow_error()
+
+    @staticmethod
+    def _duplicate_follow_error() -> JsonSerializableValueError:
+        return JsonSerializableValueError(
+            {
+                "error": "user is already being followed",
+                "code": "duplicateFollow",
+            }
+        )
 
     @validation_required
-    def follow_user(self):
+    def follow_user(self) -> bool:
+        """
+        Following the target user, or requesting to follow them if
+        they are private.
+
+        Returns False and sets 'errors' if user is already following
+        the target.
+        """
+
         if self._is_user_private:
-            self._user_obj.follow_requests.add(self.from_user)
-            return
+            if insert_ignore(
+                m.FollowRequest,
+                to_user=self._user_obj,
+                from_user=self.from_user,
+            ):
+                increment_counters(self._user_obj, follow_requests_count=1)
+            return True
+
+        if not insert_ignore(
+            m.Follow, following=self._user_obj, follower=self.from_user
+        ):
+            self._error = self._duplicate_follow_error()
+            return False
 
-        self._user_obj.followers.add(self.from_user)
+        increment_counters(self._user_obj, followers_count=1)
+        increment_counters(self.from_user, followings_count=1)
+        FollowGraph.add(self._user_obj.pk, [self.from_user.pk])
+        pm_core.TimelineInbox.backfill(self._user_obj, [self.from_user.pk])
+        return True
 
 
 class UnFollow(Follows):
@@ -89,7 +326,7 @@ class UnFollow(Follows):
         return super().is_valid([self._check_user_is_already_following])
 
     def _check_user_is_already_following(self):
-        if self._user_obj.followers.filter(pk=self.from_user.pk).first():
+        if FollowGraph.is_following(self.from_user.pk, self._user_obj.pk):
             return
 
         if not self._user_obj.follow_requests.filter(
@@ -105,10 +342,19 @@ class UnFollow(Follows):
     @validation_required
     def unfollow_user(self):
         if self._is_user_private:
-            self._user_obj.follow_requests.remove(self.from_user)
+            deleted, _ = m.FollowRequest.objects.filter(
+                to_user=self._user_obj, from_user=self.from_user
+            ).delete()
+            increment_counters(self._user_obj, follow_requests_count=-deleted)
             return
 
-        self._user_obj.followers.remove(self.from_user)
+        deleted, _ = m.Follow.objects.filter(
+            following=self._user_obj, follower=self.from_user
+        ).delete()
+        increment_counters(self._user_obj, followers_count=-deleted)
+        increment_counters(self.from_user, followings_count=-deleted)
+        FollowGraph.remove(self._user_obj.pk, [self.from_user.pk])
+        pm_core.TimelineInbox.remove(self._user_obj, self.from_user)
 
 
 @dataclass
@@ -129,7 +375,9 @@ class CloseFriend(Validator):
             )
 
     def _is_user_following_target(self):
-        if not self._target_user.followers.filter(pk=self.request_user.pk):
+        if not FollowGraph.is_following(
+            self.request_user.pk, self._target_user.pk
+        ):
             raise JsonSerializableValueError(
                 {
                     "error": "user is not following you at the moment.",
@@ -213,7 +461,7 @@ class ChangeSettings(Validator):
 
         self.revoke_token_required = True
 
-        if make_password(password, self.user.salt) != self.user.password:
+        if not check_password(password, self.user.password, self.user.salt):
             raise JsonSerializableValueError(
                 {
                     "error": "password is invalid.",
@@ -255,6 +503,8 @@ class ChangeSettings(Validator):
 
     @validation_required
     def change_settings(self) -> bool:
+        self.user.forget_auth_cache()
+
         # for key, value in self.data.items():
         #     setattr(self.user, key, value)
 
@@ -262,14 +512,295 @@ class ChangeSettings(Validator):
         #     change_salt=self._change_salt,
         # )
 
+        # Pending requests may be too many to approve in this request.
         if (
             hasattr(self, "_accept_follow_requests")
             and self._accept_follow_requests
         ):
-            self.user.followers.add(
-                *self.user.follow_requests.all().values_list("id", flat=True)
+            FollowRequestsApprovalJob.start(self.user)
+
+        # Only public users posts are kept in hashtags posting lists.
+        privacy = self.data.get("is_private")
+        if privacy is True:
+            pm_core.HashtagIndex.remove_author(self.user)
+        elif privacy is False:
+            pm_core.HashtagIndex.backfill_author(self.user)
+
+
+@dataclass
+class FollowRequests(Validator):
+    """
+    Approving or rejecting a private user's incoming follow requests
+    in bulk, either the ones from 'user_ids' or the ones sent before
+    'before'.
+
+    Each batch runs in a single transaction with one insert into
+    'Follow', one delete from 'FollowRequest' and counters updated
+    once. A batch handles at most 'MAX_REQUESTS' oldest requests, the
+    rest of the ones sent before 'before' are left to the next ones.
+
+    Attributes:
+        user: The request user, whose follow requests are handled.
+        user_ids: Ids of users whose requests are handled.
+        before: Requests created before this are handled, if 'user_ids'
+            isn't given.
+        count: Number of handled requests, available after approving
+            or rejecting.
+        has_more: Whether more requests sent before 'before' are left,
+            available after approving or rejecting.
+    """
+
+    MAX_REQUESTS = 1000
+
+    user: m.User
+    user_ids: Optional[list[int]] = None
+    before: Optional[datetime.datetime] = None
+    count: int = field(default=0, init=False)
+    has_more: bool = field(default=False, init=False)
+
+    def is_valid(self) -> bool:
+        try:
+            self._check_requests_exist()
+        except JsonSerializableValueError as e:
+            self._error = e
+            return False
+
+        self._validation_passed = True
+        return True
+
+    def _check_requests_exist(self):
+        if not self._requests().exists():
+            raise JsonSerializableValueError(
+                {
+                    "error": "no follow requests found.",
+                    "code": "noFollowRequests",
+                }
+            )
+
+    def _requests(self):
+        requests = m.FollowRequest.objects.filter(to_user=self.user)
+        if self.user_ids is not None:
+            return requests.filter(from_user__in=self.user_ids)
+        return requests.filter(created_at__lt=self.before)
+
+    @validation_required
+    def approve(self) -> int:
+        with transaction.atomic():
+            follower_ids = self._lock_follower_ids()
+            already_following = set(
+                m.Follow.objects.filter(
+                    following=self.user, follower__in=follower_ids
+                ).values_list("follower_id", flat=True)
+            )
+            new_follower_ids = [
+                pk for pk in follower_ids if pk not in already_following
+            ]
+            m.Follow.objects.bulk_create(
+                [
+                    m.Follow(following=self.user, follower_id=pk)
+                    for pk in new_follower_ids
+                ],
+                batch_size=1000,
+                ignore_conflicts=True,
             )
-            m.FollowRequest.objects.filter(to_user=self.user.pk).delete()
+            self.count = self._delete_requests(follower_ids)
+            increment_counters(
+                self.user, followers_count=len(new_follower_ids)
+            )
+            m.User.objects.filter(pk__in=new_follower_ids).update(
+                followings_count=F("followings_count") + 1
+            )
+            FollowGraph.add(self.user.pk, new_follower_ids)
+            pm_core.TimelineInbox.backfill(self.user, new_follower_ids)
+        return self.count
+
+    @validation_required
+    def reject(self) -> int:
+        with transaction.atomic():
+            follower_ids = self._lock_follower_ids()
+            self.count = self._delete_requests(follower_ids)
+        return self.count
+
+    def _lock_follower_ids(self) -> list[int]:
+        follower_ids = list(
+            self._requests()
+            .select_for_update()
+            .order_by("created_at", "pk")
+            .values_list("from_user_id", flat=True)[: self.MAX_REQUESTS + 1]
+        )
+        self.has_more = len(follower_ids) > self.MAX_REQUESTS
+        return follower_ids[: self.MAX_REQUESTS]
+
+    def _delete_requests(self, follower_ids: list[int]) -> int:
+        deleted, _ = m.FollowRequest.objects.filter(
+            to_user=self.user, from_user__in=follower_ids
+        ).delete()
+        increment_counters(self.user, follow_requests_count=-deleted)
+        return deleted
+
+
+class FollowRequestsApprovalJob:
+    """
+    Approving all follow requests of a user who turned public in
+    background, in chunks of 'FOLLOW_REQUESTS_CHUNK_SIZE' oldest ones.
+
+    Each chunk is approved with 'FollowRequests' in its own transaction
+    together with the job's progress, so an interrupted job resumes
+    from where it stopped, see 'resume'.
+    """
+
+    @staticmethod
+    def start(user: m.User) -> Optional[m.FollowRequestsApproval]:
+        from . import tasks
+
+        total = m.FollowRequest.objects.filter(to_user=user).count()
+        if not total:
+            return None
+
+        job = m.FollowRequestsApproval.objects.create(
+            user=user, before=timezone.now(), total=total
+        )
+        tasks.approve_follow_requests.delay_on_commit(job.pk)
+        return job
+
+    @classmethod
+    def run(cls, job_id: int) -> int:
+        """Returns the number of approved requests."""
+
+        approved = 0
+        while (count := cls._approve_chunk(job_id)) is not None:
+            approved += count
+        return approved
+
+    @staticmethod
+    def resume() -> int:
+        """
+        Running unfinished jobs again which haven't made progress for
+        'FOLLOW_REQUESTS_APPROVAL_TIMEOUT' seconds, e.g. because their
+        worker died.
+        """
+
+        from . import tasks
+
+        stalled_since = timezone.now() - datetime.timedelta(
+            seconds=settings.FOLLOW_REQUESTS_APPROVAL_TIMEOUT
+        )
+        job_ids = list(
+            m.FollowRequestsApproval.objects.filter(
+                finished_at__isnull=True, updated_at__lt=stalled_since
+            ).values_list("pk", flat=True)
+        )
+        for job_id in job_ids:
+            tasks.approve_follow_requests.delay_on_commit(job_id)
+        return len(job_ids)
+
+    @staticmethod
+    def _approve_chunk(job_id: int) -> Optional[int]:
+        """
+        Returns the number of approved requests, or None if the job is
+        finished or being run by another worker.
+        """
+
+        with transaction.atomic():
+            # A job which is locked is being run by another worker.
+            job = (
+                m.FollowRequestsApproval.objects.select_for_update(
+                    skip_locked=True
+                )
+                .select_related("user")
+                .filter(pk=job_id, finished_at__isnull=True)
+                .first()
+            )
+            if not job:
+                return None
+
+            follower_ids = list(
+                m.FollowRequest.objects.filter(
+                    to_user=job.user, created_at__lt=job.before
+                )
+                .order_by("created_at", "pk")
+                .values_list("from_user_id", flat=True)[
+                    : settings.FOLLOW_REQUESTS_CHUNK_SIZE
+                ]
+            )
+            if not follower_ids:
+                job.finished_at = timezone.now()
+                job.save(update_fields=["finished_at", "updated_at"])
+                return None
+
+            follow_requests = FollowRequests(job.user, follower_ids)
+            count = (
+                follow_requests.approve() if follow_requests.is_valid() else 0
+            )
+            job.approved = F("approved") + count
+            job.save(update_fields=["approved", "updated_at"])
+        return count
+
+
+@dataclass(frozen=True)
+class TimelineCursor:
+    """
+    Opaque timeline position, the (created_at, id) of the last post
+    which has been examined, and the source it came from.
+
+    Posts are always ordered by (created_at, id) descending, so a
+    cursor can be applied to any source as a keyset condition.
+    """
+
+    FOLLOWINGS = "f"
+    RELATED = "r"
+
+    source: str = FOLLOWINGS
+    created_at: Optional[datetime.datetime] = None
+    post_id: Optional[int] = None
+
+    def encode(self) -> str:
+        payload = json.dumps(
+            {
+                "s": self.source,
+                "t": self.created_at.isoformat(),
+                "id": self.post_id,
+            }
+        )
+        return urlsafe_b64encode(payload.encode()).decode()
+
+    @classmethod
+    def decode(cls, cursor: Optional[str]) -> "TimelineCursor":
+        if not cursor:
+            return cls()
+
+        try:
+            payload = json.loads(urlsafe_b64decode(cursor.encode()))
+            if payload["s"] not in (cls.FOLLOWINGS, cls.RELATED):
+                raise ValueError
+            return cls(
+                payload["s"],
+                datetime.datetime.fromisoformat(payload["t"]),
+                int(payload["id"]),
+            )
+        except (ValueError, TypeError, KeyError):
+            raise JsonSerializableValueError(
+                {"error": "invalid cursor.", "code": "invalidCursor"}
+            )
+
+    def after(self, created_at_field: str, id_field: str) -> Q:
+        """
+        Keyset condition for fetching posts after this cursor.
+        """
+
+        if self.created_at is None:
+            return Q()
+
+        return Q(**{f"{created_at_field}__lt": self.created_at}) | Q(
+            **{
+                created_at_field: self.created_at,
+                f"{id_field}__lt": self.post_id,
+            }
+        )
+
+
+# (created_at, post id) of a post which may be shown in timeline.
+Candidate = tuple[datetime.datetime, int]
 
 
 @dataclass
@@ -278,116 +809,218 @@ class Timeline:
     This class is responsible for filling users timeline with
     related posts.
 
-    First we look for user's followings new uploaded posts, if
-    user already seen those posts, then we look for related posts
-    that exists in their liked hashatgs.
+    First we look for user's followings new uploaded posts in their
+    timeline inbox, if user already seen those posts, then we look
+    for related posts that exists in their liked hashatgs.
+
+    Pages are fetched with keyset queries after 'cursor', and posts
+    which user has already seen are skipped by probing only the
+    fetched candidates, so every page costs the same no matter how
+    deep user has scrolled.
+
+    Attributes:
+        request_user: The request user.
+        cursor: Opaque cursor returned from the previous page.
+        page_size: Number of posts in each page, defaults to
+            'TIMELINE_PAGE_SIZE' and is capped by 'TIMELINE_MAX_PAGE_SIZE'.
+        next_cursor: Cursor for fetching the next page, available
+            after calling 'fetch_posts'.
     """
 
+    # How many candidates are fetched for each requested post, and
+    # how many times we try to fill a page with unseen posts.
+    OVERFETCH = 2
+    MAX_ROUNDS = 3
+
     request_user: m.User
+    cursor: Optional[str] = None
+    page_size: Optional[int] = None
+    next_cursor: Optional[str] = field(default=None, init=False)
+    _position: TimelineCursor = field(init=False, repr=False)
+    _liked_hashtag_ids: Optional[list[int]] = field(
+        default=None, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        if not self.page_size:
+            self.page_size = settings.TIMELINE_PAGE_SIZE
+        self.page_size = min(self.page_size, settings.TIMELINE_MAX_PAGE_SIZE)
+
+    def fetch_posts(self) -> list[pm.Post]:
+        self._position = TimelineCursor.decode(self.cursor)
+        post_ids = []
+
+        if self._position.source == TimelineCursor.FOLLOWINGS:
+            post_ids, exhausted = self._paginate(
+                self._fetch_recent_followings_posts, self.page_size
+            )
+            if not exhausted:
+                self.next_cursor = self._position.encode()
+                return self._load_posts(post_ids)
 
-    def fetch_posts(self) -> QuerySet[pm.Post]:
-        followings = self._fetch_followings()
-        posts = self._fetch_recent_followings_posts(followings)
-        if posts.count() >= 5:
-            return posts
+            self._position = TimelineCursor(TimelineCursor.RELATED)
 
-        related_posts = self._fetch_related_posts(5 - posts.count(), posts)
-        return list(chain(posts, related_posts)) if related_posts else posts
+        related_post_ids, exhausted = self._paginate(
+            lambda limit: self._fetch_related_posts(limit, post_ids),
+            self.page_size - len(post_ids),
+        )
+        if not exhausted:
+            self.next_cursor = self._position.encode()
+        return self._load_posts(list(chain(post_ids, related_post_ids)))
 
-    def _fetch_followings(self):
+    async def afetch_posts(self) -> list[pm.Post]:
         """
-        Fetching all user's followings.
+        Async version of 'fetch_posts'. Each page is built from a chain
+        of dependent queries, so they run together in a single worker
+        thread instead of switching threads for every query.
         """
 
-        followings = (
-            m.Follow.objects.filter(follower=self.request_user)
-            .all()
-            .order_by("date")
-            .select_related("following")
-        )
-        return [follow_obj.following for follow_obj in followings]
+        return await sync_to_async(self.fetch_posts)()
 
-    def _fetch_recent_followings_posts(
-        self, followings: QuerySet[m.Follow]
-    ) -> QuerySet[pm.Post]:
-        """
-        Fetching recently uploaded posts by user's followings which
-        user has not seen them yet.
+    def _load_posts(self, post_ids: list[int]) -> list[pm.Post]:
         """
+        Loading the page's posts with everything they need for
+        serialization, in the same order as 'post_ids'.
 
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
-        two_days_ago = now - datetime.timedelta(days=2)
-        posts = pm.Post.objects.filter(
-            user__in=followings, created_at__range=[two_days_ago, now]
-        ).exclude(viewers=self.request_user)[:5]
-        # pm.PostViewsHistory.objects.bulk_create(
-        #     [
-        #         pm.PostViewsHistory(user=self.request_user, post=post)
-        #         for post in posts
-        #     ]
-        # )
-        return posts
+        Inbox and index entries of authors who have been unfollowed or
+        turned private are removed in background, so posts of authors
+        user can't see anymore are dropped meanwhile.
+        """
 
-    def _fetch_related_posts(
-        self, max: int, current_posts: QuerySet[pm.Post]
-    ) -> QuerySet[pm.Post]:
+        posts = pm.Post.objects.for_feed(self.request_user).in_bulk(post_ids)
+        authors = {post.user_id: post.user for post in posts.values()}
+        visible = {
+            author.pk
+            for author in FollowGraph.filter_visible(
+                self.request_user, authors.values()
+            )
+        }
+        return [
+            posts[pk]
+            for pk in post_ids
+            if pk in posts and posts[pk].user_id in visible
+        ]
+
+    def _paginate(
+        self, fetch_candidates: Callable[[int], list[Candidate]], limit: int
+    ) -> tuple[list[int], bool]:
         """
-        Extracting user's liked post's hashtags, then fetching
-        newly uploaded posts containing those hashtags.
+        Filling a page with unseen posts from 'fetch_candidates',
+        moving the cursor over every examined post.
+
+        Returns the page's post ids, and whether the source has been
+        exhausted.
         """
 
-        recent_liked_posts = pm.PostLikes.fetch_recent_liked_posts(
-            self.request_user
-        )
-        duplicate_tags = set()
-        tags = set()
-        posts = None
-
-        while len(recent_liked_posts) != 0:
-            for post in recent_liked_posts:
-                post: pm.Post
-                hashtags = (
-                    post.hashtags.all()
-                    .values_list("title", flat=True)
-                    .exclude(title__in=duplicate_tags)
-                    .distinct()
+        page = []
+        if limit <= 0:
+            return page, False
+
+        for _ in range(self.MAX_ROUNDS):
+            wanted = (limit - len(page)) * self.OVERFETCH
+            candidates = fetch_candidates(wanted)
+            seen = self._fetch_seen_post_ids(candidates)
+            for created_at, post_id in candidates:
+                self._position = TimelineCursor(
+                    self._position.source, created_at, post_id
                 )
-                # Removing so we dont look for duplicate hashtags.
-                recent_liked_posts.remove(post)
-                if not hashtags:
+                if post_id in seen:
                     continue
 
-                tags.update(hashtags)
-                if len(tags) >= 5:
-                    duplicate_tags.update(tags)
-                    tags = []
-                    break
-            query = (
-                pm.Post.objects.filter(
-                    hashtags__title__in=tags,
-                    user__is_private=False,
-                )
-                .exclude(
-                    viewers=self.request_user,
-                )
-                .exclude(
-                    id__in=[post.id for post in current_posts],
-                )
-                .distinct()[:max]
+                page.append(post_id)
+                if len(page) == limit:
+                    return page, False
+
+            if len(candidates) < wanted:
+                return page, True
+
+        return page, False
+
+    def _fetch_seen_post_ids(self, candidates: list[Candidate]) -> set[int]:
+        """
+        Probing user's view history only for the given posts, instead
+        of anti-joining the whole history.
+        """
+
+        return pm_core.PostViewsRecorder.seen_post_ids(
+            self.request_user.pk, [post_id for _, post_id in candidates]
+        )
+
+    def _fetch_recent_followings_posts(self, limit: int) -> list[Candidate]:
+        """
+        Reading recently uploaded posts by user's followings from
+        their timeline inbox.
+
+        Posts of authors with too many followers are not pushed into
+        inboxes, so they are fetched from followings at read time and
+        merged with inbox posts.
+        """
+
+        since = timezone.now() - pm_core.TimelineInbox.WINDOW
+        inbox_posts = (
+            pm.TimelineEntry.objects.filter(
+                self._position.after("post_created_at", "post_id"),
+                user=self.request_user,
+                post_created_at__gte=since,
             )
+            .order_by("-post_created_at", "-post_id")
+            .values_list("post_created_at", "post_id")[:limit]
+        )
+        pulled_posts = (
+            pm.Post.objects.filter(
+                self._position.after("created_at", "id"),
+                user__user_followers__follower=self.request_user,
+                is_fanned_out=False,
+                created_at__gte=since,
+            )
+            .order_by("-created_at", "-id")
+            .values_list("created_at", "id")[:limit]
+        )
+
+        posts = merge(inbox_posts, pulled_posts, reverse=True)
+        return list(islice(posts, limit))
+
+    def _fetch_related_posts(
+        self, limit: int, current_post_ids: list[int]
+    ) -> list[Candidate]:
+        """
+        Fetching newly uploaded posts containing hashtags of user's
+        recently liked posts, by merging those hashtags posting lists.
+        """
 
-            if posts:
-                posts.union(query)
-            else:
-                posts = query
+        if self._liked_hashtag_ids is None:
+            self._liked_hashtag_ids = self._fetch_liked_hashtag_ids()
 
-            if not 5 > len(posts) > 0:
-                break
+        if not self._liked_hashtag_ids:
+            return []
 
-        # pm.PostViewsHistory.objects.bulk_create(
-        #     [
-        #         pm.PostViewsHistory(user=self.request_user, post=post)
-        #         for post in posts
-        #     ]
-        # )
-        return posts
+        return pm_core.HashtagIndex.fetch(
+            self._liked_hashtag_ids,
+            self._position.after("post_created_at", "post_id"),
+            limit,
+            current_post_ids,
+        )
+
+    def _fetch_liked_hashtag_ids(self, max: int = 5) -> list[int]:
+        """
+        Extracting hashtags of user's recently liked posts, hashtags
+        of more recently liked posts come first.
+        """
+
+        recent_liked_post_ids = list(
+            pm.PostLikes.objects.filter(user=self.request_user)
+            .order_by("-date")
+            .values_list("post_id", flat=True)[:20]
+        )
+        post_hashtags = defaultdict(list)
+        for post_id, hashtag_id in pm.Post.hashtags.through.objects.filter(
+            post__in=recent_liked_post_ids
+        ).values_list("post_id", "hashtag_id"):
+            post_hashtags[post_id].append(hashtag_id)
+
+        hashtag_ids = dict.fromkeys(
+            hashtag_id
+            for post_id in recent_liked_post_ids
+            for hashtag_id in post_hashtags[post_id]
+        )
+        return list(hashtag_ids)[:max]
@@ -0,0 +1,52 @@
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from utils import hashers
+
+
+class Command(BaseCommand):
+    help = (
+        "Timing password hashers, so their cost parameters can be tuned "
+        "against login latency. Runs the configured hasher by default."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=20)
+        parser.add_argument(
+            "--algorithm",
+            action="append",
+            choices=hashers.HASHERS.keys(),
+            help="Hasher to benchmark, can be repeated.",
+        )
+        parser.add_argument(
+            "--params",
+            type=json.loads,
+            default={},
+            help='Hasher parameters as json, e.g. \'{"n": 32768}\'.',
+        )
+
+    def handle(self, *args, rounds: int, algorithm: list, params, **options):
+        for name in algorithm or [settings.PASSWORD_HASHER]:
+            try:
+                hasher = hashers.get_hasher(name, **params)
+            except (ValueError, TypeError) as e:
+                self.stderr.write(f"{name}: {e}")
+                continue
+
+            timings = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                hasher.encode("benchmark password", "benchmarksalt")
+                timings.append((time.perf_counter() - start) * 1000)
+
+            timings.sort()
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            self.stdout.write(
+                f"{name} {hashers._encode_params(hasher.params)}: "
+                f"p50={statistics.median(timings):.1f}ms "
+                f"p99={p99:.1f}ms max={timings[-1]:.1f}ms"
+            )
@@ -0,0 +1,169 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from post import core as pc
+from post import models as pm
+from user.models import User
+from utils.redis_utils import get_redis
+
+USERNAME_PREFIX = "seen_bench_"
+
+
+class Command(BaseCommand):
+    help = (
+        "Comparing unseen posts lookup with a SQL anti-join against "
+        "view history, and with over-fetching candidates filtered by "
+        "the seen posts Bloom filter. '--populate' creates the given "
+        "number of view rows first, e.g. '--populate 10000000'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--populate", type=int, default=0)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--page-size", type=int, default=5)
+        parser.add_argument("--rounds", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        self.client = get_redis()
+        if self.client is None:
+            raise CommandError("redis backend is not configured.")
+
+        if options["populate"]:
+            self._populate(
+                options["populate"], options["users"], options["batch_size"]
+            )
+
+        viewers = list(
+            User.objects.filter(
+                username__startswith=USERNAME_PREFIX
+            ).values_list("pk", flat=True)
+        )
+        if not viewers:
+            raise CommandError("no benchmark users, use '--populate'.")
+
+        self.stdout.write(
+            f"{pm.PostViewsHistory.objects.count()} view rows, "
+            f"{len(viewers)} users."
+        )
+        page_size = options["page_size"]
+        for name, lookup in (
+            ("sql exclude", self._sql_exclude),
+            ("bloom filter", self._bloom_filter),
+        ):
+            timings = []
+            for _ in range(options["rounds"]):
+                user_id = random.choice(viewers)
+                start = time.perf_counter()
+                lookup(user_id, page_size)
+                timings.append((time.perf_counter() - start) * 1000)
+            self._report(name, timings)
+
+    def _report(self, name: str, timings: list[float]):
+        timings.sort()
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(
+            f"{name}: p50={statistics.median(timings):.1f}ms "
+            f"p99={p99:.1f}ms"
+        )
+
+    @staticmethod
+    def _sql_exclude(user_id: int, page_size: int) -> list[int]:
+        return list(
+            pm.Post.objects.exclude(viewers=user_id)
+            .order_by("-created_at", "-id")
+            .values_list("id", flat=True)[:page_size]
+        )
+
+    def _bloom_filter(self, user_id: int, page_size: int) -> list[int]:
+        seen_filter = pc.PostViewsRecorder.seen_filter(self.client, user_id)
+        page = []
+        after = Q()
+        while len(page) < page_size:
+            candidates = list(
+                pm.Post.objects.filter(after)
+                .order_by("-created_at", "-id")
+                .values_list("created_at", "id")[: page_size * 2]
+            )
+            if not candidates:
+                break
+
+            post_ids = [post_id for _, post_id in candidates]
+            for post_id, seen in zip(
+                post_ids, seen_filter.contains(post_ids)
+            ):
+                if not seen:
+                    page.append(post_id)
+
+            created_at, post_id = candidates[-1]
+            after = Q(created_at__lt=created_at) | Q(
+                created_at=created_at, id__lt=post_id
+            )
+        return page[:page_size]
+
+    def _populate(self, rows: int, users: int, batch_size: int):
+        """
+        Creating 'users' users which each has seen every other post
+        of twice as many posts, so both lookups have to skip seen posts.
+        """
+
+        views_per_user = -(-rows // users)
+        author_name = f"seen_author_{time.time_ns()}"
+        author = User.objects.create(
+            username=author_name, email=f"{author_name}@example.com"
+        )
+        self._bulk_create(
+            pm.Post,
+            (
+                pm.Post(user=author, is_active=True)
+                for _ in range(views_per_user * 2)
+            ),
+            batch_size,
+        )
+        post_ids = list(
+            pm.Post.objects.filter(user=author)
+            .order_by("-created_at", "-id")
+            .values_list("id", flat=True)[::2]
+        )
+
+        suffix = time.time_ns()
+        self._bulk_create(
+            User,
+            (
+                User(username=f"{USERNAME_PREFIX}{suffix}_{i}")
+                for i in range(users)
+            ),
+            batch_size,
+        )
+        user_ids = User.objects.filter(
+            username__startswith=f"{USERNAME_PREFIX}{suffix}_"
+        ).values_list("pk", flat=True)
+
+        for user_id in user_ids:
+            self._bulk_create(
+                pm.PostViewsHistory,
+                (
+                    pm.PostViewsHistory(user_id=user_id, post_id=post_id)
+                    for post_id in post_ids
+                ),
+                batch_size,
+            )
+            pc.PostViewsRecorder.seen_filter(self.client, user_id).add(
+                post_ids
+            )
+        self.stdout.write(f"created {len(post_ids) * users} view rows.")
+
+    @staticmethod
+    def _bulk_create(model, objs, batch_size: int):
+        batch = []
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                model.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch)
@@ -0,0 +1,163 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from user.authenticate import generate_jwt_for_test_user
+from user.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Load testing a view through the WSGI and ASGI handlers in "
+        "process, with a single worker serving many concurrent clients. "
+        "'--client-delay' simulates slow clients, which hold a sync "
+        "worker for the whole request but not an async one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="User to authenticate as.")
+        parser.add_argument("--path", default="/users/timeline/")
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host header, must be in 'ALLOWED_HOSTS'.",
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument(
+            "--client-delay",
+            type=float,
+            default=0.05,
+            help="Seconds each client takes to send its request.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of WSGI worker threads.",
+        )
+
+    def handle(self, *args, username: str, **options):
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"user '{username}' doesn't exist.")
+
+        cookie = SimpleCookie({"token": generate_jwt_for_test_user(user)})
+        self.cookie = cookie.output(header="", sep=";").strip()
+        url = urlsplit(options["path"])
+        self.path, self.query = url.path, url.query
+        self.host = options["host"]
+        self.delay = options["client_delay"]
+        total = options["requests"]
+
+        self._report(
+            "wsgi", *self._benchmark_wsgi(total, options["workers"])
+        )
+        self._report(
+            "asgi",
+            *asyncio.run(self._benchmark_asgi(total, options["concurrency"])),
+        )
+
+    def _report(
+        self, name: str, elapsed: float, timings: list[float], failed: int
+    ):
+        timings.sort()
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(
+            f"{name}: {len(timings) / elapsed:.1f} req/s "
+            f"p50={statistics.median(timings) * 1000:.1f}ms "
+            f"p99={p99 * 1000:.1f}ms failed={failed}"
+        )
+
+    def _benchmark_wsgi(
+        self, total: int, workers: int
+    ) -> tuple[float, list[float], int]:
+        handler = WSGIHandler()
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": self.path,
+            "QUERY_STRING": self.query,
+            "HTTP_COOKIE": self.cookie,
+            "HTTP_HOST": self.host,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": BytesIO(),
+        }
+
+        def request(_) -> tuple[float, bool]:
+            start = time.perf_counter()
+            # A sync worker is busy while the slow client sends its request.
+            time.sleep(self.delay)
+            statuses = []
+            response = handler(
+                dict(environ), lambda status, headers: statuses.append(status)
+            )
+            response.close()
+            close_old_connections()
+            return time.perf_counter() - start, statuses[0] != "200 OK"
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(workers) as executor:
+            results = list(executor.map(request, range(total)))
+        return self._summarize(time.perf_counter() - start, results)
+
+    async def _benchmark_asgi(
+        self, total: int, concurrency: int
+    ) -> tuple[float, list[float], int]:
+        handler = ASGIHandler()
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": self.path,
+            "query_string": self.query.encode(),
+            "headers": [
+                (b"cookie", self.cookie.encode()),
+                (b"host", self.host.encode()),
+            ],
+            "server": ("localhost", 80),
+        }
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def request() -> tuple[float, bool]:
+            async with semaphore:
+                start = time.perf_counter()
+                sent = False
+                statuses = []
+
+                async def receive():
+                    nonlocal sent
+                    if sent:
+                        # Client stays connected until the response is sent.
+                        await asyncio.Future()
+                    sent = True
+                    await asyncio.sleep(self.delay)
+                    return {"type": "http.request", "body": b""}
+
+                async def send(message):
+                    if message["type"] == "http.response.start":
+                        statuses.append(message["status"])
+
+                await handler(dict(scope), receive, send)
+                return time.perf_counter() - start, statuses[0] != 200
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(request() for _ in range(total)))
+        return self._summarize(time.perf_counter() - start, results)
+
+    @staticmethod
+    def _summarize(
+        elapsed: float, results: list[tuple[float, bool]]
+    ) -> tuple[float, list[float], int]:
+        timings = [timing for timing, _ in results]
+        return elapsed, timings, sum(failed for _, failed in results)
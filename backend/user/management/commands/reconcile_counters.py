@@ -0,0 +1,91 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+# model -> {counter field: (related model, foreign key to model)}
+COUNTERS = {
+    "user.User": {
+        "followers_count": ("user.Follow", "following"),
+        "followings_count": ("user.Follow", "follower"),
+        "follow_requests_count": ("user.FollowRequest", "to_user"),
+        "posts_count": ("post.Post", "user"),
+    },
+    "post.Post": {
+        "likes_count": ("post.PostLikes", "post"),
+        "comments_count": ("comment.Comment", "post"),
+    },
+    "comment.Comment": {
+        "likes_count": ("comment.CommentLikes", "comment"),
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculating denormalized counter columns from their related "
+        "rows, in batches of primary keys."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--model",
+            choices=COUNTERS.keys(),
+            help="Only reconcile counters of this model.",
+        )
+
+    def handle(self, *args, batch_size: int, model: str, **options):
+        for label, counters in COUNTERS.items():
+            if model and label != model:
+                continue
+
+            fixed = self._reconcile(
+                apps.get_model(label), counters, batch_size
+            )
+            self.stdout.write(f"{label}: {fixed} rows fixed.")
+
+    def _reconcile(self, model, counters: dict, batch_size: int) -> int:
+        fixed = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                objs = list(
+                    model.objects.filter(pk__gt=last_pk)
+                    .order_by("pk")
+                    .only("pk", *counters)
+                    .select_for_update()[:batch_size]
+                )
+                if not objs:
+                    return fixed
+
+                pks = [obj.pk for obj in objs]
+                last_pk = pks[-1]
+                true_counts = {
+                    name: self._count(related, fk, pks)
+                    for name, (related, fk) in counters.items()
+                }
+
+                changed = []
+                for obj in objs:
+                    is_changed = False
+                    for name, counts in true_counts.items():
+                        count = counts.get(obj.pk, 0)
+                        if getattr(obj, name) != count:
+                            setattr(obj, name, count)
+                            is_changed = True
+                    if is_changed:
+                        changed.append(obj)
+
+                model.objects.bulk_update(changed, list(counters))
+                fixed += len(changed)
+
+    @staticmethod
+    def _count(related: str, fk: str, pks: list[int]) -> dict[int, int]:
+        return dict(
+            apps.get_model(related)
+            .objects.filter(**{f"{fk}__in": pks})
+            .values(fk)
+            .annotate(total=Count("pk"))
+            .values_list(fk, "total")
+        )
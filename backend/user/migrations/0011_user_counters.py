@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0010_alter_user_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='follow_requests_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='followings_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='posts_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0012_alter_user_password'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['follower', 'date'], name='follow_follower_date_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0014_follow_unique_follow'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
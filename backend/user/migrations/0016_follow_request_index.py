@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0015_renditions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='followrequest',
+            index=models.Index(fields=['to_user', 'created_at'], name='follow_request_to_user_idx'),
+        ),
+    ]
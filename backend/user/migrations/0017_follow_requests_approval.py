@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0016_follow_request_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowRequestsApproval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('before', models.DateTimeField()),
+                ('total', models.PositiveIntegerField()),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='user.user')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['finished_at', 'updated_at'], name='approval_unfinished_idx')],
+            },
+        ),
+    ]
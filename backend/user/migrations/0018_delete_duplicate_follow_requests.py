@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+def delete_duplicates(apps, schema_editor):
+    """
+    Keeping only the oldest request of each (to_user, from_user) pair,
+    so the unique constraint can be created.
+    """
+
+    FollowRequest = apps.get_model("user", "FollowRequest")
+    keep = (
+        FollowRequest.objects.values("to_user", "from_user")
+        .annotate(keep_id=models.Min("id"))
+        .values("keep_id")
+    )
+    FollowRequest.objects.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0017_follow_requests_approval"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0018_delete_duplicate_follow_requests'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='followrequest',
+            constraint=models.UniqueConstraint(fields=('to_user', 'from_user'), name='unique_follow_request'),
+        ),
+    ]
@@ -1,7 +1,13 @@
 import re
+from functools import partial
+from hashlib import sha256
 
 from utils.model_utils import generate_path
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
 from django.db import models as m
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from rest_framework.serializers import ValidationError
 from utils import auth_utils as utils
 
@@ -32,7 +38,7 @@ class BasicUserInfo(m.Model):
 
 class User(BasicUserInfo):
     is_private = m.BooleanField(default=False)
-    password = m.CharField(max_length=128)
+    password = m.CharField(max_length=255)
     salt = m.CharField(max_length=100)
     followers = m.ManyToManyField(
         to="self",
@@ -60,24 +66,90 @@ class User(BasicUserInfo):
         related_name="followings_hide_story",
         blank=True,
     )
+    profile_renditions = m.JSONField(default=dict, blank=True)
+
+    # Denormalized counters, they are updated with F() expressions
+    # wherever their rows are created or deleted, and can be fixed by
+    # running 'reconcile_counters' management command.
+    followers_count = m.IntegerField(default=0)
+    followings_count = m.IntegerField(default=0)
+    follow_requests_count = m.IntegerField(default=0)
+    posts_count = m.IntegerField(default=0)
+
+    COUNTER_FIELDS = (
+        "followers_count",
+        "followings_count",
+        "follow_requests_count",
+        "posts_count",
+    )
+
+    # Fields kept in authenticated user's cached snapshot, password and
+    # counters are left deferred so they are always read from database.
+    AUTH_CACHE_FIELDS = (
+        "id",
+        "username",
+        "nickname",
+        "first_name",
+        "last_name",
+        "profile",
+        "profile_renditions",
+        "biography",
+        "email",
+        "phone_number",
+        "is_active",
+        "is_deleted",
+        "is_private",
+        "salt",
+    )
 
     @property
     def total_followers(self):
-        return self.followers.count()
+        return self.followers_count
 
     @property
     def total_followings(self):
-        return self.followings.count()
+        return self.followings_count
 
     @property
     def total_follow_requests(self):
-        return self.follow_requests.count()
+        return self.follow_requests_count
 
     @property
     def total_posts(self):
-        return self.post_set.count()
+        return self.posts_count
+
+    @staticmethod
+    def auth_cache_key(username: str, salt: str) -> str:
+        digest = sha256(f"{username}:{salt}".encode()).hexdigest()
+        return f"auth:user:{digest}"
+
+    @classmethod
+    def from_auth_snapshot(cls, snapshot: dict) -> "User":
+        """
+        Building a user from its cached snapshot without hitting the
+        database, fields missing from the snapshot are deferred.
+        """
+
+        return cls.from_db(
+            DEFAULT_DB_ALIAS, list(snapshot.keys()), list(snapshot.values())
+        )
+
+    def forget_auth_cache(self):
+        cache.delete(User.auth_cache_key(self.username, self.salt))
 
     def save(self, *args, **kwargs):
+        # Current (username, salt) pair must not be served from cache
+        # anymore, whether the salt gets rotated or the account changes.
+        # It's forgotten again once the change commits, since a request
+        # may cache the old row meanwhile.
+        if self.pk:
+            self.forget_auth_cache()
+            transaction.on_commit(
+                partial(
+                    cache.delete, User.auth_cache_key(self.username, self.salt)
+                )
+            )
+
         if kwargs.pop("change_salt", None):
             self.salt = utils.generate_hash()
             self.password = utils.make_password(self.password, self.salt)
@@ -141,10 +213,20 @@ class User(BasicUserInfo):
             )
 
     def can_view(self, other_user: "User") -> bool:
+        from .core import FollowGraph
+
         if other_user.is_private is False or self.pk == other_user.pk:
             return True
 
-        return other_user.followers.filter(pk=self.pk).exists()
+        return FollowGraph.is_following(self.pk, other_user.pk)
+
+    async def acan_view(self, other_user: "User") -> bool:
+        from .core import FollowGraph
+
+        if other_user.is_private is False or self.pk == other_user.pk:
+            return True
+
+        return await FollowGraph.ais_following(self.pk, other_user.pk)
 
     @staticmethod
     def validate_email(email: str):
@@ -195,6 +277,19 @@ class User(BasicUserInfo):
         )
 
 
+@receiver(post_save, sender=User)
+def render_profile(
+    sender, instance: User, update_fields: frozenset = None, **kwargs
+):
+    from post import tasks
+
+    if update_fields is not None and "profile" not in update_fields:
+        return
+    if instance.get_deferred_fields() & {"profile", "profile_renditions"}:
+        return
+    tasks.schedule_renditions(instance, "profile", "profile_renditions")
+
+
 class Follow(m.Model):
     following = m.ForeignKey(
         User, on_delete=m.CASCADE, related_name="user_followers"
@@ -204,6 +299,18 @@ class Follow(m.Model):
     )
     date = m.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            m.UniqueConstraint(
+                fields=["follower", "following"], name="unique_follow"
+            )
+        ]
+        indexes = [
+            m.Index(
+                fields=["follower", "date"], name="follow_follower_date_idx"
+            )
+        ]
+
 
 class FollowRequest(m.Model):
     to_user = m.ForeignKey(
@@ -213,3 +320,40 @@ class FollowRequest(m.Model):
         User, on_delete=m.CASCADE, related_name="pending_follow_requests"
     )
     created_at = m.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            m.UniqueConstraint(
+                fields=["to_user", "from_user"], name="unique_follow_request"
+            )
+        ]
+        indexes = [
+            m.Index(
+                fields=["to_user", "created_at"],
+                name="follow_request_to_user_idx",
+            )
+        ]
+
+
+class FollowRequestsApproval(m.Model):
+    """
+    Progress of approving all follow requests a user received before
+    'before', which runs in background once they turn public, see
+    'core.FollowRequestsApprovalJob'.
+    """
+
+    user = m.ForeignKey(User, on_delete=m.CASCADE)
+    before = m.DateTimeField()
+    total = m.PositiveIntegerField()
+    approved = m.PositiveIntegerField(default=0)
+    created_at = m.DateTimeField(auto_now_add=True)
+    updated_at = m.DateTimeField(auto_now=True)
+    finished_at = m.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            m.Index(
+                fields=["finished_at", "updated_at"],
+                name="approval_unfinished_idx",
+            )
+        ]
@@ -1,4 +1,4 @@
-from post.serializers import MinimalPostSerializer
+from post.serializers import MinimalPostSerializer, RenditionsField
 from rest_framework import serializers
 
 from . import models as m
@@ -103,6 +103,7 @@ class UserDataSerializer(serializers.ModelSerializer):
     firstName = serializers.CharField(source="first_name", required=False)
     lastName = serializers.CharField(source="last_name", required=False)
     profile = serializers.ImageField(required=False)
+    profileRenditions = RenditionsField("profile", "profile_renditions")
     biography = serializers.CharField(max_length=1000, required=False)
     email = serializers.EmailField(required=False)
     phoneNumber = serializers.CharField(source="phone_number", required=False)
@@ -126,6 +127,7 @@ class UserDataSerializer(serializers.ModelSerializer):
             "firstName",
             "lastName",
             "profile",
+            "profileRenditions",
             "biography",
             "email",
             "phoneNumber",
@@ -200,6 +202,7 @@ class UserPreviewSerializer(UserDataSerializer):
             "firstName",
             "lastName",
             "profile",
+            "profileRenditions",
             "biography",
             "isPrivate",
             "totalFollowers",
@@ -231,3 +234,34 @@ class ResetPasswordSerializer(serializers.Serializer):
         validators=[m.User.validate_password],
         source="new_password",
     )
+
+
+class FollowRequestsSerializer(serializers.Serializer):
+    userIds = serializers.ListField(
+        child=serializers.IntegerField(),
+        source="user_ids",
+        required=False,
+        allow_empty=False,
+        max_length=1000,
+    )
+    before = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if ("user_ids" in attrs) == ("before" in attrs):
+            raise serializers.ValidationError(
+                {
+                    "error": "either 'userIds' or 'before' must be given.",
+                    "code": "invalidData",
+                }
+            )
+
+        return super().validate(attrs)
+
+
+class FollowRequestsApprovalSerializer(serializers.ModelSerializer):
+    createdAt = serializers.DateTimeField(source="created_at")
+    finishedAt = serializers.DateTimeField(source="finished_at")
+
+    class Meta:
+        model = m.FollowRequestsApproval
+        fields = ["total", "approved", "createdAt", "finishedAt"]
@@ -8,6 +8,7 @@ from django.conf import settings
 from django.core.mail import send_mail
 from user.models import User
 
+from . import core
 from . import models as m
 
 r = redis.Redis(settings.REDIS_BACKEND_HOST, settings.REDIS_BACKEND_PORT)
@@ -36,3 +37,13 @@ def send_forget_password_email(user_id: m.User) -> int:
         from_email="noreplay@instagram.com",
         recipient_list=[user.email],
     )
+
+
+@shared_task
+def approve_follow_requests(job_id: int) -> int:
+    return core.FollowRequestsApprovalJob.run(job_id)
+
+
+@shared_task
+def resume_follow_requests_approvals() -> int:
+    return core.FollowRequestsApprovalJob.resume()
@@ -34,6 +34,12 @@ class TestFollow(APITestCase):
         validator = Follow(self.target_user.pk, self.user)
         validator.is_valid() and validator.follow_user()
         self.assertRaises(PermissionError, validator.follow_user)
+
+        validator = Follow(self.target_user.pk, self.user)
+        self.assertEqual(validator.is_valid(), True)
+        self.assertEqual(validator.follow_user(), False)
+        self.assertEqual(validator.errors["code"], "duplicateFollow")
+        self.target_user.refresh_from_db()
         self.assertEqual(self.target_user.total_followers, 1)
         self.assertEqual(self.user.total_followings, 1)
 
@@ -54,3 +60,15 @@ class TestFollow(APITestCase):
         self.assertEqual(
             _check_following_request(self.user, self.target_user), True
         )
+
+    def test_duplicate_follow_request(self):
+        self.target_user.is_private = True
+        self.target_user.save()
+        for _ in range(2):
+            validator = Follow(self.target_user.pk, self.user)
+            self.assertEqual(validator.is_valid(), True)
+            self.assertEqual(validator.follow_user(), True)
+
+        self.target_user.refresh_from_db()
+        self.assertEqual(self.target_user.total_follow_requests, 1)
+        self.assertEqual(self.target_user.follow_requests.count(), 1)
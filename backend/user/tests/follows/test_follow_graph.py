@@ -0,0 +1,139 @@
+from unittest import mock
+
+from django.conf import settings
+from rest_framework.test import APITestCase
+
+from user.core import Follow, FollowGraph, UnFollow
+from user.models import Follow as FollowModel
+from user.models import User
+from utils.utils_tests import use_fake_redis
+
+
+class TestFollowGraph(APITestCase):
+    def setUp(self):
+        self.user = User._create_test_user("test")
+        self.public = User._create_test_user("public")
+        self.private = User._create_test_user("private", True)
+        self.followed = User._create_test_user("followed", True)
+        self.followed.followers.add(self.user)
+
+    def test_is_following(self):
+        user, followed = self.user.pk, self.followed.pk
+        self.assertTrue(FollowGraph.is_following(user, followed))
+        self.assertFalse(FollowGraph.is_following(followed, user))
+
+        validator = Follow(self.public.pk, self.user)
+        validator.is_valid() and validator.follow_user()
+        self.assertTrue(FollowGraph.is_following(user, self.public.pk))
+        self.assertEqual(
+            FollowGraph.followings(user), {self.public.pk, followed}
+        )
+
+        validator = UnFollow(self.public.pk, self.user)
+        validator.is_valid() and validator.unfollow_user()
+        self.assertFalse(FollowGraph.is_following(user, self.public.pk))
+
+    def test_filter_visible(self):
+        authors = [self.public, self.private, self.followed, self.user]
+        with self.assertNumQueries(1):
+            visible = FollowGraph.filter_visible(self.user, authors)
+        self.assertEqual(visible, [self.public, self.followed, self.user])
+
+        # Public authors need no lookup.
+        with self.assertNumQueries(0):
+            FollowGraph.filter_visible(self.user, [self.public, self.user])
+
+    def test_can_view(self):
+        self.assertTrue(self.user.can_view(self.followed))
+        self.assertFalse(self.user.can_view(self.private))
+        self.assertTrue(self.private.can_view(self.private))
+
+
+class TestRedisFollowGraph(APITestCase):
+    def setUp(self):
+        self.redis = use_fake_redis(self)
+        self.user = User._create_test_user("test")
+        self.public = User._create_test_user("public")
+        self.followed = User._create_test_user("followed", True)
+        self.followed.followers.add(self.user)
+
+    def key(self, user: User) -> str:
+        return FollowGraph.KEY.format(user_id=user.pk)
+
+    def test_loaded_once(self):
+        self.assertEqual(
+            FollowGraph.followings(self.user.pk), {self.followed.pk}
+        )
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                FollowGraph.is_following(self.user.pk, self.followed.pk)
+            )
+            self.assertEqual(
+                FollowGraph.followings_among(
+                    self.user.pk, [self.public.pk, self.followed.pk]
+                ),
+                {self.followed.pk},
+            )
+
+        # Users following nobody are loaded too.
+        self.assertEqual(FollowGraph.followings(self.public.pk), set())
+        self.assertEqual(self.redis.smembers(self.key(self.public)), {b"-"})
+        with self.assertNumQueries(0):
+            self.assertEqual(FollowGraph.followings(self.public.pk), set())
+
+    def test_absolute_ttl(self):
+        FollowGraph.followings(self.user.pk)
+        ttl = self.redis.ttl(self.key(self.user))
+        self.assertTrue(0 < ttl <= settings.FOLLOW_GRAPH_TTL)
+
+        self.redis.expire(self.key(self.user), 10)
+        FollowGraph.is_following(self.user.pk, self.followed.pk)
+        FollowGraph.followings(self.user.pk)
+        self.assertLessEqual(self.redis.ttl(self.key(self.user)), 10)
+
+    def test_write_through(self):
+        FollowGraph.followings(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            validator = Follow(self.public.pk, self.user)
+            validator.is_valid() and validator.follow_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                FollowGraph.followings(self.user.pk),
+                {self.public.pk, self.followed.pk},
+            )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            validator = UnFollow(self.public.pk, self.user)
+            validator.is_valid() and validator.unfollow_user()
+        self.assertFalse(
+            FollowGraph.is_following(self.user.pk, self.public.pk)
+        )
+
+        # Sets which aren't loaded are left alone.
+        with self.captureOnCommitCallbacks(execute=True):
+            FollowGraph.add(self.public.pk, [self.followed.pk])
+        self.assertFalse(self.redis.exists(self.key(self.followed)))
+
+    def test_unfollow_during_load(self):
+        evaluate = self.redis.eval
+
+        def unfollow_then_evaluate(script, *args):
+            # Unfollow commits after the database read of the load.
+            if script == FollowGraph.LOAD_SCRIPT:
+                with self.captureOnCommitCallbacks(execute=True):
+                    FollowModel.objects.filter(
+                        follower=self.user, following=self.followed
+                    ).delete()
+                    FollowGraph.remove(self.followed.pk, [self.user.pk])
+            return evaluate(script, *args)
+
+        with mock.patch.object(
+            self.redis, "eval", side_effect=unfollow_then_evaluate
+        ):
+            FollowGraph.followings(self.user.pk)
+
+        self.assertFalse(self.redis.exists(self.key(self.user)))
+        self.assertFalse(
+            FollowGraph.is_following(self.user.pk, self.followed.pk)
+        )
+        self.assertFalse(self.user.can_view(self.followed))
@@ -0,0 +1,88 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from user import core
+from user.models import Follow, FollowRequest
+from utils.utils_tests import ViewTests
+
+
+class TestFollowRequests(ViewTests):
+    def setUp(self):
+        self.user = self.create_user("test", True)
+        self.set_cookie("token", self.user)
+        self.create_url("user:follow_requests", [])
+
+        self.requesters = [self.create_user(f"requester{i}") for i in range(3)]
+        for requester in self.requesters:
+            self.user.follow_requests.add(requester)
+        self.user.follow_requests_count = 3
+        self.user.save()
+
+    def test_approve(self):
+        first, second, third = self.requesters
+        res = self.launch_post({"userIds": [first.pk, second.pk]})
+        self.assertEqual(res.status_code, 200, res.json())
+        self.assertEqual(res.json()["count"], 2)
+
+        self.assertEqual(set(self.user.followers.all()), {first, second})
+        self.assertEqual(list(self.user.follow_requests.all()), [third])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.total_followers, 2)
+        self.assertEqual(self.user.total_follow_requests, 1)
+        first.refresh_from_db()
+        self.assertEqual(first.total_followings, 1)
+
+    def test_reject_before(self):
+        first = self.requesters[0]
+        FollowRequest.objects.exclude(from_user=first).update(
+            created_at=timezone.now() + timedelta(hours=1)
+        )
+        res = self.launch_delete({"before": timezone.now().isoformat()})
+        self.assertEqual(res.status_code, 200, res.json())
+        self.assertEqual(res.json()["count"], 1)
+
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(
+            set(self.user.follow_requests.all()), set(self.requesters[1:])
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.total_follow_requests, 2)
+
+    def test_approve_before_in_batches(self):
+        first, second, third = self.requesters
+        FollowRequest.objects.filter(from_user=third).update(
+            created_at=timezone.now() - timedelta(hours=1)
+        )
+        before = timezone.now().isoformat()
+
+        with mock.patch.object(core.FollowRequests, "MAX_REQUESTS", 2):
+            res = self.launch_post({"before": before})
+            self.assertEqual(res.status_code, 200, res.json())
+            self.assertEqual(res.json()["count"], 2)
+            self.assertTrue(res.json()["hasMore"])
+            self.assertEqual(list(self.user.follow_requests.all()), [second])
+            self.assertEqual(set(self.user.followers.all()), {first, third})
+
+            res = self.launch_post({"before": before})
+            self.assertEqual(res.json()["count"], 1)
+            self.assertFalse(res.json()["hasMore"])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.total_followers, 3)
+        self.assertEqual(self.user.total_follow_requests, 0)
+
+    def test_invalid_data(self):
+        res = self.launch_post({})
+        self.assertEqual(res.status_code, 400)
+
+        res = self.launch_post(
+            {"userIds": [1], "before": timezone.now().isoformat()}
+        )
+        self.assertEqual(res.status_code, 400)
+
+    def test_no_requests(self):
+        another = self.create_user("another_test")
+        res = self.launch_post({"userIds": [another.pk]})
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["code"], "noFollowRequests")
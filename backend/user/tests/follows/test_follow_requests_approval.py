@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+
+from user import core
+from user.models import FollowRequestsApproval
+from utils.utils_tests import ViewTests
+
+
+@override_settings(FOLLOW_REQUESTS_CHUNK_SIZE=2)
+class TestFollowRequestsApproval(ViewTests):
+    def setUp(self):
+        self.user = self.create_user("test", True)
+        self.requesters = [self.create_user(f"requester{i}") for i in range(5)]
+        for requester in self.requesters:
+            self.user.follow_requests.add(requester)
+        self.user.follow_requests_count = 5
+        self.user.save()
+
+    def test_turn_public(self):
+        validator = core.ChangeSettings(self.user, {"is_private": False})
+        self.assertTrue(validator.is_valid())
+        with self.captureOnCommitCallbacks() as callbacks:
+            validator.change_settings()
+
+        # Requests are approved in background.
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.user.followers.count(), 0)
+        job = FollowRequestsApproval.objects.get()
+        self.assertEqual((job.total, job.approved), (5, 0))
+
+        self.assertEqual(core.FollowRequestsApprovalJob.run(job.pk), 5)
+        self.assertEqual(set(self.user.followers.all()), set(self.requesters))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.total_followers, 5)
+        self.assertEqual(self.user.total_follow_requests, 0)
+
+        self.set_cookie("token", self.user)
+        self.create_url("user:follow_requests_approval", [])
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["approval"]["approved"], 5)
+        self.assertIsNotNone(res.json()["approval"]["finishedAt"])
+
+    def test_resume(self):
+        job = FollowRequestsApproval.objects.create(
+            user=self.user, before=timezone.now(), total=5
+        )
+        # Requests after the job has started aren't approved.
+        late = self.create_user("late")
+        self.user.follow_requests.add(late)
+
+        approve_chunk = core.FollowRequestsApprovalJob._approve_chunk
+        self.assertEqual(approve_chunk(job.pk), 2)
+        job.refresh_from_db()
+        self.assertEqual(job.approved, 2)
+        self.assertIsNone(job.finished_at)
+
+        FollowRequestsApproval.objects.filter(pk=job.pk).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+        with self.captureOnCommitCallbacks():
+            self.assertEqual(core.FollowRequestsApprovalJob.resume(), 1)
+
+        self.assertEqual(core.FollowRequestsApprovalJob.run(job.pk), 3)
+        self.assertEqual(list(self.user.follow_requests.all()), [late])
+        self.assertEqual(core.FollowRequestsApprovalJob.run(job.pk), 0)
@@ -80,4 +80,5 @@ class TestFollow(ViewTests):
             "duplicateFollow",
             res.json(),
         )
+        target_user.refresh_from_db()
         self.assertEqual(target_user.total_followers, 1)
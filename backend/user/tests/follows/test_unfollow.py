@@ -1,6 +1,6 @@
 from rest_framework.test import APITestCase
 
-from user.core import UnFollow
+from user.core import Follow, UnFollow
 from user.models import User
 
 from .test_follow_views import (
@@ -11,7 +11,9 @@ from .test_follow_views import (
 
 
 def _follow_user(from_user: User, to_user: User):
-    to_user.followers.add(from_user)
+    validator = Follow(to_user.pk, from_user)
+    validator.is_valid() and validator.follow_user()
+    to_user.refresh_from_db()
 
 
 class TestUnFollow(APITestCase):
@@ -26,6 +28,7 @@ class TestUnFollow(APITestCase):
         self.assertEqual(validator.is_valid(), True)
         validator.unfollow_user()
         self.assertEqual(_check_follower(self.user, self.target_user), False)
+        self.target_user.refresh_from_db()
         self.assertEqual(self.target_user.total_followers, 0)
 
     def test_self_unfollow(self):
@@ -17,6 +17,8 @@ class UnfollowViewTest(ViewTests):
         self.create_url(PATH, [self.anoter_user.pk])
         res = self.launch_delete()
         self.assertEqual(res.status_code, 200, res.json())
+        self.anoter_user.refresh_from_db()
+        self.user.refresh_from_db()
         self.assertEqual(self.anoter_user.total_followers, 0)
         self.assertEqual(self.user.total_followings, 0)
 
@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from user.authenticate import _get_user_from_jwt_token
+from user.models import User
+from utils.utils_tests import ViewTests
+
+
+class TestAuthCache(ViewTests):
+    def setUp(self):
+        cache.clear()
+        self.user = self.create_user("test")
+        self.token = {"username": self.user.username, "salt": self.user.salt}
+
+    def test_cached_user(self):
+        self.assertEqual(_get_user_from_jwt_token(self.token), self.user)
+        with CaptureQueriesContext(connection) as context:
+            user = _get_user_from_jwt_token(self.token)
+
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.username, self.user.username)
+        self.assertEqual(user.total_followers, 0)
+
+    def test_salt_rotation(self):
+        _get_user_from_jwt_token(self.token)
+        self.user.save(change_salt=True)
+        self.assertEqual(_get_user_from_jwt_token(self.token), None)
+
+    def test_deactivation(self):
+        _get_user_from_jwt_token(self.token)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(_get_user_from_jwt_token(self.token), None)
+
+    def test_recached_before_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+            # A concurrent request caching the row before it commits.
+            snapshot = User.objects.values(*User.AUTH_CACHE_FIELDS).get()
+            cache.set(User.auth_cache_key(**self.token), snapshot)
+        self.assertEqual(_get_user_from_jwt_token(self.token), None)
+
+    def test_dashboard(self):
+        self.set_cookie("token", self.user)
+        self.create_url("user:dashboard", [])
+        self.client.get(self.url)
+
+        User.objects.filter(pk=self.user.pk).update(followers_count=3)
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["totalFollowers"], 3)
@@ -0,0 +1,83 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from post import core as pc
+from post import models as pm
+from user import views
+from user.models import User
+from utils.model_utils import increment_counters
+
+
+class TestCounters(APITestCase):
+    def setUp(self):
+        self.user = User._create_test_user("test")
+        self.another_user = User._create_test_user("another_test")
+        self.post = pm.Post._create_test_post(self.user, True)
+
+    def test_like_counters(self):
+        like = pc.PostLike(self.another_user, self.post.pk)
+        like.is_valid() and like.like_post()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.total_likes, 1)
+
+        remove_like = pc.DeletePostLike(self.another_user, self.post.pk)
+        remove_like.is_valid() and remove_like.remove_like()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.total_likes, 0)
+
+    def test_reconcile_counters(self):
+        # Rows created without going through core classes.
+        self.user.followers.add(self.another_user)
+        pm.PostLikes.objects.create(user=self.another_user, post=self.post)
+        User.objects.filter(pk=self.user.pk).update(posts_count=5)
+
+        call_command("reconcile_counters", batch_size=1, stdout=StringIO())
+
+        self.user.refresh_from_db()
+        self.another_user.refresh_from_db()
+        self.post.refresh_from_db()
+        self.assertEqual(self.user.total_followers, 1)
+        self.assertEqual(self.user.total_posts, 1)
+        self.assertEqual(self.another_user.total_followings, 1)
+        self.assertEqual(self.post.total_likes, 1)
+
+    def test_deferred_counters(self):
+        user = User.objects.defer("followers_count").get(pk=self.user.pk)
+        increment_counters(user, followers_count=1)
+        self.assertEqual(user.followers_count, 1)
+
+    def test_reset_password_keeps_counters(self):
+        expire_at = datetime.datetime.now() + datetime.timedelta(hours=1)
+        code = {
+            b"username": b"test",
+            b"expire_at": expire_at.strftime("%Y/%m/%d, %H:%M:%S").encode(),
+        }
+        save = User.save
+
+        def follow_then_save(user, *args, **kwargs):
+            # Another request follows the user while it's being reset.
+            increment_counters(self.user, followers_count=1)
+            save(user, *args, **kwargs)
+
+        with (
+            mock.patch.object(views, "r") as r,
+            mock.patch.object(User, "save", follow_then_save),
+        ):
+            r.hgetall.return_value = code
+            res = self.client.post(
+                reverse("user:reset_password"),
+                {
+                    "code": "code",
+                    "password": "MmNn123mm",
+                    "repeatPassword": "MmNn123mm",
+                },
+                format="json",
+            )
+        self.assertEqual(res.status_code, 200, res.json())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.total_followers, 1)
@@ -0,0 +1,75 @@
+from hashlib import sha256
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from user.models import User
+from utils import hashers
+
+
+class TestHashers(APITestCase):
+    def test_encode_and_verify(self):
+        for algorithm, params in (
+            ("pbkdf2_sha256", {"iterations": 1000}),
+            ("scrypt", {"n": 2**10}),
+        ):
+            hasher = hashers.get_hasher(algorithm, **params)
+            encoded = hasher.encode("password", "salt")
+            self.assertEqual(encoded.split("$")[0], algorithm)
+            self.assertEqual(
+                hashers.check_password("password", encoded, "salt"), True
+            )
+            self.assertEqual(
+                hashers.check_password("wrong", encoded, "salt"), False
+            )
+
+    def test_legacy_hash(self):
+        legacy = sha256(b"password" + b"s$lt").hexdigest()
+        check = hashers.check_password
+        self.assertEqual(check("password", legacy, "s$lt"), True)
+        self.assertEqual(check("wrong", legacy, "s$lt"), False)
+        self.assertEqual(hashers.must_update(legacy), True)
+
+    @override_settings(
+        PASSWORD_HASHER="pbkdf2_sha256",
+        PASSWORD_HASHER_PARAMS={"iterations": 1000},
+    )
+    def test_must_update(self):
+        encoded = hashers.make_password("password", "salt")
+        self.assertEqual(hashers.must_update(encoded), False)
+        with self.settings(PASSWORD_HASHER_PARAMS={"iterations": 2000}):
+            self.assertEqual(hashers.must_update(encoded), True)
+
+    def test_malformed_hash(self):
+        for encoded in ("pbkdf2_sha256$bogus", "pbkdf2_sha256$i=x$salt$hash"):
+            self.assertEqual(
+                hashers.check_password("password", encoded, "salt"), False
+            )
+
+        user = User._create_test_user("test")
+        User.objects.filter(pk=user.pk).update(password="scrypt$n$")
+        res = self.client.post(
+            reverse("user:login"),
+            {"username": "test", "password": "test"},
+            "json",
+        )
+        self.assertEqual(res.status_code, 404)
+
+    def test_rehash_on_login(self):
+        user = User._create_test_user("test")
+        User.objects.filter(pk=user.pk).update(
+            password=sha256(b"test" + user.salt.encode()).hexdigest()
+        )
+
+        res = self.client.post(
+            reverse("user:login"),
+            {"username": "test", "password": "test"},
+            "json",
+        )
+        self.assertEqual(res.status_code, 200)
+        user.refresh_from_db()
+        self.assertEqual(hashers.must_update(user.password), False)
+        self.assertEqual(
+            hashers.check_password("test", user.password, user.salt), True
+        )
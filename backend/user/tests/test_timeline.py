@@ -0,0 +1,63 @@
+from post import core as pc
+from post import models as pm
+from utils.utils_tests import ViewTests
+
+
+class TestTimeline(ViewTests):
+    def setUp(self):
+        self.user = self.create_user("test")
+        self.author = self.create_user("author")
+        self.author.followers.add(self.user)
+        self.posts = [
+            pm.Post._create_test_post(self.author, True) for _ in range(3)
+        ]
+        for post in self.posts:
+            pc.TimelineInbox.fan_out(post)
+        self.set_cookie("token", self.user)
+        self.create_url("user:timeline", [])
+
+    def _post_ids(self, res) -> list[int]:
+        return [post["id"] for post in res.json()["posts"]]
+
+    def test_cursor_pagination(self):
+        res = self.client.get(self.url, {"size": 2})
+        self.assertEqual(res.status_code, 200, res.json())
+        self.assertEqual(
+            self._post_ids(res), [self.posts[2].pk, self.posts[1].pk]
+        )
+
+        res = self.client.get(
+            self.url, {"size": 2, "cursor": res.json()["next"]}
+        )
+        self.assertEqual(self._post_ids(res), [self.posts[0].pk])
+        self.assertEqual(res.json()["next"], None)
+
+    def test_seen_posts_are_skipped(self):
+        self.posts[1].viewers.add(self.user)
+        res = self.client.get(self.url, {"size": 2})
+        self.assertEqual(
+            self._post_ids(res), [self.posts[2].pk, self.posts[0].pk]
+        )
+
+    def test_invalid_cursor(self):
+        res = self.client.get(self.url, {"cursor": "invalid"})
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["code"], "invalidCursor")
+
+    def test_impressions_are_recorded(self):
+        self.client.get(self.url, {"size": 2})
+        for post in self.posts[1:]:
+            self.assertEqual(list(post.viewers.all()), [self.user])
+
+        res = self.client.get(self.url, {"size": 2})
+        self.assertEqual(self._post_ids(res), [self.posts[0].pk])
+
+    def test_invisible_authors_are_dropped(self):
+        # Inbox entries are still there until they're removed.
+        self.author.followers.remove(self.user)
+        self.author.is_private = True
+        self.author.save()
+
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200, res.json())
+        self.assertEqual(self._post_ids(res), [])
@@ -0,0 +1,59 @@
+import datetime
+from unittest import mock
+
+from rest_framework.test import APITestCase
+
+from user.authenticate import (
+    _validate_jwt_token,
+    generate_jwt_token,
+    token_cache,
+)
+from user.models import User
+from utils.cache_utils import ExpiringLRUCache
+
+
+class TestTokenCache(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User._create_test_user("test")
+
+    def _token(self, expire_date: datetime.datetime) -> str:
+        return generate_jwt_token(self.user, expire_date)
+
+    def test_hits_and_misses(self):
+        token = self._token(
+            datetime.datetime.now() + datetime.timedelta(days=1)
+        )
+        first, _ = _validate_jwt_token(token)
+        second, _ = _validate_jwt_token(token)
+        self.assertEqual(first, second)
+        self.assertEqual((token_cache.hits, token_cache.misses), (1, 1))
+
+    def test_invalid_token_is_not_cached(self):
+        token = self._token(
+            datetime.datetime.now() + datetime.timedelta(days=1)
+        )
+        for _ in range(2):
+            decoded_token, res = _validate_jwt_token(token[:-2])
+            self.assertEqual(decoded_token, None)
+            self.assertEqual(res.status_code, 403)
+        self.assertEqual(len(token_cache), 0)
+
+    def test_expired_entry(self):
+        token = self._token(
+            datetime.datetime.now() + datetime.timedelta(seconds=30)
+        )
+        _validate_jwt_token(token)
+        with mock.patch("utils.cache_utils.time.time", return_value=2**32):
+            _validate_jwt_token(token)
+        self.assertEqual((token_cache.hits, token_cache.misses), (0, 2))
+
+    def test_lru_eviction(self):
+        cache = ExpiringLRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
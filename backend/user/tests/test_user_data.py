@@ -0,0 +1,39 @@
+from post import models as pm
+from utils.utils_tests import ViewTests
+
+
+class TestUserData(ViewTests):
+    def setUp(self):
+        self.user = self.create_user("test")
+        self.another_user = self.create_user("another_test")
+        for _ in range(3):
+            pm.Post._create_test_post(self.another_user, True)
+        self.create_url("user:get_user_data", ["another_test"])
+        self.set_cookie("token", self.user)
+
+    def test_pages(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(len(res.json()["posts"]), 2)
+        self.assertEqual(res.json()["totalPosts"], 3)
+
+        res = self.client.get(self.url, {"page": 2})
+        self.assertEqual(len(res.json()["posts"]), 1)
+
+        for page in (0, 3):
+            res = self.client.get(self.url, {"page": page})
+            self.assertEqual(res.status_code, 404)
+            self.assertEqual(res.json()["error"], "emptyPage")
+
+    def test_private_user(self):
+        self.another_user.is_private = True
+        self.another_user.save()
+
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn("posts", res.json())
+
+    def test_invalid_user(self):
+        self.create_url("user:get_user_data", ["invalid"])
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 404)
@@ -10,6 +10,14 @@ urlpatterns = [
     path("settings/", views.settings, name="settings"),
     path("dashboard/", views.dashboard, name="dashboard"),
     path("follow/<int:user_id>/", views.follow, name="follow"),
+    path(
+        "follow-requests/", views.follow_requests, name="follow_requests"
+    ),
+    path(
+        "follow-requests/approval/",
+        views.follow_requests_approval,
+        name="follow_requests_approval",
+    ),
     path("sign-up/", views.sign_up, name="sign_up"),
     path("edit-profile/", views.edit_profile, name="edit_profile"),
     path(
@@ -2,16 +2,18 @@ import datetime
 
 import redis
 from django.conf import settings
-from django.core.paginator import EmptyPage, Paginator
 from django.http.response import HttpResponseRedirect
-from django.shortcuts import get_object_or_404
+from django.shortcuts import aget_object_or_404
 from django.urls import reverse
+from post import core as pm_core
 from post import models as pm
 from post.serializers import PostSerializer
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from utils import auth_utils as au
+from utils.exceptions import JsonSerializableValueError
+from utils.view_utils import async_api_view
 
 from . import authenticate as auth
 from . import core
@@ -25,6 +27,9 @@ from .tasks import send_forget_password_email
 
 r = redis.Redis(settings.REDIS_BACKEND_HOST, settings.REDIS_BACKEND_PORT)
 
+# Number of posts in each page of user's profile.
+POSTS_PAGE_SIZE = 2
+
 
 @api_view(["POST"])
 def sign_up(request):
@@ -54,10 +59,11 @@ def sign_up(request):
     return Response({"message": "Done"}, status.HTTP_201_CREATED)
 
 
-@api_view(["POST"])
-def login(request):
+@async_api_view(["POST"])
+async def login(request):
     """
-    Login api.
+    Login api, password is hashed in a thread pool so it won't block
+    the event loop.
 
     Request's body schema:
         'username' (str)
@@ -70,7 +76,7 @@ def login(request):
             serializer.errors,
             status=status.HTTP_400_BAD_REQUEST,
         )
-    if user := auth.login(**serializer.validated_data):
+    if user := await auth.alogin(**serializer.validated_data):
         res = Response(
             {"message": "successfully logined."}, status.HTTP_200_OK
         )
@@ -102,6 +108,7 @@ def dashboard(request):
     User have to authenticate before reaching this endpoint.
     """
 
+    request.user.refresh_from_db(fields=m.User.COUNTER_FIELDS)
     serializer = s.UserDataSerializer(request.user)
     return Response(serializer.data, status.HTTP_200_OK)
 
@@ -121,7 +128,9 @@ def follow(request, user_id):
         if not validator.is_valid():
             return Response(validator.errors, status.HTTP_400_BAD_REQUEST)
 
-        validator.follow_user()
+        if not validator.follow_user():
+            return Response(validator.errors, status.HTTP_400_BAD_REQUEST)
+
         msg = (
             "successfully created follow request."
             if validator._is_user_private
@@ -143,6 +152,61 @@ def follow(request, user_id):
         return Response({"message": msg}, status.HTTP_200_OK)
 
 
+@api_view(["POST", "DELETE"])
+@authenticate
+def follow_requests(request):
+    """
+    Approving or rejecting follow requests in bulk.
+    Request schema can be found in 'FollowRequestsSerializer', either
+    a list of user ids or a timestamp which requests sent before it
+    are handled.
+
+    At most 1000 oldest requests are handled at once, 'hasMore' is true
+    when more requests sent before the timestamp are left, and the same
+    request must be sent again for them.
+
+    Use 'POST' for approve and 'DELETE' for reject.
+    """
+
+    serializer = s.FollowRequestsSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    validator = core.FollowRequests(request.user, **serializer.validated_data)
+    if not validator.is_valid():
+        return Response(validator.errors, status.HTTP_400_BAD_REQUEST)
+
+    if request.method == "POST":
+        count = validator.approve()
+        msg = "successfully approved follow requests."
+    else:
+        count = validator.reject()
+        msg = "successfully rejected follow requests."
+    return Response(
+        {"message": msg, "count": count, "hasMore": validator.has_more},
+        status.HTTP_200_OK,
+    )
+
+
+@api_view(["GET"])
+@authenticate
+def follow_requests_approval(request):
+    """
+    Progress of approving pending follow requests in background, which
+    starts when the user turns their account public.
+
+    'approval' is null if no approval has ever started.
+    """
+
+    job = (
+        m.FollowRequestsApproval.objects.filter(user=request.user)
+        .order_by("-created_at")
+        .first()
+    )
+    data = s.FollowRequestsApprovalSerializer(job).data if job else None
+    return Response({"approval": data}, status.HTTP_200_OK)
+
+
 @api_view(["PATCH"])
 @authenticate
 def edit_profile(request):
@@ -235,36 +299,62 @@ def settings(request):
     return res
 
 
-@api_view(["GET"])
+@async_api_view(["GET"])
 @authenticate
-def timeline(request):
-    timeline_core = core.Timeline(request.user)
-    posts = timeline_core.fetch_posts()
+async def timeline(request):
+    """
+    Returns a page of user's timeline posts.
+
+    Query parameters:
+        'cursor' (Optional[str]): 'next' value of the previous page.
+        'size' (Optional[int]): Number of posts in the page.
+
+    'next' will be null when there are no more posts to show.
+    """
+
+    size = request.query_params.get("size", "")
+    timeline_core = core.Timeline(
+        request.user,
+        request.query_params.get("cursor"),
+        int(size) if size.isdigit() else None,
+    )
+    try:
+        posts = await timeline_core.afetch_posts()
+    except JsonSerializableValueError as e:
+        return Response(e.message, status.HTTP_400_BAD_REQUEST)
+
+    # Shown posts are recorded as viewed, so they won't show up again.
+    await pm_core.PostViewsRecorder.arecord(
+        request.user.pk, [post.pk for post in posts]
+    )
     serializer = PostSerializer(posts, many=True)
-    return Response(serializer.data, status.HTTP_200_OK)
+    return Response(
+        {"posts": serializer.data, "next": timeline_core.next_cursor},
+        status.HTTP_200_OK,
+    )
 
 
-@api_view(["GET"])
+@async_api_view(["GET"])
 @authenticate
-def get_user_data(request, username):
-    user = get_object_or_404(User, username=username)
+async def get_user_data(request, username):
+    user = await aget_object_or_404(User, username=username)
 
-    if not request.user.can_view(user):
+    if not await request.user.acan_view(user):
         serializer = s.UserPreviewSerializer(user)
         return Response(serializer.data)
 
-    page = request.query_params.get("page")
-    if page is None or not page.isdigit():
-        page = 1
-
-    posts = pm.Post.objects.filter(user=user)
-    paginator = Paginator(posts, 2)
-    try:
-        objs = paginator.page(int(page))
-    except EmptyPage:
+    page = request.query_params.get("page", "")
+    page = int(page) if page.isdigit() else 1
+    if page < 1:
         return Response({"error": "emptyPage"}, status.HTTP_404_NOT_FOUND)
 
-    user.posts = objs
+    posts = pm.Post.objects.for_feed(request.user).filter(user=user)
+    offset = (page - 1) * POSTS_PAGE_SIZE
+    user.posts = [
+        post async for post in posts[offset : offset + POSTS_PAGE_SIZE]
+    ]
+    if not user.posts and page > 1:
+        return Response({"error": "emptyPage"}, status.HTTP_404_NOT_FOUND)
 
     serializer = s.UserPreviewSerializer(user).data
 
@@ -327,7 +417,8 @@ def reset_password(request):
         username=obj[b"username"].decode(), is_deleted=False
     ).first()
     user.password = serializer.validated_data["password"]
-    user.save(change_salt=True)
+    # Only credentials are written, counters may have changed meanwhile.
+    user.save(change_salt=True, update_fields=["password", "salt"])
     r.delete(code)
 
     return Response({"message": "Your password changed successfully."})
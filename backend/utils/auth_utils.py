@@ -1,17 +1,20 @@
 import datetime
-from hashlib import sha256
-from random import randint
+import secrets
 
 from utils.configs import _JWT_CONFIG
+from utils.hashers import check_password, make_password, must_update
 
-
-def generate_hash() -> str:
-    salt = map(chr, [randint(33, 129) for _ in range(1, 6)])
-    return "".join(salt)
+__all__ = [
+    "check_password",
+    "generate_expire_date",
+    "generate_hash",
+    "make_password",
+    "must_update",
+]
 
 
-def make_password(password: str, salt: str):
-    return sha256(password.encode() + salt.encode()).hexdigest()
+def generate_hash() -> str:
+    return secrets.token_urlsafe(16)
 
 
 def generate_expire_date() -> datetime.datetime:
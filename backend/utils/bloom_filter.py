@@ -0,0 +1,127 @@
+import time
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from math import ceil, log
+from typing import Hashable, Iterable, Optional
+
+import redis
+
+
+@dataclass
+class RotatingBloomFilter:
+    """
+    Bloom filter stored in redis bitmaps, split into time windows.
+
+    Items are added to the current window's bitmap, and looked up in
+    the last 'windows' bitmaps, older bitmaps expire on their own, so
+    the filter forgets items after 'window * windows' seconds and its
+    false positive rate doesn't grow forever.
+
+    Items known from elsewhere, e.g. a database, are loaded into a
+    bitmap of their own with 'load', so they don't eat into the current
+    window's capacity.
+
+    Attributes:
+        client: Redis client.
+        key: Prefix of the bitmaps keys.
+        capacity: Expected number of items added in each window.
+        error_rate: False positive rate while a window holds at most
+            'capacity' items.
+        window: Length of each window in seconds.
+        windows: Number of windows which are looked up.
+    """
+
+    client: redis.Redis
+    key: str
+    capacity: int
+    error_rate: float
+    window: int
+    windows: int
+    size: int = field(init=False)
+    hashes: int = field(init=False)
+
+    def __post_init__(self):
+        # Optimal number of bits and hash functions for the given
+        # capacity and false positive rate.
+        self.size = ceil(
+            -self.capacity * log(self.error_rate) / log(2) ** 2
+        )
+        self.hashes = max(1, round(self.size / self.capacity * log(2)))
+
+    def add(self, items: Iterable[Hashable]) -> None:
+        items = list(items)
+        if not items:
+            return
+
+        key = self._window_keys()[0]
+        with self.client.pipeline(transaction=False) as pipe:
+            pipe.execute_command(*self._set_bits(key, items))
+            pipe.expire(key, self.window * self.windows)
+            pipe.execute()
+
+    def load(self, items: Iterable[Hashable]) -> None:
+        """
+        Replacing the loaded items with up to 'capacity' 'items', which
+        are looked up along with the windows for one window's length.
+        """
+
+        items = list(items)[: self.capacity]
+        key = self._loaded_key()
+        with self.client.pipeline() as pipe:
+            pipe.delete(key)
+            if items:
+                pipe.execute_command(*self._set_bits(key, items))
+                pipe.expire(key, self.window)
+            pipe.execute()
+
+    def contains(self, items: list[Hashable]) -> list[bool]:
+        """
+        Returns whether each of 'items' may have been added, false
+        positives are possible but false negatives are not.
+        """
+
+        if not items:
+            return []
+
+        positions = [self._positions(item) for item in items]
+        with self.client.pipeline(transaction=False) as pipe:
+            for key in [*self._window_keys(), self._loaded_key()]:
+                operation = pipe.bitfield(key)
+                for item_positions in positions:
+                    for position in item_positions:
+                        operation.get("u1", position)
+                pipe.execute_command(*operation.command)
+            windows_bits = pipe.execute()
+
+        found = [False] * len(items)
+        for bits in windows_bits:
+            for index in range(len(items)):
+                start = index * self.hashes
+                if all(bits[start : start + self.hashes]):
+                    found[index] = True
+        return found
+
+    def _set_bits(self, key: str, items: list[Hashable]) -> tuple:
+        operation = self.client.bitfield(key)
+        for item in items:
+            for position in self._positions(item):
+                operation.set("u1", position, 1)
+        return operation.command
+
+    def _positions(self, item: Hashable) -> list[int]:
+        """
+        Deriving 'hashes' bit positions from a single digest with
+        double hashing.
+        """
+
+        digest = blake2b(str(item).encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def _loaded_key(self) -> str:
+        return f"{self.key}:preloaded"
+
+    def _window_keys(self, now: Optional[float] = None) -> list[str]:
+        current = int((now or time.time()) // self.window)
+        return [f"{self.key}:{current - i}" for i in range(self.windows)]
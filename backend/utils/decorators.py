@@ -11,7 +11,8 @@ def validation_required(func: Callable):
                 f"Cannot call {func.__name__} before calling is_valid()."
             )
 
-        func(self, *args, **kwargs)
+        result = func(self, *args, **kwargs)
         self._validation_passed = False
+        return result
 
     return wrapper
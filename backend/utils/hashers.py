@@ -0,0 +1,202 @@
+"""
+Password hashers.
+
+Passwords are encoded as 'algorithm$params$salt$hash', where params
+are comma separated 'key=value' pairs, so hashes made with older
+algorithms or costs can be detected and upgraded on login.
+
+Hashes made before this format existed are a bare sha256 hexdigest of
+password + salt, they are still verified and reported as outdated.
+"""
+
+import base64
+import hashlib
+import hmac
+from abc import ABC, abstractmethod
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+try:
+    import argon2
+except ImportError:
+    argon2 = None
+
+
+class BasePasswordHasher(ABC):
+    algorithm: str
+    default_params: dict[str, int]
+
+    def __init__(self, **params: int):
+        self.params = {**self.default_params, **params}
+
+    @abstractmethod
+    def _hash(self, password: str, salt: str, params: dict) -> bytes:
+        pass
+
+    def encode(self, password: str, salt: str) -> str:
+        digest = base64.b64encode(self._hash(password, salt, self.params))
+        return "$".join(
+            [
+                self.algorithm,
+                _encode_params(self.params),
+                salt,
+                digest.decode(),
+            ]
+        )
+
+    def verify(self, password: str, encoded: str) -> bool:
+        algorithm, params, salt, digest = _split(encoded)
+        if algorithm != self.algorithm:
+            return False
+
+        expected = base64.b64encode(
+            self._hash(password, salt, _decode_params(params))
+        )
+        return hmac.compare_digest(expected, digest.encode())
+
+    def must_update(self, encoded: str) -> bool:
+        algorithm, params, _, _ = _split(encoded)
+        return (
+            algorithm != self.algorithm
+            or _decode_params(params) != self.params
+        )
+
+
+class PBKDF2SHA256Hasher(BasePasswordHasher):
+    algorithm = "pbkdf2_sha256"
+    default_params = {"iterations": 600000}
+
+    def _hash(self, password: str, salt: str, params: dict) -> bytes:
+        return hashlib.pbkdf2_hmac(
+            "sha256", password.encode(), salt.encode(), params["iterations"]
+        )
+
+
+class ScryptHasher(BasePasswordHasher):
+    """
+    Memory-hard hasher, memory usage is about 128 * n * r bytes.
+    """
+
+    algorithm = "scrypt"
+    default_params = {"n": 2**14, "r": 8, "p": 1}
+
+    def _hash(self, password: str, salt: str, params: dict) -> bytes:
+        return hashlib.scrypt(
+            password.encode(),
+            salt=salt.encode(),
+            n=params["n"],
+            r=params["r"],
+            p=params["p"],
+            maxmem=256 * params["n"] * params["r"] * params["p"],
+            dklen=32,
+        )
+
+
+class Argon2Hasher(BasePasswordHasher):
+    """
+    Argon2id hasher, requires 'argon2-cffi' to be installed.
+
+    'memory_cost' is in kibibytes.
+    """
+
+    algorithm = "argon2id"
+    default_params = {"time_cost": 2, "memory_cost": 19456, "parallelism": 1}
+
+    def __init__(self, **params: int):
+        if argon2 is None:
+            raise ValueError("argon2-cffi is required for argon2 hashing.")
+        super().__init__(**params)
+
+    def _hash(self, password: str, salt: str, params: dict) -> bytes:
+        return argon2.low_level.hash_secret_raw(
+            password.encode(),
+            salt.encode().ljust(8, b"\0"),
+            time_cost=params["time_cost"],
+            memory_cost=params["memory_cost"],
+            parallelism=params["parallelism"],
+            hash_len=32,
+            type=argon2.low_level.Type.ID,
+        )
+
+
+HASHERS = {
+    hasher.algorithm: hasher
+    for hasher in (PBKDF2SHA256Hasher, ScryptHasher, Argon2Hasher)
+}
+
+
+def get_hasher(algorithm: str = None, **params: int) -> BasePasswordHasher:
+    """
+    Returns the configured hasher, or the one matching 'algorithm'.
+    """
+
+    if algorithm is None:
+        algorithm = settings.PASSWORD_HASHER
+        params = {**settings.PASSWORD_HASHER_PARAMS, **params}
+
+    try:
+        return HASHERS[algorithm](**params)
+    except KeyError:
+        raise ValueError(f"Unknown password hasher '{algorithm}'.")
+
+
+def make_password(password: str, salt: str) -> str:
+    return get_hasher().encode(password, salt)
+
+
+def check_password(password: str, encoded: str, salt: str) -> bool:
+    """
+    Verifying password against an encoded hash, 'salt' is only used
+    for legacy hashes which don't carry their own salt. Malformed hashes
+    never match.
+    """
+
+    if _is_legacy(encoded):
+        legacy = hashlib.sha256(password.encode() + salt.encode())
+        return hmac.compare_digest(legacy.hexdigest(), encoded)
+
+    algorithm = encoded.split("$", 1)[0]
+    if algorithm not in HASHERS:
+        return False
+
+    try:
+        return get_hasher(algorithm).verify(password, encoded)
+    except ValueError:
+        return False
+
+
+def must_update(encoded: str) -> bool:
+    """
+    Whether the hash is legacy, or was made with another algorithm
+    or cost than the configured one.
+    """
+
+    return _is_legacy(encoded) or get_hasher().must_update(encoded)
+
+
+# Hashing is CPU bound, async callers run it in a thread pool instead
+# of blocking the event loop.
+amake_password = sync_to_async(make_password, thread_sensitive=False)
+acheck_password = sync_to_async(check_password, thread_sensitive=False)
+
+
+def _is_legacy(encoded: str) -> bool:
+    return "$" not in encoded
+
+
+def _split(encoded: str) -> tuple[str, str, str, str]:
+    algorithm, params, rest = encoded.split("$", 2)
+    salt, digest = rest.rsplit("$", 1)
+    return algorithm, params, salt, digest
+
+
+def _encode_params(params: dict[str, int]) -> str:
+    return ",".join(f"{key}={value}" for key, value in sorted(params.items()))
+
+
+def _decode_params(params: str) -> dict[str, int]:
+    return {
+        key: int(value)
+        for key, value in (param.split("=") for param in params.split(","))
+    }
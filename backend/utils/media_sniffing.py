@@ -0,0 +1,131 @@
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+# Number of leading bytes which are sniffed, enough for image headers and
+# most jpeg metadata before the frame header.
+SNIFF_SIZE = 64 * 1024
+
+# Major brands of mp4 compatible 'ftyp' boxes.
+MP4_BRANDS = {
+    b"isom",
+    b"iso2",
+    b"iso4",
+    b"iso5",
+    b"iso6",
+    b"mp41",
+    b"mp42",
+    b"avc1",
+    b"M4V ",
+    b"dash",
+    b"MSNV",
+}
+
+# Jpeg start of frame markers, which hold image dimensions.
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """
+    Attributes:
+        kind: One of 'png', 'gif', 'jpeg' or 'mp4'.
+        width: Width in pixels, None if it's not in the sniffed bytes.
+        height: Height in pixels, None if it's not in the sniffed bytes.
+    """
+
+    kind: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+def sniff(head: bytes) -> Optional[MediaInfo]:
+    """
+    Detecting media kind from the magic bytes at the beginning of a
+    file, and reading its dimensions from headers without decoding it.
+
+    Returns None if the file isn't a supported media.
+    """
+
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        if head[12:16] != b"IHDR" or len(head) < 24:
+            return MediaInfo("png")
+        return MediaInfo("png", *struct.unpack(">II", head[16:24]))
+
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        if len(head) < 10:
+            return MediaInfo("gif")
+        return MediaInfo("gif", *struct.unpack("<HH", head[6:10]))
+
+    if head.startswith(b"\xff\xd8\xff"):
+        return MediaInfo("jpeg", *_jpeg_size(head))
+
+    if head[4:8] == b"ftyp" and head[8:12] in MP4_BRANDS:
+        return MediaInfo("mp4", *_mp4_size(head))
+
+    return None
+
+
+def _jpeg_size(head: bytes) -> tuple[Optional[int], Optional[int]]:
+    """Walking jpeg segments up to the first start of frame."""
+
+    offset = 2
+    while offset + 9 <= len(head):
+        if head[offset] != 0xFF:
+            break
+
+        marker = head[offset + 1]
+        if marker == 0xFF:
+            # Fill byte.
+            offset += 1
+            continue
+        if 0xD0 <= marker <= 0xD9 or marker == 0x01:
+            # Markers without a length.
+            offset += 2
+            continue
+
+        length = struct.unpack(">H", head[offset + 2 : offset + 4])[0]
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", head[offset + 5 : offset + 9])
+            return width, height
+        offset += 2 + length
+    return None, None
+
+
+def _mp4_size(head: bytes) -> tuple[Optional[int], Optional[int]]:
+    """
+    Reading dimensions of the first track, which is usually the video
+    one, from 'moov' box. It's only found when 'moov' is placed before
+    media data.
+    """
+
+    tkhd = _find_box(head, [b"moov", b"trak", b"tkhd"])
+    if tkhd is None:
+        return None, None
+
+    # Width and height are 16.16 fixed point numbers at the end of tkhd.
+    width, height = struct.unpack(">II", tkhd[-8:])
+    return (width >> 16) or None, (height >> 16) or None
+
+
+def _find_box(data: bytes, path: list[bytes]) -> Optional[bytes]:
+    offset = 0
+    while offset + 8 <= len(data):
+        size, box_type = struct.unpack(">I4s", data[offset : offset + 8])
+        header = 8
+        if size == 1 and offset + 16 <= len(data):
+            size = struct.unpack(">Q", data[offset + 8 : offset + 16])[0]
+            header = 16
+        if size < header or offset + size > len(data):
+            # Box continues past the sniffed bytes.
+            return None
+
+        if box_type == path[0]:
+            body = data[offset + header : offset + size]
+            if len(path) == 1:
+                return body if len(body) >= 8 else None
+            found = _find_box(body, path[1:])
+            if found is not None:
+                return found
+        offset += size
+    return None
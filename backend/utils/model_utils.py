@@ -1,4 +1,8 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import connections, router
+from django.db.models import AutoField, F, Model, sql
+from django.db.models.constants import OnConflict
 
 
 def generate_path(instance, filename):
@@ -8,3 +12,63 @@ def generate_path(instance, filename):
         / instance.__class__.__name__.lower()
         / filename
     )
+
+
+def generate_media_path(instance, filename):
+    """
+    Post files and stories share a directory, so their contents are
+    deduplicated by 'ContentAddressedStorage' across both.
+    """
+
+    return settings.STATICFILES_DIRS[0] / "users" / "media" / filename
+
+
+def increment_counters(instance: Model, **deltas: int) -> None:
+    """
+    Atomically adding 'deltas' to the given counter columns with F()
+    expressions, then mirroring the change on the in-memory instance.
+    Deferred counters aren't mirrored, they're loaded with the change
+    when accessed.
+
+    Example:
+        increment_counters(user, followers_count=1)
+    """
+
+    type(instance).objects.filter(pk=instance.pk).update(
+        **{name: F(name) + delta for name, delta in deltas.items()}
+    )
+    deferred = instance.get_deferred_fields()
+    for name, delta in deltas.items():
+        if name not in deferred:
+            setattr(instance, name, getattr(instance, name) + delta)
+
+
+def insert_ignore(model: type[Model], **values) -> bool:
+    """
+    Inserting a single row with 'INSERT ... ON CONFLICT DO NOTHING', so
+    duplicates are rejected by the table's unique constraints in the
+    same statement instead of a racy check-then-insert.
+
+    Returns whether the row was inserted.
+
+    Example:
+        liked = insert_ignore(PostLikes, user=user, post=post)
+    """
+
+    obj = model(**values)
+    db = router.db_for_write(model)
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if not isinstance(field, AutoField)
+    ]
+    query = sql.InsertQuery(model, on_conflict=OnConflict.IGNORE)
+    query.insert_values(fields, [obj])
+
+    with connections[db].cursor() as cursor:
+        for statement, params in query.get_compiler(using=db).as_sql():
+            cursor.execute(statement, params)
+        return cursor.rowcount > 0
+
+
+ainsert_ignore = sync_to_async(insert_ignore)
@@ -0,0 +1,21 @@
+from functools import cache
+from typing import Optional
+
+import redis
+from django.conf import settings
+
+
+@cache
+def get_redis() -> Optional[redis.Redis]:
+    """
+    Shared redis client of the process, or None when redis backend is
+    not configured, e.g. while running tests. Features built on top of
+    redis must fall back to the database in that case.
+    """
+
+    if not settings.REDIS_BACKEND_HOST:
+        return None
+
+    return redis.Redis(
+        settings.REDIS_BACKEND_HOST, settings.REDIS_BACKEND_PORT
+    )
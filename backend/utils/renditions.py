@@ -0,0 +1,112 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.db.models.fields.files import FieldFile
+from PIL import Image, ImageOps
+
+# Pillow formats of renditions, keyed by their extension.
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+
+def render(
+    content: bytes, widths: list[int], quality: int
+) -> dict[int, dict[str, bytes]]:
+    """
+    Resizing an image to each of 'widths' narrower than itself, and
+    encoding every size in all of 'FORMATS'.
+
+    This runs in worker processes, so it only takes plain arguments.
+    """
+
+    image = ImageOps.exif_transpose(Image.open(BytesIO(content)))
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (
+        image.mode == "P" and "transparency" in image.info
+    )
+    # Palette images (e.g. gifs) can't be resampled smoothly.
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    renditions = {}
+    for width in sorted(widths):
+        if width >= image.width:
+            break
+
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        renditions[width] = {}
+        for extension, image_format in FORMATS.items():
+            frame = resized if extension == "webp" else resized.convert("RGB")
+            output = BytesIO()
+            frame.save(output, image_format, quality=quality)
+            renditions[width][extension] = output.getvalue()
+    return renditions
+
+
+@cache
+def _executor() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(settings.RENDITION_WORKERS)
+
+
+def generate(file: FieldFile) -> dict:
+    """
+    Generating renditions of an image, in the process pool if
+    'RENDITION_WORKERS' is set, and saving them next to it in the same
+    storage.
+
+    Returns the value of a renditions field, e.g.
+    {"source": name, "widths": {"320": {"webp": name, "jpeg": name}}}.
+    """
+
+    with file.open("rb"):
+        content = file.read()
+
+    arguments = (
+        content,
+        settings.RENDITION_WIDTHS,
+        settings.RENDITION_QUALITY,
+    )
+    if settings.RENDITION_WORKERS:
+        rendered = _executor().submit(render, *arguments).result()
+    else:
+        rendered = render(*arguments)
+
+    directory, name = os.path.split(file.name)
+    stem = os.path.splitext(name)[0]
+    widths = {}
+    for width, formats in rendered.items():
+        widths[str(width)] = {
+            extension: file.storage.save(
+                os.path.join(
+                    directory, "renditions", f"{stem}_{width}.{extension}"
+                ),
+                ContentFile(data),
+            )
+            for extension, data in formats.items()
+        }
+    return {"source": file.name, "widths": widths}
+
+
+def is_stale(file: FieldFile, renditions: dict) -> bool:
+    """Whether renditions don't belong to the current file."""
+
+    if not file:
+        return bool(renditions)
+    return renditions.get("source") != file.name
+
+
+def current(file: FieldFile, renditions: dict) -> dict[str, dict[str, str]]:
+    """Names of renditions keyed by width and format, if not stale."""
+
+    if is_stale(file, renditions):
+        return {}
+    return renditions.get("widths", {})
+
+
+def delete(storage: Storage, renditions: dict) -> None:
+    for formats in renditions.get("widths", {}).values():
+        for name in formats.values():
+            storage.delete(name)
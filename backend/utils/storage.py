@@ -0,0 +1,127 @@
+import os
+from hashlib import sha256
+from tempfile import NamedTemporaryFile
+
+from django.apps import apps
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+from .model_utils import insert_ignore
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage which names files after the sha256 digest of
+    their content, e.g. 'users/media/ab/cd/abcd...ef.jpg', so
+    identical files are stored once and same named files don't collide.
+
+    Every stored file has a 'MediaBlob' row counting its references,
+    saving a file adds a reference and deleting it releases one, the
+    file itself is removed when its last reference is released.
+    """
+
+    BLOB_MODEL = "post.MediaBlob"
+    CHUNK_SIZE = 64 * 1024
+    TEMPORARY_DIR = ".uploads"
+
+    def get_available_name(self, name, max_length=None):
+        # Name is derived from the content in '_save', same content must
+        # end up with the same name.
+        return name
+
+    def _save(self, name, content):
+        if hasattr(content, "temporary_file_path"):
+            source = content.temporary_file_path()
+            digest = self._file_digest(source)
+            is_temporary = False
+        else:
+            source, digest = self._write_temporary_file(content)
+            is_temporary = True
+
+        full_path = self.path(
+            os.path.join(
+                os.path.dirname(name),
+                digest[:2],
+                digest[2:4],
+                digest + os.path.splitext(name)[1].lower(),
+            )
+        )
+        name = os.path.relpath(full_path, self.location).replace("\\", "/")
+
+        with transaction.atomic():
+            blob = self._lock_blob(name, create=True)
+            if os.path.exists(full_path):
+                if is_temporary:
+                    os.remove(source)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                file_move_safe(source, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+
+            blob.references = F("references") + 1
+            blob.save(update_fields=["references"])
+        return name
+
+    def delete(self, name):
+        """
+        Releasing a reference to the file, which is removed once the
+        transaction releasing its last reference commits.
+        """
+
+        with transaction.atomic():
+            blob = self._lock_blob(name)
+            if blob is None:
+                return
+
+            blob.references = max(blob.references - 1, 0)
+            blob.save(update_fields=["references"])
+
+        if not blob.references:
+            transaction.on_commit(lambda: self._remove_unreferenced(name))
+
+    def _remove_unreferenced(self, name: str):
+        # Zero referenced rows are kept, so a concurrent save of the same
+        # content waits on this lock instead of skipping a file that is
+        # about to be removed.
+        with transaction.atomic():
+            blob = self._lock_blob(name)
+            if blob is not None and not blob.references:
+                super().delete(name)
+
+    def _lock_blob(self, name: str, create: bool = False):
+        blob_model = apps.get_model(self.BLOB_MODEL)
+        if create:
+            insert_ignore(blob_model, name=name, references=0)
+        return blob_model.objects.select_for_update().filter(pk=name).first()
+
+    def _write_temporary_file(self, content) -> tuple[str, str]:
+        """
+        Streaming content into a temporary file next to the stored
+        files, while hashing it.
+        """
+
+        directory = self.path(self.TEMPORARY_DIR)
+        os.makedirs(directory, exist_ok=True)
+        digest = sha256()
+        with NamedTemporaryFile(dir=directory, delete=False) as file:
+            for chunk in content.chunks(self.CHUNK_SIZE):
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                digest.update(chunk)
+                file.write(chunk)
+        return file.name, digest.hexdigest()
+
+    def _file_digest(self, path: str) -> str:
+        digest = sha256()
+        with open(path, "rb") as file:
+            while block := file.read(self.CHUNK_SIZE):
+                digest.update(block)
+        return digest.hexdigest()
+
+
+content_storage = ContentAddressedStorage()
@@ -0,0 +1,60 @@
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from rest_framework.exceptions import ValidationError
+
+from .validators import (
+    CONTENT_KINDS,
+    MAX_CONTENT_SIZE,
+    MIN_CONTENT_SIZE,
+    validate_content_head,
+    validate_content_name,
+)
+
+
+class SniffingUploadHandler(FileUploadHandler):
+    """
+    Validating uploaded post and story contents while they are streamed,
+    before the other handlers store them. Files of other fields, e.g.
+    profile pictures, are left to their serializers.
+
+    The file's name is validated and its first chunk is sniffed against
+    the declared content type, and the upload is aborted as soon as they
+    don't match or the file grows past 'MAX_CONTENT_SIZE', instead of
+    after the whole transfer. Files too small to sniff are left to the
+    size validation.
+
+    Aborting resets the connection, so the rest of the body isn't read
+    and fields sent after the file are dropped, clients must send the
+    file as the last field.
+
+    Rejections are kept in 'request.upload_errors' by field name.
+    """
+
+    FIELD_NAMES = frozenset({"content"})
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> bytes:
+        if (
+            self.field_name not in self.FIELD_NAMES
+            or self.content_type not in CONTENT_KINDS
+        ):
+            return raw_data
+
+        if start == 0:
+            try:
+                validate_content_name(self.file_name, self.content_type)
+                if len(raw_data) > MIN_CONTENT_SIZE:
+                    validate_content_head(raw_data, self.content_type)
+            except ValidationError as e:
+                self._abort(e.detail)
+
+        if start + len(raw_data) >= MAX_CONTENT_SIZE:
+            self._abort({"error": "invalid file size.", "code": "invalidSize"})
+        return raw_data
+
+    def file_complete(self, file_size: int) -> None:
+        return None
+
+    def _abort(self, error: dict):
+        if not hasattr(self.request, "upload_errors"):
+            self.request.upload_errors = {}
+        self.request.upload_errors[self.field_name] = error
+        raise StopUpload(connection_reset=True)
@@ -1,11 +1,76 @@
+import random
+import tempfile
 from http.cookies import SimpleCookie
+from io import BytesIO
+from pathlib import Path
+from unittest import TestCase, mock
 
+import redis
 from django.http import HttpResponse
+from django.test import override_settings
 from django.urls import reverse
+from PIL import Image
 from rest_framework.test import APITestCase
 
 from user.authenticate import generate_jwt_for_test_user
 from user.models import User
+from utils.redis_utils import get_redis
+
+
+def use_temp_media(test_case: TestCase, **overrides) -> Path:
+    """
+    Storing media and chunked uploads in a temporary directory for the
+    rest of the test, other settings can be overridden along with them.
+    """
+
+    directory = tempfile.TemporaryDirectory()
+    test_case.addCleanup(directory.cleanup)
+    settings = override_settings(
+        MEDIA_ROOT=directory.name,
+        CHUNKED_UPLOAD_DIR=Path(directory.name) / "chunks",
+        STATICFILES_DIRS=[Path("static")],
+        **overrides,
+    )
+    settings.enable()
+    test_case.addCleanup(settings.disable)
+    return Path(directory.name)
+
+
+def create_image(
+    image_format: str = "JPEG", size: tuple[int, int] = (64, 64)
+) -> bytes:
+    """Encoding a grayscale image of random pixels, so each is unique."""
+
+    output = BytesIO()
+    Image.frombytes("L", size, random.randbytes(size[0] * size[1])).save(
+        output, image_format
+    )
+    return output.getvalue()
+
+
+def use_fake_redis(test_case: TestCase) -> redis.Redis:
+    """
+    Serving 'get_redis' from an in-memory fake redis for the rest of
+    the test, which is skipped if 'fakeredis' isn't installed.
+    """
+
+    try:
+        import fakeredis
+    except ImportError:
+        test_case.skipTest("fakeredis is not installed.")
+
+    client = fakeredis.FakeRedis()
+    settings = override_settings(REDIS_BACKEND_HOST="fakeredis")
+    settings.enable()
+    test_case.addCleanup(settings.disable)
+
+    patcher = mock.patch.object(redis, "Redis", lambda *args: client)
+    patcher.start()
+    test_case.addCleanup(patcher.stop)
+
+    get_redis.cache_clear()
+    test_case.addCleanup(get_redis.cache_clear)
+    return client
 
 
 class ViewTests(APITestCase):
@@ -6,6 +6,7 @@ from typing import Callable
 from rest_framework.exceptions import ValidationError
 
 from .exceptions import JsonSerializableValueError
+from .media_sniffing import SNIFF_SIZE, sniff
 
 NAME_EXT_PATTERN = r"^[^\\/<>%#{}]{1,50}\.(?<=\.)(\w{3,4}$)"
 
@@ -47,22 +48,66 @@ class Validator(ABC):
         return self._error.message
 
 
+# Supported content types, and their media kinds sniffed from content.
+CONTENT_KINDS = {
+    "video/mp4": "mp4",
+    "image/gif": "gif",
+    "image/jpeg": "jpeg",
+    "image/jpg": "jpeg",
+    "image/png": "png",
+}
+MIN_CONTENT_SIZE = 1024
+MAX_CONTENT_SIZE = 20000 * 1024
+MAX_DIMENSION = 10000
+
+
 def validate_content(content):
     """
-    Validating extension and content size.
+    Validating extension, content size and the content itself.
 
     If content type is not valid, or content type does not match
-    with the extension in file name, validation will not pass.
+    with the extension in file name or with the file's magic bytes,
+    validation will not pass.
+    """
+
+    validate_content_metadata(content)
+
+    content.seek(0)
+    validate_content_head(content.read(SNIFF_SIZE), content.content_type)
+    content.seek(0)
+    return content
+
+
+def validate_content_metadata(content):
+    """
+    Validating declared name, content type and size of a file, which is
+    possible before its content is received.
     """
 
-    extension = re.match(NAME_EXT_PATTERN, content.name).group(1)
-    if extension is None:
+    extension = validate_content_name(content.name, content.content_type)
+    if not MIN_CONTENT_SIZE < content.size < MAX_CONTENT_SIZE:
+        raise ValidationError(
+            {"error": "invalid file size.", "code": "invalidSize"}
+        )
+    content.extension = extension.lower()
+    return content
+
+
+def validate_content_name(name: str, content_type: str) -> str:
+    """
+    Validating file name and its consistency with the declared content
+    type, and returning its extension.
+    """
+
+    match = re.match(NAME_EXT_PATTERN, name)
+    if match is None:
         raise ValidationError(
             {
                 "error": "Invalid file name",
                 "code": "invalidName",
             }
         )
+    extension = match.group(1)
 
     valid_extensions = {}
     valid_extensions["video/mp4"] = "mp4"
@@ -71,7 +116,7 @@ def validate_content(content):
     valid_extensions["image/jpg"] = "jpg"
     valid_extensions["image/png"] = "png"
     # pattern = r"^.[^.\\/<>%#(){}]{1,20}\.(png|jpeg|gif|png|mp4)?$"
-    if not (ct_type := valid_extensions.get(content.content_type)):
+    if not (ct_type := valid_extensions.get(content_type)):
         raise ValidationError(
             {
                 "error": "Invalid file type, supported types are:"
@@ -86,9 +131,26 @@ def validate_content(content):
                 "code": "inconsistentExtension",
             }
         )
-    if not 1 < content.size / 1024 < 20000:
+    return extension
+
+
+def validate_content_head(head: bytes, content_type: str):
+    """
+    Validating the first bytes of a file against its declared content
+    type, so bogus uploads can be rejected by their first chunk.
+    """
+
+    info = sniff(head)
+    if info is None or info.kind != CONTENT_KINDS.get(content_type):
         raise ValidationError(
-            {"error": "invalid file size.", "code": "invalidSize"}
+            {
+                "error": "File content doesn't match its type.",
+                "code": "invalidContent",
+            }
+        )
+    if info.width is not None and not (
+        0 < info.width <= MAX_DIMENSION and 0 < info.height <= MAX_DIMENSION
+    ):
+        raise ValidationError(
+            {"error": "invalid dimensions.", "code": "invalidDimensions"}
         )
-    content.extension = extension.lower()
-    return content
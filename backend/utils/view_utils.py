@@ -0,0 +1,57 @@
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Callable
+
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+
+def async_api_view(http_method_names: list[str]):
+    """
+    Async counterpart of DRF's 'api_view', which doesn't support
+    coroutine views.
+
+    The view receives a DRF 'Request' and may return a DRF 'Response',
+    which is rendered as json. Exceptions are handled the same way
+    DRF handles them, e.g. 'Http404' becomes a 404 json response.
+    """
+
+    allowed_methods = [method.upper() for method in http_method_names]
+
+    def decorator(func: Callable):
+        assert iscoroutinefunction(func), f"{func.__name__} must be async."
+
+        @csrf_exempt
+        @wraps(func)
+        async def wrapper(request, *args, **kwargs):
+            request = Request(
+                request,
+                parsers=[
+                    parser() for parser in api_settings.DEFAULT_PARSER_CLASSES
+                ],
+            )
+            try:
+                if request.method not in allowed_methods:
+                    raise exceptions.MethodNotAllowed(request.method)
+                response = await func(request, *args, **kwargs)
+            except Exception as e:
+                response = exception_handler(
+                    e, {"view": None, "args": args, "kwargs": kwargs}
+                )
+                if response is None:
+                    raise
+
+            if isinstance(response, Response):
+                response.accepted_renderer = JSONRenderer()
+                response.accepted_media_type = "application/json"
+                response.renderer_context = {"request": request}
+            return response
+
+        return wrapper
+
+    return decorator
@@ -13,9 +13,15 @@ export default function Timeline() {
   const [reloadRequired, setReloadRequired] = useState(false);
   const router = useRouter();
 
+  const [cursor, setCursor] = useState(null);
+  const [hasMore, setHasMore] = useState(true);
+
   const fetchRequests = async () => {
     try {
-      const res = await fetchRequest(apis.timeline, "GET");
+      const url = cursor
+        ? `${apis.timeline}?cursor=${encodeURIComponent(cursor)}`
+        : apis.timeline;
+      const res = await fetchRequest(url, "GET");
       if (!res.ok) {
         router.push(urls.login);
         return;
@@ -28,14 +34,17 @@ export default function Timeline() {
   };
 
   const fetchTimeline = async () => {
+    if (!hasMore) {
+      return;
+    }
     try {
-      const responses = await Promise.all([fetchRequests(), fetchRequests()]);
-      const packResponses = () => {
-        const final = [];
-        responses.map((res) => final.push(...res));
-        return final;
-      };
-      setTimeLinePosts([...timeLinePosts, ...packResponses()]);
+      const page = await fetchRequests();
+      if (!page) {
+        return;
+      }
+      setCursor(page.next);
+      setHasMore(page.next !== null);
+      setTimeLinePosts([...timeLinePosts, ...page.posts]);
     } catch (e) {
       console.log(e);
     }